@@ -112,10 +112,35 @@ DATABASES = {
         'PORT': config('DB_PORT', default=5432, cast=int),
         'OPTIONS': {
             'sslmode': config('DB_SSLMODE', default='require'),
+            'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
         },
     }
 }
 
+# How connections are reused across requests:
+#   pool       - psycopg 3 connection pool per process (default; safe under
+#                daphne/ASGI, where each request runs in its own thread)
+#   persistent - keep each worker's connection open for DB_CONN_MAX_AGE seconds,
+#                health-checked before reuse. WSGI (gunicorn sync workers)
+#                only: under ASGI every request thread holds its own
+#                connection and they pile up until the server runs out
+#   none       - a new connection per request
+DB_CONN_MODE = config('DB_CONN_MODE', default='pool')
+
+if DB_CONN_MODE == 'pool':
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # Django rejects persistent connections with a pool
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),  # wait for a free connection
+        'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=int),
+    }
+elif DB_CONN_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 # Custom user model
@@ -252,11 +277,47 @@ PAYSTACK_BASE_URL = os.getenv('PAYSTACK_BASE_URL')
 
 
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Shared Redis cache when CACHE_URL is set; per-process LocMem otherwise (dev/tests)
+CACHE_URL = config('CACHE_URL', default='')
+CACHE_KEY_PREFIX = config('CACHE_KEY_PREFIX', default='ccm')
+# Bump to orphan every existing key after a change to cached value shapes
+CACHE_VERSION = config('CACHE_VERSION', default=1, cast=int)
+CACHE_DEFAULT_TIMEOUT = config('CACHE_DEFAULT_TIMEOUT', default=300, cast=int)
+
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'VERSION': CACHE_VERSION,
+            'TIMEOUT': CACHE_DEFAULT_TIMEOUT,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'CONNECTION_POOL_KWARGS': {
+                    'max_connections': config('CACHE_MAX_CONNECTIONS', default=50, cast=int),
+                    'retry_on_timeout': True,
+                    'health_check_interval': 30,
+                },
+                'SOCKET_CONNECT_TIMEOUT': config('CACHE_CONNECT_TIMEOUT', default=2, cast=float),
+                'SOCKET_TIMEOUT': config('CACHE_SOCKET_TIMEOUT', default=2, cast=float),
+                # zlib only kicks in above min_length, so small keys stay cheap
+                'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
+                # A Redis outage degrades to cache misses instead of 500s
+                'IGNORE_EXCEPTIONS': True,
+            },
+        }
+    }
+    DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'VERSION': CACHE_VERSION,
+            'TIMEOUT': CACHE_DEFAULT_TIMEOUT,
+        }
     }
-}
 
 
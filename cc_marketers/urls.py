@@ -3,7 +3,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import db_metrics, gateway_metrics
+
 urlpatterns = [
+    path('admin/db-metrics/', db_metrics, name='db_metrics'),
+    path('admin/gateway-metrics/', gateway_metrics, name='gateway_metrics'),
     path('admin/', admin.site.urls),
     path('tasks/', include('tasks.urls')),
     path('', include('users.urls')),
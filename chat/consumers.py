@@ -1,10 +1,27 @@
 # In chat/consumers.py
 import json
+import time
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import ChatRoom, Message
+from django.conf import settings
+from . import presence
+from .models import ChatRoom
+from .services import (
+    HISTORY_PAGE_SIZE,
+    get_message_page,
+    mark_read,
+    post_messages,
+    serialize_message,
+    total_unread,
+    user_group_name,
+)
+from .write_behind import WRITE_BEHIND_WINDOW, get_write_behind
 import asyncio
 
+# Minimum seconds between relayed 'is typing' frames per connection
+TYPING_THROTTLE = getattr(settings, "CHAT_TYPING_THROTTLE", 3)
+
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         try:
@@ -29,6 +46,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             
             # ✅ FIX 3: Verify access AFTER accepting (non-blocking)
             has_access = await self.verify_room_access()
+            self.has_access = has_access
             
             if not has_access:
                 print(f"User {self.user.username} denied access to room {self.room_id}")
@@ -39,14 +57,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 await self.close()
                 return
             
-            # Send join notification only after verification
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'user_join',
-                    'username': self.user.username
-                }
-            )
+            # Register presence, then tell the others only after verification
+            await sync_to_async(presence.touch)(self.room_id, self.user.id, self.channel_name)
+            await self.send_to_others({
+                'type': 'user_join',
+                'username': self.user.username
+            })
             
             print(f"User {self.user.username} connected to room {self.room_id}")
             
@@ -57,16 +73,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         try:
             # ✅ Fire and forget: don't block shutdown
-            if hasattr(self, 'user') and self.user and self.user.is_authenticated:
+            if getattr(self, 'has_access', False):
+                await sync_to_async(presence.leave)(self.room_id, self.user.id, self.channel_name)
                 try:
                     asyncio.create_task(
-                        self.channel_layer.group_send(
-                            self.room_group_name,
-                            {
-                                'type': 'user_leave',
-                                'username': self.user.username
-                            }
-                        )
+                        self.send_to_others({
+                            'type': 'user_leave',
+                            'username': self.user.username
+                        })
                     )
                 except Exception as e:
                     print(f"Error scheduling leave event: {e}")
@@ -91,10 +105,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
             if message_type == 'message':
                 message_content = data.get('message', '').strip()
                 
-                if message_content:
+                if message_content and getattr(self, 'has_access', False):
                     # Save message to database
                     message_data = await self.save_message(message_content)
                     
+                    # Let the sender match its optimistic copy to the stored id
+                    if data.get('client_id'):
+                        await self.send(text_data=json.dumps({
+                            'type': 'ack',
+                            'client_id': data['client_id'],
+                            'message_id': str(message_data['id'])
+                        }))
+                    
                     # Send message to room group
                     await self.channel_layer.group_send(
                         self.room_group_name,
@@ -108,16 +130,40 @@ class ChatConsumer(AsyncWebsocketConsumer):
                         }
                     )
             
+            elif message_type == 'read':
+                # Client has displayed messages up to message_id
+                if getattr(self, 'has_access', False):
+                    try:
+                        up_to_id = int(data.get('message_id') or 0) or None
+                    except (TypeError, ValueError):
+                        return
+                    await self.mark_read(up_to_id)
+            
+            elif message_type == 'history':
+                # Backfill older messages for this socket only
+                if not getattr(self, 'has_access', False):
+                    return
+                try:
+                    history = await self.get_history(data.get('before'), data.get('limit', HISTORY_PAGE_SIZE))
+                except ValueError:
+                    await self.send(text_data=json.dumps({
+                        'type': 'error',
+                        'message': 'Invalid history cursor'
+                    }))
+                    return
+                await self.send(text_data=json.dumps({'type': 'history', **history}))
+            
+            elif message_type == 'heartbeat':
+                if getattr(self, 'has_access', False):
+                    await sync_to_async(presence.touch)(self.room_id, self.user.id, self.channel_name)
+            
             elif message_type == 'typing':
-                # Broadcast typing indicator
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
+                if getattr(self, 'has_access', False) and self.should_relay_typing(bool(data.get('is_typing'))):
+                    await self.send_to_others({
                         'type': 'typing_indicator',
                         'user': self.user.username,
-                        'is_typing': data.get('is_typing', False)
-                    }
-                )
+                        'is_typing': self.is_typing
+                    })
                 
         except json.JSONDecodeError:
             print("Invalid JSON received")
@@ -131,39 +177,65 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'message': event['message'],
             'sender': event['sender'],
             'sender_id': str(event['sender_id']),
-            'timestamp': event['timestamp']
+            'timestamp': event['timestamp'],
+            'message_id': event.get('message_id')
         }))
     
     async def typing_indicator(self, event):
-        # Send typing indicator to all except the sender
-        if event['user'] != self.user.username:
-            await self.send(text_data=json.dumps({
-                'type': 'typing',
-                'user': event['user'],
-                'is_typing': event['is_typing']
-            }))
+        # Only ever delivered to the other participants (see send_to_others)
+        await self.send(text_data=json.dumps({
+            'type': 'typing',
+            'user': event['user'],
+            'is_typing': event['is_typing']
+        }))
     
     async def user_join(self, event):
         # Notify users when someone joins
-        if event['username'] != self.user.username:
-            await self.send(text_data=json.dumps({
-                'type': 'user_join',
-                'username': event['username']
-            }))
+        await self.send(text_data=json.dumps({
+            'type': 'user_join',
+            'username': event['username']
+        }))
     
     async def user_leave(self, event):
         # Notify users when someone leaves
-        if event['username'] != self.user.username:
-            await self.send(text_data=json.dumps({
-                'type': 'user_leave',
-                'username': event['username']
-            }))
+        await self.send(text_data=json.dumps({
+            'type': 'user_leave',
+            'username': event['username']
+        }))
+    
+    async def send_to_others(self, event):
+        """
+        Deliver an event straight to the other participants' live channels
+        instead of fanning it out to the whole group, so senders never get
+        their own typing/presence events and nobody absent costs traffic.
+        """
+        for user_id, channel_name in await sync_to_async(presence.connections)(self.room_id):
+            if user_id != str(self.user.id):
+                await self.channel_layer.send(channel_name, event)
+    
+    def should_relay_typing(self, is_typing):
+        """
+        Throttle typing frames: 'started' goes out at most once per
+        TYPING_THROTTLE seconds while typing continues, 'stopped' only
+        if a 'started' was actually relayed.
+        """
+        now = time.monotonic()
+        was_typing = getattr(self, 'is_typing', False)
+        if is_typing:
+            if was_typing and now - self.typing_relayed_at < TYPING_THROTTLE:
+                return False
+            self.typing_relayed_at = now
+        elif not was_typing:
+            return False
+        self.is_typing = is_typing
+        return True
     
     @database_sync_to_async
     def verify_room_access(self):
         try:
-            room = ChatRoom.objects.get(id=self.room_id)
-            return self.user.is_authenticated and (self.user == room.advertiser or self.user == room.worker)
+            # Participant ids are cached for the connection's lifetime
+            self.room = ChatRoom.objects.only('id', 'advertiser_id', 'worker_id').get(id=self.room_id)
+            return self.user.is_authenticated and self.room.participant_role(self.user) is not None
         except ChatRoom.DoesNotExist:
             print(f"Room {self.room_id} does not exist")
             return False
@@ -172,20 +244,24 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return False
     
     @database_sync_to_async
-    def save_message(self, content):
-        from django.utils import timezone
-        
+    def get_history(self, before, limit):
+        messages, next_cursor = get_message_page(self.room_id, before=before or None, limit=limit)
+        return {
+            'messages': [serialize_message(m) for m in messages],
+            'next_cursor': next_cursor,
+        }
+    
+    @database_sync_to_async
+    def mark_read(self, up_to_id):
+        return mark_read(self.room, self.user, up_to_id)
+    
+    async def save_message(self, content):
         try:
-            room = ChatRoom.objects.get(id=self.room_id)
-            message = Message.objects.create(
-                chat_room=room,
-                sender=self.user,
-                content=content
-            )
-            
-            # Update room's last_message_at
-            room.last_message_at = timezone.now()
-            room.save()
+            # Also bumps last_message_at and the recipient's unread counter
+            if WRITE_BEHIND_WINDOW:
+                message = await get_write_behind().submit(self.room, self.user.id, content)
+            else:
+                message = (await database_sync_to_async(post_messages)([(self.room, self.user.id, content)]))[0]
             
             return {
                 'id': str(message.id),
@@ -193,4 +269,36 @@ class ChatConsumer(AsyncWebsocketConsumer):
             }
         except Exception as e:
             print(f"Error saving message: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+class UnreadConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes a user's unread counts as they change, replacing the unread-count
+    poll. Sends the current total on connect, then one update per change.
+    """
+
+    async def connect(self):
+        self.user = self.scope.get('user')
+        if not self.user or not self.user.is_authenticated:
+            await self.close()
+            return
+
+        self.group_name = user_group_name(self.user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        total = await database_sync_to_async(total_unread)(self.user.id)
+        await self.send(text_data=json.dumps({'type': 'unread', 'total': total}))
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def unread_update(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'unread',
+            'room_id': event['room_id'],
+            'room_unread': event['room_unread'],
+            'total': event['total'],
+        }))
@@ -0,0 +1,78 @@
+# chat/management/commands/rebuild_chat_unread.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+
+from chat.models import ChatRoom, Message
+
+FIELDS = ['advertiser_last_read_id', 'worker_last_read_id', 'advertiser_unread', 'worker_unread']
+
+
+def _last_read(participant):
+    """Newest message the participant received and has read, per room."""
+    return Subquery(
+        Message.objects.filter(chat_room=OuterRef('pk'), is_read=True)
+        .exclude(sender=OuterRef(participant))
+        .values('chat_room')
+        .annotate(last=Max('id'))
+        .values('last')[:1]
+    )
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-participant read cursors and unread counters on ChatRoom from Message.is_read'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show which rooms drifted without making changes',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of rooms updated per bulk_update',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING('DRY RUN MODE - No changes will be made')
+            )
+
+        unread = Q(messages__is_read=False)
+        rooms = ChatRoom.objects.annotate(
+            actual_advertiser_unread=Count('messages', filter=unread & ~Q(messages__sender=F('advertiser'))),
+            actual_worker_unread=Count('messages', filter=unread & ~Q(messages__sender=F('worker'))),
+            actual_advertiser_last_read=_last_read('advertiser'),
+            actual_worker_last_read=_last_read('worker'),
+        ).only('id', *FIELDS).order_by('id')
+
+        drifted = []
+        for room in rooms.iterator(chunk_size=options['batch_size']):
+            actual = (
+                room.actual_advertiser_last_read or 0,
+                room.actual_worker_last_read or 0,
+                room.actual_advertiser_unread,
+                room.actual_worker_unread,
+            )
+            stored = tuple(getattr(room, field) for field in FIELDS)
+            if actual == stored:
+                continue
+
+            self.stdout.write(
+                f'Room {room.id}: unread advertiser {stored[2]}->{actual[2]}, worker {stored[3]}->{actual[3]}'
+            )
+            for field, value in zip(FIELDS, actual):
+                setattr(room, field, value)
+            drifted.append(room)
+
+        if not dry_run and drifted:
+            with transaction.atomic():
+                ChatRoom.objects.bulk_update(drifted, FIELDS, batch_size=options['batch_size'])
+
+        verb = 'would be rebuilt' if dry_run else 'rebuilt'
+        self.stdout.write(self.style.SUCCESS(f'{len(drifted)} chat room counters {verb}'))
@@ -25,6 +25,13 @@ class ChatRoom(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     last_message_at = models.DateTimeField(auto_now_add=True)
+
+    # Per-participant read cursors (last message id read) and maintained
+    # unread counters; see chat.services.post_message / mark_read
+    advertiser_last_read_id = models.PositiveBigIntegerField(default=0)
+    worker_last_read_id = models.PositiveBigIntegerField(default=0)
+    advertiser_unread = models.PositiveIntegerField(default=0)
+    worker_unread = models.PositiveIntegerField(default=0)
     
     class Meta:
         unique_together = ('advertiser', 'worker')
@@ -39,9 +46,19 @@ class ChatRoom(models.Model):
             return self.worker
         return self.advertiser
     
+    def participant_role(self, user_or_id):
+        """'advertiser' or 'worker' for a participant, None for anyone else"""
+        user_id = getattr(user_or_id, 'pk', user_or_id)
+        if user_id == self.advertiser_id:
+            return 'advertiser'
+        if user_id == self.worker_id:
+            return 'worker'
+        return None
+
     def unread_count(self, user):
         """Get unread message count for a specific user"""
-        return self.messages.filter(is_read=False).exclude(sender=user).count()
+        role = self.participant_role(user)
+        return getattr(self, f'{role}_unread') if role else 0
 
 
 class Message(models.Model):
@@ -64,6 +81,10 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # History paging walks (timestamp, id) within a room
+            models.Index(fields=['chat_room', 'timestamp', 'id'], name='chat_message_room_ts_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender.username}: {self.content[:50]}"
\ No newline at end of file
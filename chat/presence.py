@@ -0,0 +1,130 @@
+# chat/presence.py
+"""
+Who is connected to which chat room.
+
+Each open ChatConsumer registers its channel under the room and refreshes it
+with heartbeats; entries not refreshed within PRESENCE_TTL count as gone, so
+crashed workers never leave users "online" for long. The registry lives on
+the same Redis as the channel layer, since the channels it names are only
+reachable through that layer: each room is a sorted set scored by last
+heartbeat, shared by every worker. Without a Redis channel layer (dev/tests,
+InMemoryChannelLayer) channels are per-process anyway, so the registry falls
+back to a cached dict guarded by a process-wide lock.
+
+Consumers use the registry to deliver typing and join/leave events straight
+to the other participants' channels; views use it to show who is online.
+"""
+import functools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import make_key
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_TTL = getattr(settings, "CHAT_PRESENCE_TTL", 60)
+HEARTBEAT_INTERVAL = getattr(settings, "CHAT_PRESENCE_HEARTBEAT", 20)
+
+
+def _room_key(room_id) -> str:
+    return make_key("chat", "presence", room_id)
+
+
+# Serialises read-modify-write of the dict fallback between consumer threads
+_local_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _redis_for(host):
+    import redis
+
+    if isinstance(host, dict):
+        host = host.get("address", "redis://localhost:6379")
+    if isinstance(host, (list, tuple)):
+        return redis.Redis(host=host[0], port=host[1])
+    return redis.Redis.from_url(host)
+
+
+def _redis():
+    """Connection to the channel layer's Redis, or None for other layers."""
+    layer = settings.CHANNEL_LAYERS.get("default", {})
+    if not layer.get("BACKEND", "").startswith("channels_redis"):
+        return None
+    hosts = layer.get("CONFIG", {}).get("hosts") or ["redis://localhost:6379"]
+    return _redis_for(hosts[0])
+
+
+def _member(user_id, channel_name) -> str:
+    # Ids are kept as strings so UUID pks compare equal however they were passed
+    return f"{user_id}|{channel_name}"
+
+
+def touch(room_id, user_id, channel_name) -> None:
+    """Register (or refresh) a connection's presence in a room."""
+    now = time.time()
+    try:
+        redis = _redis()
+        if redis is not None:
+            key = _room_key(room_id)
+            pipe = redis.pipeline()
+            pipe.zadd(key, {_member(user_id, channel_name): now})
+            pipe.expire(key, PRESENCE_TTL * 2)
+            pipe.execute()
+            return
+
+        with _local_lock:
+            entries = cache.get(_room_key(room_id)) or {}
+            entries[_member(user_id, channel_name)] = now
+            cache.set(_room_key(room_id), entries, PRESENCE_TTL * 2)
+    except Exception:
+        logger.warning("Failed to record presence in room %s", room_id, exc_info=True)
+
+
+def leave(room_id, user_id, channel_name) -> None:
+    try:
+        redis = _redis()
+        if redis is not None:
+            redis.zrem(_room_key(room_id), _member(user_id, channel_name))
+            return
+
+        with _local_lock:
+            entries = cache.get(_room_key(room_id)) or {}
+            if entries.pop(_member(user_id, channel_name), None) is not None:
+                cache.set(_room_key(room_id), entries, PRESENCE_TTL * 2)
+    except Exception:
+        logger.warning("Failed to clear presence in room %s", room_id, exc_info=True)
+
+
+def connections(room_id):
+    """Live (user_id, channel_name) pairs in a room; user_id is the pk as a string."""
+    cutoff = time.time() - PRESENCE_TTL
+    try:
+        redis = _redis()
+        if redis is not None:
+            key = _room_key(room_id)
+            pipe = redis.pipeline()
+            pipe.zremrangebyscore(key, "-inf", cutoff)
+            pipe.zrange(key, 0, -1)
+            members = [m.decode() if isinstance(m, bytes) else m for m in pipe.execute()[1]]
+        else:
+            entries = cache.get(_room_key(room_id)) or {}
+            members = [m for m, seen in entries.items() if seen >= cutoff]
+    except Exception:
+        logger.warning("Failed to read presence for room %s", room_id, exc_info=True)
+        return []
+
+    pairs = []
+    for member in members:
+        user_id, _, channel_name = member.partition("|")
+        if user_id and channel_name:
+            pairs.append((user_id, channel_name))
+    return pairs
+
+
+def online_user_ids(room_id) -> set:
+    """Ids (as strings; user pks are UUIDs) of users with a live connection to the room."""
+    return {user_id for user_id, _ in connections(room_id)}
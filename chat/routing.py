@@ -3,5 +3,6 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/chat/(?P<room_id>\d+)/$', consumers.ChatConsumer.as_asgi()),
+    re_path(r'ws/chat/unread/$', consumers.UnreadConsumer.as_asgi()),
 
 ]
\ No newline at end of file
@@ -0,0 +1,228 @@
+# chat/services.py
+"""
+Message history paging and unread bookkeeping.
+
+History is read newest-first by the (timestamp, id) keyset, so loading older
+messages stays an index range scan however long the room's history gets.
+Cursors are opaque strings naming the oldest message already delivered.
+
+Unread counts are maintained on ChatRoom per participant: post_message bumps
+the recipient's counter and mark_read moves the reader's cursor and recounts
+only what lies past it. Changes are pushed to the user's channel-layer group
+(see UnreadConsumer) instead of being polled.
+"""
+import base64
+import json
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Func, IntegerField, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
+
+from tasks.models import Task
+
+from .models import ChatRoom, Message
+
+logger = logging.getLogger(__name__)
+
+HISTORY_PAGE_SIZE = getattr(settings, "CHAT_HISTORY_PAGE_SIZE", 50)
+HISTORY_MAX_PAGE_SIZE = 200
+ROOM_LIST_PAGE_SIZE = getattr(settings, "CHAT_ROOM_LIST_PAGE_SIZE", 20)
+
+
+def encode_cursor(message) -> str:
+    raw = json.dumps([message.timestamp.isoformat(), message.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """(timestamp, id) from a cursor; raises ValueError if it is malformed."""
+    try:
+        timestamp, message_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        parsed = parse_datetime(timestamp)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid history cursor") from e
+    if parsed is None or not isinstance(message_id, int):
+        raise ValueError("Invalid history cursor")
+    return parsed, message_id
+
+
+def serialize_message(message) -> dict:
+    """Same shape the consumer broadcasts for live messages."""
+    return {
+        "message_id": str(message.id),
+        "message": message.content,
+        "sender": message.sender.username,
+        "sender_id": str(message.sender_id),
+        "timestamp": message.timestamp.isoformat(),
+    }
+
+
+def get_message_page(room_id, before=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Up to `limit` messages older than the `before` cursor (the latest ones if
+    None), returned oldest-first, plus the cursor for the next older page
+    (None when the start of the conversation has been reached).
+    """
+    limit = max(1, min(int(limit), HISTORY_MAX_PAGE_SIZE))
+    messages = (
+        Message.objects.filter(chat_room_id=room_id)
+        .select_related("sender")
+        .order_by("-timestamp", "-id")
+    )
+    if before:
+        timestamp, message_id = decode_cursor(before)
+        messages = messages.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id))
+
+    # One extra row tells us whether an older page exists
+    page = list(messages[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    page.reverse()
+
+    next_cursor = encode_cursor(page[0]) if has_more and page else None
+    return page, next_cursor
+
+
+def user_group_name(user_id) -> str:
+    """Channel-layer group every UnreadConsumer of a user joins."""
+    return f"chat_user_{user_id}"
+
+
+def total_unread(user_or_id) -> int:
+    """Unread messages across all of a user's rooms, summed from the room counters."""
+    user_id = getattr(user_or_id, "pk", user_or_id)
+    total = ChatRoom.objects.filter(
+        Q(advertiser_id=user_id, advertiser_unread__gt=0) | Q(worker_id=user_id, worker_unread__gt=0)
+    ).aggregate(
+        total=Sum(Case(When(advertiser_id=user_id, then=F("advertiser_unread")), default=F("worker_unread")))
+    )["total"]
+    return total or 0
+
+
+def push_unread(user_id, room_id) -> None:
+    """Send a user their current unread counts for one room and overall."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    room = ChatRoom.objects.filter(pk=room_id).only("advertiser_id", "worker_id", "advertiser_unread", "worker_unread").first()
+    try:
+        async_to_sync(channel_layer.group_send)(
+            user_group_name(user_id),
+            {
+                "type": "unread_update",
+                "room_id": room_id,
+                "room_unread": room.unread_count(user_id) if room else 0,
+                "total": total_unread(user_id),
+            },
+        )
+    except Exception:
+        # Counters are already persisted; the client catches up on its next load
+        logger.warning("Failed to push unread count to user %s", user_id, exc_info=True)
+
+
+def post_message(room, sender, content):
+    """Store a message and count it as unread for the other participant."""
+    return post_messages([(room, sender.pk, content)])[0]
+
+
+def post_messages(entries):
+    """
+    Store a batch of (room, sender_id, content) messages with one INSERT and
+    one UPDATE per room (last_message_at plus the recipients' unread
+    counters). `room` only needs id, advertiser_id and worker_id loaded.
+    Returns the saved messages in entry order.
+    """
+    messages = [
+        Message(chat_room_id=room.pk, sender_id=sender_id, content=content)
+        for room, sender_id, content in entries
+    ]
+
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+
+        rooms = {}
+        for (room, sender_id, _), message in zip(entries, messages):
+            recipient = "worker" if sender_id == room.advertiser_id else "advertiser"
+            state = rooms.setdefault(room.pk, {"room": room, "last": message.timestamp, "unread": {}})
+            state["last"] = max(state["last"], message.timestamp)
+            state["unread"][recipient] = state["unread"].get(recipient, 0) + 1
+
+        for room_id, state in rooms.items():
+            ChatRoom.objects.filter(pk=room_id).update(
+                last_message_at=state["last"],
+                **{f"{role}_unread": F(f"{role}_unread") + count for role, count in state["unread"].items()},
+            )
+            for role in state["unread"]:
+                recipient_id = getattr(state["room"], f"{role}_id")
+                transaction.on_commit(lambda user_id=recipient_id, room_id=room_id: push_unread(user_id, room_id))
+
+    return messages
+
+
+def mark_read(room, user, up_to_id=None) -> int:
+    """
+    Move the user's read cursor to `up_to_id` (the room's latest message if
+    None) and return what is still unread past it. Cursors never move back,
+    and never past the latest message: `up_to_id` comes from the client.
+
+    Counters are read from the locked row only; `room` may be a long-lived
+    instance (the consumer keeps one per connection) and is never updated.
+    """
+    role = room.participant_role(user)
+    if role is None:
+        return 0
+
+    cursor_field, unread_field = f"{role}_last_read_id", f"{role}_unread"
+    latest_id = room.messages.order_by("-id").values_list("id", flat=True).first() or 0
+    # A cursor beyond the latest message would hide everything posted until ids caught up
+    up_to_id = latest_id if up_to_id is None else min(up_to_id, latest_id)
+
+    with transaction.atomic():
+        # Serializes with post_message's counter bump on the same row
+        locked = ChatRoom.objects.select_for_update().only(cursor_field, unread_field).get(pk=room.pk)
+        cursor = getattr(locked, cursor_field)
+        if up_to_id <= cursor:
+            return getattr(locked, unread_field)
+
+        incoming = Message.objects.filter(chat_room_id=room.pk).exclude(sender_id=user.pk)
+        unread = incoming.filter(id__gt=up_to_id).count()
+        incoming.filter(id__gt=cursor, id__lte=up_to_id, is_read=False).update(is_read=True)
+        ChatRoom.objects.filter(pk=room.pk).update(**{cursor_field: up_to_id, unread_field: unread})
+        transaction.on_commit(lambda: push_unread(user.pk, room.pk))
+
+    return unread
+
+
+def room_list_queryset(user):
+    """
+    The user's rooms, newest activity first, each annotated in the same query
+    with `unread` (theirs), `last_message_preview` and `task_count` (distinct
+    tasks one participant has submitted to for the other).
+    """
+    latest_message = Message.objects.filter(chat_room=OuterRef("pk")).order_by("-timestamp", "-id")
+    shared_tasks = (
+        Task.objects.filter(
+            Q(advertiser=OuterRef("advertiser"), submissions__member=OuterRef("worker"))
+            | Q(advertiser=OuterRef("worker"), submissions__member=OuterRef("advertiser"))
+        )
+        .order_by()
+        .annotate(count=Func("pk", template="COUNT(DISTINCT %(expressions)s)", output_field=IntegerField()))
+        .values("count")
+    )
+
+    return (
+        ChatRoom.objects.filter(Q(advertiser=user) | Q(worker=user))
+        .select_related("advertiser", "worker")
+        .annotate(
+            unread=Case(When(advertiser=user, then=F("advertiser_unread")), default=F("worker_unread")),
+            last_message_preview=Subquery(latest_message.values("content")[:1]),
+            task_count=Coalesce(Subquery(shared_tasks, output_field=IntegerField()), 0),
+        )
+        .order_by("-last_message_at", "-id")
+    )
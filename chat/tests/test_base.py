@@ -0,0 +1,55 @@
+# chat/tests/test_base.py
+"""Shared fixtures for the chat app tests."""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+
+from chat.models import ChatRoom
+
+User = get_user_model()
+
+
+class ChatFixturesMixin:
+    """An advertiser-worker room plus a user who is in neither seat."""
+
+    password = 'testpass123'
+
+    @classmethod
+    def create_fixtures(cls):
+        cls.advertiser = User.objects.create_user(
+            username='chat_advertiser', email='advertiser@chat.test', password=cls.password
+        )
+        cls.worker = User.objects.create_user(
+            username='chat_worker', email='worker@chat.test', password=cls.password
+        )
+        cls.outsider = User.objects.create_user(
+            username='chat_outsider', email='outsider@chat.test', password=cls.password
+        )
+        cls.room = ChatRoom.objects.create(advertiser=cls.advertiser, worker=cls.worker)
+
+    def login(self, user):
+        self.client.force_login(user)
+        return self.client
+
+
+class ChatBaseTestCase(ChatFixturesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_fixtures()
+
+    def setUp(self):
+        # Presence and other cached state must not leak between tests
+        cache.clear()
+
+
+class ChatTransactionTestCase(ChatFixturesMixin, TransactionTestCase):
+    """
+    For consumer code that goes through database_sync_to_async, which closes
+    the connection between calls and so can't run inside TestCase's
+    wrapping transaction.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.create_fixtures()
@@ -0,0 +1,115 @@
+# chat/tests/test_history.py
+import json
+from unittest.mock import AsyncMock
+
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from django.utils import timezone
+
+from chat.consumers import ChatConsumer
+from chat.models import Message
+from chat.services import decode_cursor, encode_cursor, get_message_page
+
+from .test_base import ChatBaseTestCase, ChatTransactionTestCase
+
+
+def create_messages(room, sender, count):
+    return [
+        Message.objects.create(chat_room=room, sender=sender, content=f'message {i}')
+        for i in range(count)
+    ]
+
+
+class MessagePageTest(ChatBaseTestCase):
+
+    def test_cursor_round_trip(self):
+        message = create_messages(self.room, self.advertiser, 1)[0]
+        self.assertEqual(decode_cursor(encode_cursor(message)), (message.timestamp, message.id))
+
+    def test_malformed_cursor_raises(self):
+        for cursor in ('not-a-cursor', 'WzEsMl0=', ''):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_pages_walk_history_oldest_first(self):
+        messages = create_messages(self.room, self.advertiser, 5)
+
+        latest, cursor = get_message_page(self.room.id, limit=2)
+        self.assertEqual(latest, messages[3:])
+
+        older, cursor = get_message_page(self.room.id, before=cursor, limit=2)
+        self.assertEqual(older, messages[1:3])
+
+        oldest, cursor = get_message_page(self.room.id, before=cursor, limit=2)
+        self.assertEqual(oldest, messages[:1])
+        self.assertIsNone(cursor)
+
+    def test_timestamp_ties_are_paged_by_id(self):
+        messages = create_messages(self.room, self.advertiser, 5)
+        Message.objects.filter(chat_room=self.room).update(timestamp=timezone.now())
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = get_message_page(self.room.id, before=cursor, limit=2)
+            seen = page + seen
+            if cursor is None:
+                break
+
+        self.assertEqual([m.id for m in seen], [m.id for m in messages])
+
+
+class MessageHistoryViewTest(ChatBaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('chat:message_history', args=[self.room.id])
+
+    def test_returns_page_and_cursor(self):
+        messages = create_messages(self.room, self.advertiser, 3)
+
+        data = self.login(self.worker).get(self.url, {'limit': 2}).json()
+
+        self.assertEqual([m['message_id'] for m in data['messages']], [str(m.id) for m in messages[1:]])
+        self.assertEqual(data['next_cursor'], encode_cursor(messages[1]))
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.login(self.worker).get(self.url, {'before': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_outsider_is_denied(self):
+        response = self.login(self.outsider).get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+
+class ConsumerHistoryFrameTest(ChatTransactionTestCase):
+
+    def _consumer(self):
+        consumer = ChatConsumer()
+        consumer.user = self.worker
+        consumer.room_id = str(self.room.id)
+        consumer.has_access = True
+        consumer.send = AsyncMock()
+        return consumer
+
+    def _frame(self, consumer, **data):
+        async_to_sync(consumer.receive)(json.dumps({'type': 'history', **data}))
+        return json.loads(consumer.send.await_args.kwargs['text_data'])
+
+    def test_history_frame_pages_backwards(self):
+        messages = create_messages(self.room, self.advertiser, 3)
+        consumer = self._consumer()
+
+        first = self._frame(consumer, limit=2)
+        self.assertEqual(first['type'], 'history')
+        self.assertEqual([m['message_id'] for m in first['messages']], [str(m.id) for m in messages[1:]])
+
+        second = self._frame(consumer, limit=2, before=first['next_cursor'])
+        self.assertEqual([m['message_id'] for m in second['messages']], [str(messages[0].id)])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_history_frame_with_bad_cursor(self):
+        consumer = self._consumer()
+
+        reply = self._frame(consumer, before='not-a-cursor')
+
+        self.assertEqual(reply, {'type': 'error', 'message': 'Invalid history cursor'})
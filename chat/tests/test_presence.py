@@ -0,0 +1,162 @@
+# chat/tests/test_presence.py
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.urls import reverse
+
+from chat import presence
+from chat.consumers import TYPING_THROTTLE, ChatConsumer
+
+from .test_base import ChatBaseTestCase
+
+
+def make_consumer(user, room_id, channel_name):
+    consumer = ChatConsumer()
+    consumer.user = user
+    consumer.room_id = str(room_id)
+    consumer.channel_name = channel_name
+    consumer.channel_layer = MagicMock()
+    consumer.channel_layer.send = AsyncMock()
+    return consumer
+
+
+class PresenceRegistryTest(ChatBaseTestCase):
+
+    def test_connections_keep_uuid_ids_as_strings(self):
+        presence.touch(self.room.id, self.advertiser.id, 'chan-a')
+        presence.touch(self.room.id, self.worker.id, 'chan-w')
+
+        self.assertCountEqual(
+            presence.connections(self.room.id),
+            [(str(self.advertiser.id), 'chan-a'), (str(self.worker.id), 'chan-w')],
+        )
+        self.assertEqual(
+            presence.online_user_ids(self.room.id),
+            {str(self.advertiser.id), str(self.worker.id)},
+        )
+
+    def test_room_id_type_does_not_matter(self):
+        # Consumers see the URL kwarg (str), views the model pk (int)
+        presence.touch(str(self.room.id), self.worker.id, 'chan-w')
+        self.assertEqual(presence.online_user_ids(self.room.id), {str(self.worker.id)})
+
+    def test_leave_removes_connection(self):
+        presence.touch(self.room.id, self.worker.id, 'chan-w')
+        presence.leave(self.room.id, self.worker.id, 'chan-w')
+        self.assertEqual(presence.connections(self.room.id), [])
+
+    def test_entries_without_heartbeat_expire(self):
+        with patch('chat.presence.time.time', return_value=1000.0):
+            presence.touch(self.room.id, self.worker.id, 'chan-w')
+
+        with patch('chat.presence.time.time', return_value=1000.0 + presence.PRESENCE_TTL + 1):
+            self.assertEqual(presence.connections(self.room.id), [])
+
+    def test_concurrent_touches_are_not_lost(self):
+        threads = [
+            threading.Thread(target=presence.touch, args=(self.room.id, self.worker.id, f'chan-{i}'))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(presence.connections(self.room.id)), 20)
+
+
+class PresenceBackendTest(ChatBaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        presence._redis_for.cache_clear()
+        self.addCleanup(presence._redis_for.cache_clear)
+
+    def test_in_memory_layer_keeps_registry_local(self):
+        self.assertIsNone(presence._redis())
+
+    @override_settings(CHANNEL_LAYERS={
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': ['redis://channels.test:6379/3']},
+        },
+    })
+    def test_registry_shares_the_channel_layer_redis(self):
+        # Registered channels are only reachable through the layer, so every
+        # worker has to see the same registry even when the cache is LocMem
+        client = MagicMock()
+        with patch('redis.Redis.from_url', return_value=client) as from_url:
+            presence.touch(self.room.id, self.worker.id, 'chan-w')
+
+        from_url.assert_called_once_with('redis://channels.test:6379/3')
+        client.pipeline.return_value.zadd.assert_called_once()
+        key, members = client.pipeline.return_value.zadd.call_args.args
+        self.assertEqual(key, presence._room_key(self.room.id))
+        self.assertIn(f'{self.worker.id}|chan-w', members)
+
+
+class ChatConsumerDeliveryTest(ChatBaseTestCase):
+
+    def test_send_to_others_skips_own_channels(self):
+        presence.touch(self.room.id, self.advertiser.id, 'chan-a')
+        presence.touch(self.room.id, self.advertiser.id, 'chan-a-second-tab')
+        presence.touch(self.room.id, self.worker.id, 'chan-w')
+        consumer = make_consumer(self.advertiser, self.room.id, 'chan-a')
+        event = {'type': 'typing_indicator', 'user': 'chat_advertiser', 'is_typing': True}
+
+        async_to_sync(consumer.send_to_others)(event)
+
+        consumer.channel_layer.send.assert_awaited_once_with('chan-w', event)
+
+    def test_send_to_others_with_nobody_else_present(self):
+        presence.touch(self.room.id, self.advertiser.id, 'chan-a')
+        consumer = make_consumer(self.advertiser, self.room.id, 'chan-a')
+
+        async_to_sync(consumer.send_to_others)({'type': 'user_join', 'username': 'chat_advertiser'})
+
+        consumer.channel_layer.send.assert_not_awaited()
+
+
+class TypingThrottleTest(ChatBaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.consumer = make_consumer(self.worker, self.room.id, 'chan-w')
+
+    def relay(self, is_typing, at):
+        with patch('chat.consumers.time.monotonic', return_value=at):
+            return self.consumer.should_relay_typing(is_typing)
+
+    def test_started_is_throttled_while_typing_continues(self):
+        self.assertTrue(self.relay(True, 100.0))
+        self.assertFalse(self.relay(True, 101.0))
+        self.assertTrue(self.relay(True, 100.0 + TYPING_THROTTLE + 0.1))
+
+    def test_stopped_only_after_a_relayed_start(self):
+        self.assertFalse(self.relay(False, 100.0))
+        self.assertTrue(self.relay(True, 101.0))
+        self.assertTrue(self.relay(False, 102.0))
+        self.assertFalse(self.relay(False, 103.0))
+
+
+class PresenceViewsTest(ChatBaseTestCase):
+
+    def test_chat_room_shows_other_user_online(self):
+        presence.touch(self.room.id, self.worker.id, 'chan-w')
+        response = self.login(self.advertiser).get(reverse('chat:room', args=[self.room.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['other_user_online'])
+
+    def test_room_presence_lists_connected_participants(self):
+        presence.touch(self.room.id, self.worker.id, 'chan-w')
+        response = self.login(self.advertiser).get(reverse('chat:room_presence', args=[self.room.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'online_user_ids': [str(self.worker.id)]})
+
+    def test_room_presence_denied_to_outsiders(self):
+        response = self.login(self.outsider).get(reverse('chat:room_presence', args=[self.room.id]))
+        self.assertEqual(response.status_code, 403)
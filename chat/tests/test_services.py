@@ -0,0 +1,140 @@
+# chat/tests/test_services.py
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from chat.models import ChatRoom, Message
+from chat.services import mark_read, post_message, post_messages, room_list_queryset
+from tasks.models import Submission, Task
+
+from .test_base import ChatBaseTestCase
+
+
+class UnreadCountersTest(ChatBaseTestCase):
+
+    def _room(self):
+        return ChatRoom.objects.get(pk=self.room.pk)
+
+    def test_post_messages_bumps_recipient_counters(self):
+        post_messages([
+            (self.room, self.advertiser.id, 'one'),
+            (self.room, self.advertiser.id, 'two'),
+            (self.room, self.worker.id, 'reply'),
+        ])
+
+        room = self._room()
+        self.assertEqual(room.worker_unread, 2)
+        self.assertEqual(room.advertiser_unread, 1)
+        self.assertEqual(room.last_message_at, Message.objects.latest('id').timestamp)
+
+    def test_post_messages_returns_messages_in_entry_order(self):
+        messages = post_messages([
+            (self.room, self.advertiser.id, 'first'),
+            (self.room, self.worker.id, 'second'),
+        ])
+        self.assertEqual([m.content for m in messages], ['first', 'second'])
+        self.assertTrue(all(m.pk for m in messages))
+
+    def test_mark_read_clears_counter_and_flags(self):
+        post_message(self.room, self.advertiser, 'hello')
+        post_message(self.room, self.advertiser, 'again')
+
+        self.assertEqual(mark_read(self._room(), self.worker), 0)
+
+        room = self._room()
+        self.assertEqual(room.worker_unread, 0)
+        self.assertEqual(room.worker_last_read_id, Message.objects.latest('id').id)
+        self.assertFalse(Message.objects.filter(is_read=False).exists())
+
+    def test_mark_read_up_to_message_leaves_later_ones_unread(self):
+        first = post_message(self.room, self.advertiser, 'one')
+        post_message(self.room, self.advertiser, 'two')
+
+        self.assertEqual(mark_read(self._room(), self.worker, first.id), 1)
+        self.assertEqual(self._room().worker_unread, 1)
+
+    def test_cursor_never_moves_back(self):
+        first = post_message(self.room, self.advertiser, 'one')
+        second = post_message(self.room, self.advertiser, 'two')
+        mark_read(self._room(), self.worker, second.id)
+
+        self.assertEqual(mark_read(self._room(), self.worker, first.id), 0)
+        self.assertEqual(self._room().worker_last_read_id, second.id)
+
+    def test_cursor_is_clamped_to_latest_message(self):
+        latest = post_message(self.room, self.advertiser, 'one')
+
+        self.assertEqual(mark_read(self._room(), self.worker, latest.id + 10**9), 0)
+        self.assertEqual(self._room().worker_last_read_id, latest.id)
+
+        post_message(self.room, self.advertiser, 'two')
+        self.assertEqual(self._room().worker_unread, 1)
+        self.assertEqual(mark_read(self._room(), self.worker), 0)
+
+    def test_repeated_reads_on_a_long_lived_room(self):
+        # The consumer keeps one partially loaded room for the whole connection
+        cached = ChatRoom.objects.only('id', 'advertiser_id', 'worker_id').get(pk=self.room.pk)
+
+        post_message(self.room, self.advertiser, 'one')
+        mark_read(cached, self.worker)
+        post_message(self.room, self.advertiser, 'two')
+        self.assertEqual(self._room().worker_unread, 1)
+
+        mark_read(cached, self.worker)
+
+        self.assertEqual(self._room().worker_unread, 0)
+        self.assertFalse(Message.objects.filter(is_read=False).exists())
+
+    def test_outsider_read_is_ignored(self):
+        post_message(self.room, self.advertiser, 'hello')
+        self.assertEqual(mark_read(self._room(), self.outsider), 0)
+        self.assertEqual(self._room().worker_unread, 1)
+
+
+class RoomListQuerysetTest(ChatBaseTestCase):
+
+    def _task(self, advertiser, title):
+        return Task.objects.create(
+            advertiser=advertiser,
+            title=title,
+            description='Chat test task',
+            payout_per_slot=Decimal('5.00'),
+            total_slots=3,
+            deadline=timezone.now() + timedelta(days=7),
+            proof_instructions='Provide proof of completion',
+        )
+
+    def _submit(self, task, member):
+        return Submission.objects.create(task=task, member=member, proof_text='Done')
+
+    def test_annotations(self):
+        post_message(self.room, self.advertiser, 'first')
+        post_message(self.room, self.advertiser, 'latest')
+        self._submit(self._task(self.advertiser, 'Posted by advertiser'), self.worker)
+        self._submit(self._task(self.advertiser, 'Also by advertiser'), self.worker)
+        self._submit(self._task(self.worker, 'Posted by worker'), self.advertiser)
+        self._submit(self._task(self.advertiser, 'Someone else did it'), self.outsider)
+
+        worker_room = room_list_queryset(self.worker).get(pk=self.room.pk)
+        advertiser_room = room_list_queryset(self.advertiser).get(pk=self.room.pk)
+
+        self.assertEqual(worker_room.unread, 2)
+        self.assertEqual(advertiser_room.unread, 0)
+        self.assertEqual(worker_room.last_message_preview, 'latest')
+        self.assertEqual(worker_room.task_count, 3)
+
+    def test_room_without_messages_or_tasks(self):
+        room = room_list_queryset(self.worker).get(pk=self.room.pk)
+
+        self.assertEqual(room.unread, 0)
+        self.assertIsNone(room.last_message_preview)
+        self.assertEqual(room.task_count, 0)
+
+    def test_only_own_rooms_newest_activity_first(self):
+        other = ChatRoom.objects.create(advertiser=self.advertiser, worker=self.outsider)
+        post_message(self.room, self.worker, 'older')
+        post_message(other, self.outsider, 'newer')
+
+        self.assertEqual(list(room_list_queryset(self.advertiser)), [other, self.room])
+        self.assertEqual(list(room_list_queryset(self.worker)), [self.room])
@@ -0,0 +1,56 @@
+# chat/tests/test_write_behind.py
+import asyncio
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from chat.write_behind import MessageWriteBehind
+
+
+def fake_post_messages(entries):
+    return [f"saved:{content}" for _, _, content in entries]
+
+
+@patch('chat.write_behind.database_sync_to_async', lambda func: lambda *args: asyncio.sleep(0, func(*args)))
+class MessageWriteBehindTest(SimpleTestCase):
+
+    async def test_messages_within_window_share_one_write(self):
+        buffer = MessageWriteBehind(window=0.01, max_batch=100)
+
+        with patch('chat.write_behind.post_messages', side_effect=fake_post_messages) as mock_post:
+            results = await asyncio.gather(
+                buffer.submit('room', 'user-a', 'one'),
+                buffer.submit('room', 'user-b', 'two'),
+            )
+
+        self.assertEqual(results, ['saved:one', 'saved:two'])
+        mock_post.assert_called_once_with([('room', 'user-a', 'one'), ('room', 'user-b', 'two')])
+
+    async def test_full_batch_flushes_without_waiting_for_window(self):
+        buffer = MessageWriteBehind(window=60, max_batch=2)
+
+        with patch('chat.write_behind.post_messages', side_effect=fake_post_messages) as mock_post:
+            results = await asyncio.wait_for(
+                asyncio.gather(
+                    buffer.submit('room', 'user-a', 'one'),
+                    buffer.submit('room', 'user-a', 'two'),
+                ),
+                timeout=1,
+            )
+
+        self.assertEqual(results, ['saved:one', 'saved:two'])
+        mock_post.assert_called_once()
+        buffer._timer.cancel()
+
+    async def test_failed_write_reaches_every_sender(self):
+        buffer = MessageWriteBehind(window=0.01, max_batch=100)
+
+        with patch('chat.write_behind.post_messages', side_effect=RuntimeError('db down')):
+            results = await asyncio.gather(
+                buffer.submit('room', 'user-a', 'one'),
+                buffer.submit('room', 'user-b', 'two'),
+                return_exceptions=True,
+            )
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
@@ -6,6 +6,8 @@ app_name = 'chat'
 urlpatterns = [
     path('', views.chat_room_list, name='room_list'),
     path('room/<int:room_id>/', views.chat_room, name='room'),
+    path('room/<int:room_id>/messages/', views.message_history, name='message_history'),
+    path('room/<int:room_id>/presence/', views.room_presence, name='room_presence'),
     path('create/<int:user_id>/', views.get_or_create_room, name='create_room'),
     path('api/unread-count/', views.get_unread_count, name='unread_count'),
 ]
\ No newline at end of file
@@ -1,30 +1,32 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import JsonResponse
-from .models import ChatRoom, Message
+from . import presence
+from .models import ChatRoom
+from .services import (
+    HISTORY_PAGE_SIZE,
+    ROOM_LIST_PAGE_SIZE,
+    get_message_page,
+    mark_read,
+    room_list_queryset,
+    serialize_message,
+    total_unread,
+)
 from tasks.models import Task
 
 
+@login_required
 def chat_room_list(request):
     """List all chat rooms for the current user"""
-    rooms = (
-        ChatRoom.objects.filter(
-            Q(advertiser=request.user) | Q(worker=request.user)
-        )
-        .select_related('advertiser', 'worker')
-        .prefetch_related('messages')
-    )
-
-    # Add a custom attribute: task_count (number of shared tasks)
-    for room in rooms:
-        room.task_count = Task.objects.filter(
-            Q(advertiser=room.advertiser, submissions__member=room.worker)
-            | Q(advertiser=room.worker, submissions__member=room.advertiser)
-        ).distinct().count()
+    # One query per page: unread, last message preview and shared-task count are annotated
+    paginator = Paginator(room_list_queryset(request.user), ROOM_LIST_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
 
     context = {
-        'rooms': rooms,
+        'rooms': page_obj.object_list,
+        'page_obj': page_obj,
     }
     return render(request, 'chat/room_list.html', context)
 
@@ -36,7 +38,8 @@ def chat_room(request, room_id):
     if request.user not in [room.advertiser, room.worker]:
         return redirect('chat:room_list')
     
-    messages = room.messages.select_related('sender').all()
+    # Only the latest page; older history is fetched on demand
+    messages, history_cursor = get_message_page(room.id)
     advertiser = room.advertiser
     worker = room.worker
 
@@ -48,21 +51,53 @@ def chat_room(request, room_id):
 
     
     # Mark messages as read
-    Message.objects.filter(
-        chat_room=room,
-        is_read=False
-    ).exclude(sender=request.user).update(is_read=True)
+    mark_read(room, request.user)
     
     context = {
         'room': room,
         'room_name': str(room.id), 
         'messages': messages,
+        'history_cursor': history_cursor,
         'tasks': tasks,
-        'other_user': room.get_other_user(request.user)
+        'other_user': room.get_other_user(request.user),
+        'other_user_online': str(room.get_other_user(request.user).pk) in presence.online_user_ids(room.id),
+        'presence_heartbeat': presence.HEARTBEAT_INTERVAL,
     }
     return render(request, 'chat/chat_room.html', context)
 
 
+@login_required
+def message_history(request, room_id):
+    '''API endpoint for older messages: ?before=<cursor>&limit=<n>'''
+    room = get_object_or_404(ChatRoom, id=room_id)
+    if request.user.id not in (room.advertiser_id, room.worker_id):
+        return JsonResponse({'error': 'Access denied'}, status=403)
+
+    try:
+        messages, next_cursor = get_message_page(
+            room.id,
+            before=request.GET.get('before') or None,
+            limit=request.GET.get('limit', HISTORY_PAGE_SIZE),
+        )
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor or limit'}, status=400)
+
+    return JsonResponse({
+        'messages': [serialize_message(m) for m in messages],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+def room_presence(request, room_id):
+    '''API endpoint listing which participants are connected to a room'''
+    room = get_object_or_404(ChatRoom, id=room_id)
+    if request.user.id not in (room.advertiser_id, room.worker_id):
+        return JsonResponse({'error': 'Access denied'}, status=403)
+
+    return JsonResponse({'online_user_ids': sorted(presence.online_user_ids(room.id))})
+
+
 @login_required
 def get_or_create_room(request, user_id):
     '''
@@ -86,9 +121,4 @@ def get_or_create_room(request, user_id):
 @login_required
 def get_unread_count(request):
     '''API endpoint to get unread message count'''
-    count = Message.objects.filter(
-        Q(chat_room__advertiser=request.user) | Q(chat_room__worker=request.user),
-        is_read=False
-    ).exclude(sender=request.user).count()
-    
-    return JsonResponse({'unread_count': count})
\ No newline at end of file
+    return JsonResponse({'unread_count': total_unread(request.user)})
\ No newline at end of file
@@ -0,0 +1,80 @@
+# chat/write_behind.py
+"""
+Optional write-behind buffer for chat messages.
+
+With CHAT_WRITE_BEHIND_MS set, messages sent within that window by any
+connection in this process are stored together through one post_messages()
+call (a bulk INSERT plus one UPDATE per room) instead of one transaction per
+message. Each sender still waits for its own row, so acks and broadcasts
+carry real message ids; the cost is up to one window of extra latency.
+"""
+import asyncio
+import logging
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+
+from .services import post_messages
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_WINDOW = getattr(settings, "CHAT_WRITE_BEHIND_MS", 0) / 1000
+WRITE_BEHIND_MAX_BATCH = getattr(settings, "CHAT_WRITE_BEHIND_MAX_BATCH", 100)
+
+
+class MessageWriteBehind:
+    def __init__(self, window=WRITE_BEHIND_WINDOW, max_batch=WRITE_BEHIND_MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []
+        self._timer = None
+        self._flushes = set()  # Strong refs so running flushes aren't garbage collected
+
+    async def submit(self, room, sender_id, content):
+        """Queue a message and wait until the batch holding it is stored."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((room, sender_id, content), future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.ensure_future(self._flush_after_window())
+        return await future
+
+    def _flush_now(self):
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        self._flush_now()
+
+    async def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            messages = await database_sync_to_async(post_messages)([entry for entry, _ in batch])
+        except Exception as e:
+            logger.exception("Failed to store %s buffered chat messages", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), message in zip(batch, messages):
+            if not future.done():
+                future.set_result(message)
+
+
+_write_behind = None
+
+
+def get_write_behind():
+    """Process-wide buffer, created on first use inside the event loop."""
+    global _write_behind
+    if _write_behind is None:
+        _write_behind = MessageWriteBehind()
+    return _write_behind
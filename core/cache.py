@@ -0,0 +1,100 @@
+# core/cache.py
+"""
+Cache-aside helpers over the default Django cache.
+
+Callers read through get_or_set() (or decorate a loader with @cached) and
+invalidate explicitly when the underlying rows change, usually from a model
+signal. Cache failures never propagate: a broken cache behaves like a miss
+so the loader still answers.
+"""
+import functools
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Stored in place of None so "cached as nothing" is distinguishable from a miss
+_NONE = "__cache_none__"
+_MISSING = object()
+
+
+def make_key(*parts) -> str:
+    """Colon-joined key from its parts, e.g. make_key("users", "dashboard", 42)."""
+    return ":".join(str(part) for part in parts)
+
+
+def get_or_set(key: str, loader, timeout=None, cache_none: bool = False):
+    """
+    Return the cached value for `key`, calling `loader()` and caching its
+    result on a miss.
+
+    `timeout` is seconds (None uses the cache default) or a callable taking the
+    loaded value and returning seconds, for values that carry their own expiry.
+    None results are only cached when `cache_none` is set.
+    """
+    try:
+        value = cache.get(key, _MISSING)
+    except Exception:
+        logger.warning("Cache read failed for %s", key, exc_info=True)
+        value = _MISSING
+
+    if value is not _MISSING:
+        return None if value == _NONE else value
+
+    value = loader()
+    if value is None and not cache_none:
+        return None
+
+    seconds = timeout(value) if callable(timeout) else timeout
+    try:
+        cache.set(key, _NONE if value is None else value, seconds)
+    except Exception:
+        logger.warning("Cache write failed for %s", key, exc_info=True)
+    return value
+
+
+def invalidate(*keys: str) -> None:
+    """Drop cached entries now."""
+    try:
+        cache.delete_many(keys)
+    except Exception:
+        logger.warning("Cache invalidation failed for %s", keys, exc_info=True)
+
+
+def invalidate_on_commit(*keys: str) -> None:
+    """
+    Drop cached entries now and again once the current transaction commits,
+    so a concurrent reader can't re-cache pre-commit state.
+    """
+    invalidate(*keys)
+    transaction.on_commit(lambda: invalidate(*keys))
+
+
+def cached(key, timeout=None, cache_none: bool = False):
+    """
+    Decorator form of get_or_set(). `key` builds the cache key from the
+    function's arguments. The wrapper exposes `.invalidate(*args, **kwargs)`
+    for the same arguments, and `.uncached` for the original function.
+
+        @cached(lambda user_id: make_key("referrals", "stats", user_id), timeout=60)
+        def referral_stats(user_id): ...
+
+        referral_stats.invalidate(user.pk)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_set(
+                key(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                timeout=timeout,
+                cache_none=cache_none,
+            )
+
+        wrapper.invalidate = lambda *args, **kwargs: invalidate_on_commit(key(*args, **kwargs))
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
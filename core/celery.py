@@ -13,6 +13,7 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+app.autodiscover_tasks(related_name='celery_tasks')
 
 # Celery beat schedule for periodic tasks
 app.conf.beat_schedule = {
@@ -24,6 +25,30 @@ app.conf.beat_schedule = {
         'task': 'wallets.celery_tasks.daily_wallet_audit',
         'schedule': 60.0 * 60 * 24,  # Daily
     },
+    'fold-platform-fees-every-minute': {
+        'task': 'wallets.celery_tasks.fold_platform_fees',
+        'schedule': 60.0,  # Every minute
+    },
+    'schedule-subscription-expiries': {
+        'task': 'subscriptions.celery_tasks.schedule_upcoming_expiries',
+        'schedule': 60.0 * 5,  # Every 5 minutes (horizon is 10)
+    },
+    'sweep-expired-subscriptions': {
+        'task': 'subscriptions.celery_tasks.sweep_expired_subscriptions',
+        'schedule': 60.0 * 5,  # Every 5 minutes
+    },
+    'drain-webhook-events': {
+        'task': 'payments.celery_tasks.drain_webhook_events',
+        'schedule': 30.0,  # Every 30 seconds (retries, missed notifications)
+    },
+    'reconcile-payment-intents': {
+        'task': 'payments.celery_tasks.reconcile_payment_intents',
+        'schedule': 60.0 * 5,  # Every 5 minutes
+    },
+    'reconcile-pending-payments': {
+        'task': 'payments.celery_tasks.reconcile_pending_payments',
+        'schedule': 60.0 * 15,  # Every 15 minutes
+    },
 }
 
 app.conf.timezone = 'UTC'
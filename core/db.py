@@ -0,0 +1,93 @@
+# core/db.py
+"""
+Per-process database connection usage.
+
+Counts requests and connection_created signals per alias, so the reuse rate
+of persistent connections can be checked. With DB_CONN_MODE=pool Django sends
+connection_created on every checkout from the pool, so the signal count says
+nothing about reuse there; opened connections and reuse come from the psycopg
+pool's own statistics instead.
+"""
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_stats = defaultdict(int)
+_opened = defaultdict(int)
+_stats_lock = threading.Lock()
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    with _stats_lock:
+        _opened[connection.alias] += 1
+    logger.debug("Opened database connection %s (pid %s)", connection.alias, os.getpid())
+
+
+def _on_request_started(sender, **kwargs):
+    with _stats_lock:
+        _stats["requests"] += 1
+
+
+connection_created.connect(_on_connection_created, dispatch_uid="core_db_connection_created")
+request_started.connect(_on_request_started, dispatch_uid="core_db_request_started")
+
+
+def _pool_stats(alias: str) -> Dict[str, Any]:
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return {}
+    try:
+        return dict(pool.get_stats())
+    except Exception:
+        logger.warning("Could not read pool stats for %s", alias, exc_info=True)
+        return {}
+
+
+def connection_metrics() -> Dict[str, Any]:
+    """Snapshot of connection usage in this process."""
+    with _stats_lock:
+        requests = _stats["requests"]
+        opened = dict(_opened)
+
+    databases = {}
+    for alias, db_settings in settings.DATABASES.items():
+        count = opened.get(alias, 0)
+        if db_settings.get("OPTIONS", {}).get("pool"):
+            pool = _pool_stats(alias)
+            pool_opened = pool.get("connections_num")
+            checkouts = pool.get("requests_num")
+            databases[alias] = {
+                "checkouts": count,
+                "connections_opened": pool_opened,
+                "reuse_ratio": None,
+                # Share of pool checkouts served by an already open connection
+                "pool_reuse_ratio": (
+                    round(1 - pool_opened / checkouts, 3) if checkouts and pool_opened is not None else None
+                ),
+                "conn_max_age": db_settings.get("CONN_MAX_AGE", 0),
+                "pool": pool,
+            }
+            continue
+
+        databases[alias] = {
+            "connections_opened": count,
+            # Share of requests served without opening a connection
+            "reuse_ratio": round(1 - count / requests, 3) if requests else None,
+            "conn_max_age": db_settings.get("CONN_MAX_AGE", 0),
+            "pool": {},
+        }
+    return {
+        "pid": os.getpid(),
+        "mode": getattr(settings, "DB_CONN_MODE", "none"),
+        "requests": requests,
+        "databases": databases,
+    }
@@ -1,3 +1,128 @@
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
 from django.test import TestCase
+from django.urls import reverse
+
+from core.db import connection_metrics
+from payments.gateways import record_latency
+
+User = get_user_model()
+
+
+class ConnectionMetricsTest(TestCase):
+    """Per-process connection counters behind the db-metrics endpoint."""
+
+    def test_counts_requests_and_opened_connections(self):
+        before = connection_metrics()
+
+        for _ in range(4):
+            request_started.send(sender=self.__class__)
+        connection_created.send(sender=connection.__class__, connection=connection)
+
+        after = connection_metrics()
+        self.assertEqual(after['requests'] - before['requests'], 4)
+        self.assertEqual(
+            after['databases']['default']['connections_opened']
+            - before['databases']['default']['connections_opened'],
+            1,
+        )
+
+    def test_reuse_ratio(self):
+        request_started.send(sender=self.__class__)
+        metrics = connection_metrics()
+        default = metrics['databases']['default']
+
+        expected = round(1 - default['connections_opened'] / metrics['requests'], 3)
+        self.assertEqual(default['reuse_ratio'], expected)
+
+    def test_pool_mode_reports_reuse_from_pool_stats(self):
+        """With DB_CONN_MODE=pool every checkout sends connection_created"""
+        pool = Mock()
+        pool.get_stats.return_value = {'pool_size': 2, 'connections_num': 2, 'requests_num': 40}
+        pooled = {**settings.DATABASES['default'].get('OPTIONS', {}), 'pool': {'min_size': 2}}
+
+        with patch.dict(settings.DATABASES['default'], {'OPTIONS': pooled}), \
+                patch('core.db.connections') as mock_connections:
+            mock_connections.__getitem__.return_value = Mock(pool=pool)
+            for _ in range(3):
+                connection_created.send(sender=connection.__class__, connection=connection)
+            default = connection_metrics()['databases']['default']
+
+        self.assertIsNone(default['reuse_ratio'])
+        self.assertEqual(default['connections_opened'], 2)
+        self.assertEqual(default['pool_reuse_ratio'], 0.95)
+        self.assertEqual(default['pool']['pool_size'], 2)
+        self.assertGreaterEqual(default['checkouts'], 3)
+
+    def test_pool_mode_before_any_checkout(self):
+        pooled = {**settings.DATABASES['default'].get('OPTIONS', {}), 'pool': True}
+
+        with patch.dict(settings.DATABASES['default'], {'OPTIONS': pooled}), \
+                patch('core.db.connections') as mock_connections:
+            mock_connections.__getitem__.return_value = Mock(pool=None)
+            default = connection_metrics()['databases']['default']
+
+        self.assertIsNone(default['connections_opened'])
+        self.assertIsNone(default['pool_reuse_ratio'])
+
+
+class DbMetricsViewTest(TestCase):
+
+    def setUp(self):
+        self.url = reverse('db_metrics')
+
+    def test_requires_staff(self):
+        user = User.objects.create_user(username='member', email='member@test.com', password='pass12345')
+        self.client.force_login(user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_returns_metrics_for_staff(self):
+        staff = User.objects.create_user(
+            username='staff', email='staff@test.com', password='pass12345', is_staff=True
+        )
+        self.client.force_login(staff)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn('default', data['databases'])
+        self.assertGreaterEqual(data['requests'], 1)
+
+
+class GatewayMetricsViewTest(TestCase):
+
+    def setUp(self):
+        self.url = reverse('gateway_metrics')
+
+    def test_requires_staff(self):
+        user = User.objects.create_user(username='member', email='member@test.com', password='pass12345')
+        self.client.force_login(user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_returns_gateway_latency_for_staff(self):
+        staff = User.objects.create_user(
+            username='staff', email='staff@test.com', password='pass12345', is_staff=True
+        )
+        self.client.force_login(staff)
+        record_latency('metricsgw', 'GET', 40.0)
+        record_latency('metricsgw', 'GET', 20.0, failed=True)
+
+        response = self.client.get(self.url)
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()['metricsgw.GET']
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['avg_ms'], 30.0)
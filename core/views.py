@@ -1,3 +1,18 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 
-# Create your views here.
+from payments.gateways import gateway_metrics as payment_gateway_metrics
+
+from .db import connection_metrics
+
+
+@staff_member_required
+def db_metrics(request):
+    """Connection usage for the worker process that served this request."""
+    return JsonResponse(connection_metrics())
+
+
+@staff_member_required
+def gateway_metrics(request):
+    """Payment gateway call counts and latency for the worker process that served this request."""
+    return JsonResponse(payment_gateway_metrics())
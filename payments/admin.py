@@ -1,7 +1,7 @@
 # payments/admin.py
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import PaymentGateway, PaymentTransaction, PaystackTransaction, WebhookEvent, FlutterwaveTransaction, MonnifyTransaction
+from .models import PaymentGateway, PaymentTransaction, PaystackTransaction, WebhookEvent, FlutterwaveTransaction, MonnifyTransaction, ReconciliationRun, TransferRecipient
 
  
 @admin.register(PaymentGateway)
@@ -82,17 +82,28 @@ class FlutterwaveTransactionAdmin(admin.ModelAdmin):
 @admin.register(WebhookEvent)
 class WebhookEventAdmin(admin.ModelAdmin):
     list_display = [
-        'id', 'gateway', 'event_type', 'reference', 'processed', 
-        'created_at', 'processed_at'
+        'id', 'gateway', 'event_type', 'reference', 'status', 'attempts',
+        'processed', 'created_at', 'processed_at'
     ]
-    list_filter = ['gateway', 'event_type', 'processed', 'created_at']
+    list_filter = ['gateway', 'event_type', 'status', 'processed', 'created_at']
     search_fields = ['reference']
-    readonly_fields = ['id', 'created_at', 'processed_at']
+    readonly_fields = ['id', 'created_at', 'processed_at', 'attempts', 'locked_at', 'last_error']
     date_hierarchy = 'created_at'
+    actions = ['requeue_events']
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('gateway')
 
+    def requeue_events(self, request, queryset):
+        """Send dead-lettered events back to the ingestion queue."""
+        updated = queryset.filter(status=WebhookEvent.Status.DEAD).update(
+            status=WebhookEvent.Status.PENDING,
+            attempts=0,
+            next_attempt_at=None,
+        )
+        self.message_user(request, f"{updated} webhook events requeued")
+    requeue_events.short_description = 'Requeue dead-lettered events'
+
 
 
 @admin.register(MonnifyTransaction)
@@ -100,4 +111,25 @@ class MonnifyTransactionAdmin(admin.ModelAdmin):
     list_display = ['transaction', 'transaction_reference', 'account_number', 'bank_name', 'created_at']
     search_fields = ['transaction_reference', 'account_number', 'account_name']
     list_filter = ['bank_name', 'created_at']
-    readonly_fields = ['created_at']
\ No newline at end of file
+    readonly_fields = ['created_at']
+
+@admin.register(TransferRecipient)
+class TransferRecipientAdmin(admin.ModelAdmin):
+    list_display = ['user', 'gateway', 'bank_code', 'account_number', 'account_name', 'recipient_code', 'updated_at']
+    list_filter = ['gateway', 'created_at']
+    search_fields = ['user__username', 'user__email', 'account_number', 'recipient_code']
+    readonly_fields = ['created_at', 'updated_at']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'gateway')
+
+
+@admin.register(ReconciliationRun)
+class ReconciliationRunAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'finished_at', 'checked', 'settled', 'failed', 'still_pending', 'errors', 'drift_count']
+    readonly_fields = [f.name for f in ReconciliationRun._meta.fields]
+    date_hierarchy = 'started_at'
+
+    def drift_count(self, obj):
+        return len(obj.drift)
+    drift_count.short_description = 'Drifted'
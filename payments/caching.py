@@ -0,0 +1,152 @@
+# payments/caching.py
+"""
+Shared caching for gateway reference data: bank lists and account-name
+resolution.
+
+Entries live in the default Django cache, so every worker shares them. Bank
+lists are served stale-while-revalidate: once an entry passes its refresh
+point it is still returned while a single background refresh replaces it.
+Cold misses are single-flight; one caller fetches while concurrent callers for
+the same key wait briefly for its result instead of hitting the gateway too.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import invalidate, make_key
+
+logger = logging.getLogger(__name__)
+
+BANK_LIST_TTL = getattr(settings, "PAYMENT_BANK_LIST_TTL", 6 * 60 * 60)  # fresh for
+BANK_LIST_STALE_TTL = getattr(settings, "PAYMENT_BANK_LIST_STALE_TTL", 24 * 60 * 60)  # then served stale for
+ACCOUNT_RESOLUTION_TTL = getattr(settings, "PAYMENT_ACCOUNT_RESOLUTION_TTL", 7 * 24 * 60 * 60)
+
+# How long a fetch may hold the single-flight lock, and how long others wait on it
+FETCH_LOCK_TTL = 30
+SINGLE_FLIGHT_WAIT = 2.0
+_POLL_INTERVAL = 0.05
+
+CACHE_VERSION = 1
+
+
+def _bank_list_key(gateway: str) -> str:
+    return make_key("payments", "banks", f"v{CACHE_VERSION}", gateway)
+
+
+def _account_key(gateway: str, bank_code: str, account_number: str) -> str:
+    return make_key("payments", "account", f"v{CACHE_VERSION}", gateway, bank_code, account_number)
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+def _single_flight(key: str, load):
+    """
+    Run `load()` (which stores its own result under `key`) unless another
+    caller already is, in which case wait for that result. Falls back to
+    loading directly if the other caller doesn't finish in time.
+    """
+    if cache.add(_lock_key(key), 1, FETCH_LOCK_TTL):
+        try:
+            return load()
+        finally:
+            cache.delete(_lock_key(key))
+
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    logger.info("Timed out waiting for in-flight fetch of %s", key)
+    return load()
+
+
+def _banks_from_result(result):
+    if isinstance(result, dict):
+        if result.get("success") is False:
+            return []
+        return result.get("data") or result.get("banks") or []
+    return result or []
+
+
+def _fetch_banks(key: str, fetcher):
+    """Fetch and store a bank list entry; returns the entry, or None if the fetch failed."""
+    try:
+        banks = _banks_from_result(fetcher())
+    except Exception:
+        logger.exception("Failed to fetch bank list for %s", key)
+        return None
+    if not banks:
+        # Never cache an empty list; it usually means the gateway had a bad moment
+        return None
+
+    entry = {"banks": banks, "refresh_at": time.time() + BANK_LIST_TTL}
+    cache.set(key, entry, BANK_LIST_TTL + BANK_LIST_STALE_TTL)
+    return entry
+
+
+def _refresh_in_background(key: str, fetcher) -> None:
+    if not cache.add(_lock_key(key), 1, FETCH_LOCK_TTL):
+        return  # Someone is already refreshing it
+
+    def refresh():
+        try:
+            _fetch_banks(key, fetcher)
+        finally:
+            cache.delete(_lock_key(key))
+
+    threading.Thread(target=refresh, name=f"refresh:{key}", daemon=True).start()
+
+
+def get_bank_list(gateway: str, fetcher):
+    """
+    Bank list for a gateway. `fetcher()` returns the gateway service's
+    get_banks() result and is only called on a miss or a due refresh.
+    """
+    key = _bank_list_key(gateway)
+    entry = cache.get(key)
+    if entry is None:
+        entry = _single_flight(key, lambda: _fetch_banks(key, fetcher))
+        return entry["banks"] if entry else []
+
+    if time.time() >= entry["refresh_at"]:
+        _refresh_in_background(key, fetcher)
+    return entry["banks"]
+
+
+def _resolved(result) -> bool:
+    # Paystack-style {"status": True} payloads count as resolved too
+    return bool(result) and (result.get("success") is True or result.get("status") is True)
+
+
+def resolve_account(gateway: str, bank_code: str, account_number: str, resolver):
+    """
+    Cached account-name resolution. `resolver()` returns the gateway service's
+    resolve_account_number() result; only successful resolutions are cached,
+    so a typo or an outage is never remembered.
+    """
+    key = _account_key(gateway, bank_code, account_number)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    def load():
+        result = resolver()
+        if _resolved(result):
+            cache.set(key, result, ACCOUNT_RESOLUTION_TTL)
+        return result
+
+    return _single_flight(key, load)
+
+
+def invalidate_bank_list(gateway: str) -> None:
+    invalidate(_bank_list_key(gateway))
+
+
+def invalidate_account(gateway: str, bank_code: str, account_number: str) -> None:
+    invalidate(_account_key(gateway, bank_code, account_number))
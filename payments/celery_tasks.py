@@ -0,0 +1,51 @@
+# payments/celery_tasks.py - Webhook ingestion workers using Celery
+from celery import shared_task
+
+from .services import PaymentIntentService, PaymentReconciliationService, WebhookService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def process_webhook_event(event_id):
+    """Process a single freshly ingested webhook event"""
+    return WebhookService.drain_webhook_events(batch_size=1, event_ids=[event_id])
+
+
+@shared_task
+def drain_webhook_events(max_batches=20):
+    """Drain due webhook events: missed notifications, retries and orphaned claims"""
+    totals = {'claimed': 0, 'processed': 0, 'retried': 0, 'dead': 0}
+    for _ in range(max_batches):
+        result = WebhookService.drain_webhook_events()
+        for key, value in result.items():
+            totals[key] += value
+        if not result['claimed']:
+            break
+
+    if totals['claimed']:
+        logger.info(f'Webhook drain completed: {totals}')
+    return totals
+
+
+@shared_task
+def reconcile_payment_intents():
+    """Settle payment intents whose gateway call never completed"""
+    return PaymentIntentService.reconcile_stale_intents()
+
+
+@shared_task
+def reconcile_pending_payments(max_batches=10):
+    """Verify stale pending payments whose webhook never arrived"""
+    run = PaymentReconciliationService.sweep(max_batches=max_batches)
+    if run is None:
+        return None
+    return {
+        'checked': run.checked,
+        'settled': run.settled,
+        'failed': run.failed,
+        'still_pending': run.still_pending,
+        'errors': run.errors,
+        'drift': len(run.drift),
+    }
@@ -0,0 +1,277 @@
+# payments/gateways.py
+"""
+Shared HTTP plumbing for the payment gateways.
+
+Every gateway service talks to its API through a GatewayClient. Clients reuse
+one pooled requests.Session per gateway per process, so keep-alive
+connections (and their TLS sessions) survive across service instances and
+requests. Client calls also apply per-gateway timeouts and record latency.
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds; PAYMENT_GATEWAY_TIMEOUTS overrides per gateway
+DEFAULT_TIMEOUT = (
+    getattr(settings, "PAYMENT_HTTP_CONNECT_TIMEOUT", 5),
+    getattr(settings, "PAYMENT_HTTP_TIMEOUT", 15),
+)
+GATEWAY_TIMEOUTS = getattr(settings, "PAYMENT_GATEWAY_TIMEOUTS", {})
+POOL_MAXSIZE = getattr(settings, "PAYMENT_HTTP_POOL_MAXSIZE", 10)
+MAX_RETRIES = getattr(settings, "PAYMENT_HTTP_MAX_RETRIES", 2)
+SLOW_REQUEST_MS = getattr(settings, "PAYMENT_HTTP_SLOW_MS", 2000)
+
+# Monnify tokens are refreshed this long before they expire
+MONNIFY_TOKEN_REFRESH_AHEAD = getattr(settings, "MONNIFY_TOKEN_REFRESH_AHEAD", 5 * 60)
+MONNIFY_TOKEN_CACHE_KEY = "payments:monnify:access_token"
+
+_sessions: Dict[tuple, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+_metrics = defaultdict(lambda: {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+_metrics_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    """Session with a bounded keep-alive pool and retries for idempotent calls."""
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        # Never replay POSTs: a retried transfer could pay out twice
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(gateway: str) -> requests.Session:
+    """
+    Process-wide session for a gateway. Keyed by pid too, so forked workers
+    never share sockets inherited from their parent.
+    """
+    key = (gateway, os.getpid())
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _sessions[key] = _build_session()
+    return session
+
+
+def record_latency(gateway: str, method: str, elapsed_ms: float, failed: bool = False) -> None:
+    with _metrics_lock:
+        stats = _metrics[(gateway, method)]
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        if failed:
+            stats["errors"] += 1
+
+
+def gateway_metrics() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of per-gateway request counts, errors and latency in this process."""
+    with _metrics_lock:
+        return {
+            f"{gateway}.{method}": {
+                **stats,
+                "avg_ms": round(stats["total_ms"] / stats["count"], 1) if stats["count"] else 0.0,
+            }
+            for (gateway, method), stats in _metrics.items()
+        }
+
+
+class GatewayClient:
+    """
+    Thin wrapper over the shared session for one gateway.
+
+    get/post mirror requests' signatures; default headers are merged into each
+    call and the gateway's timeout applies unless one is passed explicitly.
+    """
+
+    def __init__(self, gateway: str, headers: Optional[Dict[str, str]] = None):
+        self.gateway = gateway
+        self.headers = headers or {}
+        self.timeout = GATEWAY_TIMEOUTS.get(gateway, DEFAULT_TIMEOUT)
+        self.session = get_session(gateway)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs["headers"] = {**self.headers, **(kwargs.get("headers") or {})}
+        kwargs.setdefault("timeout", self.timeout)
+
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            elapsed_ms = (time.monotonic() - start) * 1000
+            record_latency(self.gateway, method, elapsed_ms, failed=True)
+            logger.warning("%s %s %s failed after %.0fms", self.gateway, method, url, elapsed_ms)
+            raise
+
+        elapsed_ms = (time.monotonic() - start) * 1000
+        record_latency(self.gateway, method, elapsed_ms, failed=response.status_code >= 500)
+        if elapsed_ms >= SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow %s call: %s %s took %.0fms (status=%s)",
+                self.gateway, method, url, elapsed_ms, response.status_code,
+            )
+        else:
+            logger.debug("%s %s %s took %.0fms", self.gateway, method, url, elapsed_ms)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+class MonnifyTokenCache:
+    """
+    Monnify access token shared by every MonnifyService through the Django
+    cache, refreshed ahead of expiry. Only one thread per process refreshes at
+    a time; others keep using the current token while it is still valid.
+    """
+
+    _refresh_lock = threading.Lock()
+
+    @classmethod
+    def get_token(cls, login) -> str:
+        """
+        Return a valid token, calling `login()` -> (token, expires_in_seconds)
+        when the cached token is missing or inside the refresh-ahead window.
+        """
+        cached = cache.get(MONNIFY_TOKEN_CACHE_KEY)
+        now = timezone.now()
+        if cached and (cached["expires_at"] - now).total_seconds() > MONNIFY_TOKEN_REFRESH_AHEAD:
+            return cached["token"]
+
+        current = cached if cached and cached["expires_at"] > now else None
+        # Someone else is refreshing; the current token is good enough meanwhile
+        if not cls._refresh_lock.acquire(blocking=current is None):
+            return current["token"]
+        try:
+            cached = cache.get(MONNIFY_TOKEN_CACHE_KEY)
+            now = timezone.now()
+            if cached and (cached["expires_at"] - now).total_seconds() > MONNIFY_TOKEN_REFRESH_AHEAD:
+                return cached["token"]
+
+            try:
+                token, expires_in = login()
+            except Exception:
+                if current:
+                    logger.warning("Monnify token refresh failed; using current token until expiry")
+                    return current["token"]
+                raise
+            expires_at = now + timezone.timedelta(seconds=expires_in)
+            cache.set(
+                MONNIFY_TOKEN_CACHE_KEY,
+                {"token": token, "expires_at": expires_at},
+                timeout=expires_in,
+            )
+            return token
+        finally:
+            cls._refresh_lock.release()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        cache.delete(MONNIFY_TOKEN_CACHE_KEY)
+
+
+class BaseGatewayService:
+    """
+    Common shape of the gateway services. Subclasses set `gateway_name` and
+    build `self.session` with `self._client(...)`; public methods return
+    {"success": bool, "data": {...}, "error": "message"}.
+    """
+
+    gateway_name: str = ""
+
+    def _client(self, headers: Optional[Dict[str, str]] = None) -> GatewayClient:
+        return GatewayClient(self.gateway_name, headers=headers)
+
+    def _get_gateway(self):
+        from .models import PaymentGateway
+
+        try:
+            return PaymentGateway.objects.get(name__iexact=self.gateway_name)
+        except PaymentGateway.DoesNotExist:
+            logger.error("%s PaymentGateway not configured in DB", self.gateway_name.title())
+            return None
+
+    def get_transfer_recipient(self, user, bank_code: str, account_number: str) -> Dict[str, Any]:
+        """
+        Payout destination for a user's bank account, registering it with the
+        gateway only the first time. data carries recipient_code and account_name.
+        """
+        from .models import TransferRecipient
+
+        gateway = self._get_gateway()
+        if not gateway:
+            return {"success": False, "data": {}, "error": "Payment gateway not configured"}
+
+        recipient = self._lookup_transfer_recipient(user, gateway, bank_code, account_number)
+        if recipient is None:
+            result = self._create_transfer_recipient(user, bank_code, account_number)
+            if not result["success"]:
+                return result
+            recipient, _ = TransferRecipient.objects.update_or_create(
+                user=user,
+                gateway=gateway,
+                bank_code=bank_code,
+                account_number=account_number,
+                defaults={
+                    "recipient_code": result["data"].get("recipient_code") or "",
+                    "account_name": result["data"].get("account_name") or "",
+                },
+            )
+
+        return {
+            "success": True,
+            "data": {"recipient_code": recipient.recipient_code, "account_name": recipient.account_name},
+            "error": None,
+        }
+
+    @staticmethod
+    def _lookup_transfer_recipient(user, gateway, bank_code: str, account_number: str):
+        """Registered recipient for the account, without contacting the gateway."""
+        from .models import TransferRecipient
+
+        return TransferRecipient.objects.filter(
+            user=user, gateway=gateway, bank_code=bank_code, account_number=account_number
+        ).first()
+
+    def _create_transfer_recipient(self, user, bank_code: str, account_number: str) -> Dict[str, Any]:
+        """Register the account with the gateway; data must carry recipient_code and account_name."""
+        raise NotImplementedError
+
+    def initialize_payment(self, user, amount_usd, amount_local, currency="NGN", callback_url=None):
+        raise NotImplementedError
+
+    def verify_payment(self, reference: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get_banks(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def resolve_account_number(self, account_number: str, bank_code: str) -> Dict[str, Any]:
+        raise NotImplementedError
@@ -0,0 +1,69 @@
+# payments/management/commands/reconcile_payments.py
+from django.core.management.base import BaseCommand
+
+from payments.services import (
+    PAYMENT_RECONCILE_BATCH_SIZE,
+    PAYMENT_RECONCILE_WORKERS,
+    PaymentReconciliationService,
+)
+
+
+class Command(BaseCommand):
+    help = 'Verify stale pending payments against the gateways and settle the ones that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without settling anything or moving the watermark',
+        )
+        parser.add_argument(
+            '--batches',
+            type=int,
+            default=10,
+            help='Maximum number of batches checked in this run',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PAYMENT_RECONCILE_BATCH_SIZE,
+            help='Transactions verified per batch',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=PAYMENT_RECONCILE_WORKERS,
+            help='Concurrent gateway verify calls',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING('DRY RUN MODE - No changes will be made')
+            )
+
+        run = PaymentReconciliationService.sweep(
+            max_batches=options['batches'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            dry_run=dry_run,
+        )
+        if run is None:
+            self.stdout.write(self.style.WARNING('Another reconciliation run is in progress'))
+            return
+
+        for item in run.drift:
+            self.stdout.write(
+                f"{item['gateway']} {item['type']} {item['reference']} (₦{item['amount']}, "
+                f"created {item['created_at']}): {item['action']}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Checked {run.checked}: {run.settled} settled, {run.failed} failed, '
+                f'{run.still_pending} still pending, {run.errors} lookup errors, '
+                f'{len(run.drift)} drifted'
+            )
+        )
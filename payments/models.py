@@ -95,6 +95,10 @@ class PaymentTransaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # When the gateway acknowledged the request (checkout created / transfer
+    # accepted). PENDING rows without it are intents whose gateway call never
+    # finished; the intent reconciler settles them.
+    submitted_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "payment_transactions"
@@ -102,6 +106,11 @@ class PaymentTransaction(models.Model):
         indexes = [
             models.Index(fields=["user", "created_at"]),
             models.Index(fields=["status"]),
+            models.Index(
+                fields=["created_at"],
+                name="payment_intent_idx",
+                condition=models.Q(status="pending", submitted_at__isnull=True),
+            ),
         ]
 
 
@@ -144,6 +153,10 @@ class PaystackTransaction(models.Model):
 class WebhookEvent(models.Model):
     """
     Stores raw webhook events for auditing and debugging. One row per event.
+
+    Webhook views only persist the event; workers claim pending rows and run
+    the gateway handlers, retrying with backoff until the event is processed
+    or dead-lettered.
     """
 
     class EventType(models.TextChoices):
@@ -152,6 +165,12 @@ class WebhookEvent(models.Model):
         TRANSFER_FAILED = "transfer.failed", "Transfer Failed"
         OTHER = "other", "Other"
 
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        PROCESSED = "processed", "Processed"
+        DEAD = "dead", "Dead-lettered"
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     gateway = models.ForeignKey(PaymentGateway, on_delete=models.CASCADE)
     event_type = models.CharField(max_length=50, choices=EventType.choices)
@@ -160,6 +179,13 @@ class WebhookEvent(models.Model):
     payload = models.JSONField()
     processed = models.BooleanField(default=False)
 
+    # Queue state
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
 
@@ -171,6 +197,7 @@ class WebhookEvent(models.Model):
         verbose_name_plural = "Webhook Events"
         indexes = [
             models.Index(fields=['gateway', 'reference', 'processed']),
+            models.Index(fields=['status', 'next_attempt_at'], name='webhook_queue_idx'),
         ]
 
     def __str__(self) -> str:
@@ -250,6 +277,81 @@ class MonnifyTransaction(models.Model):
         return f"Monnify - {self.transaction_reference}"
 
 
+class TransferRecipient(models.Model):
+    """
+    Payout destination registered with a gateway (Paystack transfer recipient,
+    Flutterwave beneficiary, validated Monnify account), one per user + bank
+    account. Repeat withdrawals to the same account reuse it instead of
+    registering the account again.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="transfer_recipients",
+    )
+    gateway = models.ForeignKey(PaymentGateway, on_delete=models.CASCADE)
+
+    bank_code = models.CharField(max_length=10)
+    account_number = models.CharField(max_length=20)
+    account_name = models.CharField(max_length=255, blank=True)
+
+    # Gateway-side identifier (recipient code / beneficiary id); blank where the
+    # gateway pays straight to account details
+    recipient_code = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [['user', 'gateway', 'bank_code', 'account_number']]
+        db_table = "transfer_recipients"
+        verbose_name = "Transfer Recipient"
+        verbose_name_plural = "Transfer Recipients"
+
+    def __str__(self) -> str:
+        return f"{self.gateway.name} - {self.bank_code}/{self.account_number}"
+
+    @classmethod
+    def forget(cls, user, gateway, bank_code, account_number) -> int:
+        """Drop a registration so the next payout registers the account afresh."""
+        if not (bank_code and account_number):
+            return 0
+        deleted, _ = cls.objects.filter(
+            user=user, gateway=gateway, bank_code=bank_code, account_number=account_number
+        ).delete()
+        return deleted
+
+
+class ReconciliationRun(models.Model):
+    """
+    One pass of the pending-payment reconciliation sweep. The cursor is the
+    watermark the next run resumes from; drift lists every transaction that
+    was still pending locally although the gateway had already settled it.
+    """
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Watermark: (created_at, id) of the last transaction checked
+    cursor_created_at = models.DateTimeField(null=True, blank=True)
+    cursor_id = models.UUIDField(null=True, blank=True)
+
+    checked = models.PositiveIntegerField(default=0)
+    settled = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    still_pending = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    drift = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        db_table = "payment_reconciliation_runs"
+        ordering = ["-started_at"]
+        verbose_name = "Reconciliation Run"
+        verbose_name_plural = "Reconciliation Runs"
+
+    def __str__(self) -> str:
+        return f"Reconciliation {self.started_at:%Y-%m-%d %H:%M} ({len(self.drift)} drifted)"
+
+
 class CurrencyRate(models.Model):
     base_currency = models.CharField(max_length=3, default='NGN')
     target_currency = models.CharField(max_length=3)
@@ -2,15 +2,19 @@
 import logging
 import hmac
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal, InvalidOperation
 from typing import Any, Dict
-# from django.core.cache import cache
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from .gateways import DEFAULT_TIMEOUT, GATEWAY_TIMEOUTS, BaseGatewayService, MonnifyTokenCache
 from .models import (
     PaymentTransaction,
     PaystackTransaction,
@@ -19,12 +23,40 @@ from .models import (
     FlutterwaveTransaction,   
     # CurrencyRate,
     MonnifyTransaction,
-
+    ReconciliationRun,
+    TransferRecipient,
 )
 logger = logging.getLogger(__name__)
 
-# Default HTTP timeout (seconds) for requests to external services
-HTTP_TIMEOUT = getattr(settings, "PAYMENT_HTTP_TIMEOUT", 15)
+# HTTP sessions, timeouts and retries for gateway calls live in payments.gateways
+
+# Paystack accepts at most 100 transfers per bulk request
+PAYSTACK_BULK_TRANSFER_LIMIT = 100
+
+# Intents still unacknowledged after this long are looked up at their gateway
+PAYMENT_INTENT_STALE_AFTER = getattr(settings, "PAYMENT_INTENT_STALE_AFTER", 10 * 60)  # seconds
+PAYMENT_INTENT_RECONCILE_BATCH_SIZE = getattr(settings, "PAYMENT_INTENT_RECONCILE_BATCH_SIZE", 100)
+# A submit call can't still be in flight after twice the slowest gateway timeout
+PAYMENT_SUBMIT_IN_FLIGHT_MAX = 2 * max(sum(t) for t in [DEFAULT_TIMEOUT, *GATEWAY_TIMEOUTS.values()])
+
+# Reconciliation sweep of submitted-but-pending transactions
+PAYMENT_RECONCILE_GRACE = getattr(settings, "PAYMENT_RECONCILE_GRACE", 30 * 60)  # give webhooks time first
+PAYMENT_RECONCILE_LOOKBACK = getattr(settings, "PAYMENT_RECONCILE_LOOKBACK", 7 * 24 * 60 * 60)
+PAYMENT_RECONCILE_BATCH_SIZE = getattr(settings, "PAYMENT_RECONCILE_BATCH_SIZE", 50)
+PAYMENT_RECONCILE_WORKERS = getattr(settings, "PAYMENT_RECONCILE_WORKERS", 4)
+PAYMENT_RECONCILE_LOCK_TTL = getattr(settings, "PAYMENT_RECONCILE_LOCK_TTL", 15 * 60)
+# Paystack checkouts left "abandoned" this long are failed by the reconciliation sweep
+PAYMENT_ABANDON_AFTER = getattr(settings, "PAYMENT_ABANDON_AFTER", 24 * 60 * 60)  # seconds
+
+# Webhook ingestion queue
+# Recently seen (gateway, event_type, reference) keys are rejected from cache for this long
+WEBHOOK_DEDUPE_TTL = getattr(settings, "WEBHOOK_DEDUPE_TTL", 6 * 60 * 60)
+WEBHOOK_DRAIN_BATCH_SIZE = getattr(settings, "WEBHOOK_DRAIN_BATCH_SIZE", 100)
+WEBHOOK_MAX_ATTEMPTS = getattr(settings, "WEBHOOK_MAX_ATTEMPTS", 8)
+WEBHOOK_RETRY_BASE_DELAY = getattr(settings, "WEBHOOK_RETRY_BASE_DELAY", 30)  # seconds
+WEBHOOK_RETRY_MAX_DELAY = getattr(settings, "WEBHOOK_RETRY_MAX_DELAY", 60 * 60)
+# Events left in PROCESSING longer than this are assumed orphaned and reclaimed
+WEBHOOK_PROCESSING_TIMEOUT = getattr(settings, "WEBHOOK_PROCESSING_TIMEOUT", 5 * 60)
 
 
 def _safe_json(response: requests.Response) -> Dict[str, Any]:
@@ -41,19 +73,25 @@ def _ok_resp(response: requests.Response) -> bool:
     return 200 <= response.status_code < 300
 
 
-class PaystackService:
+def _older_than(payment_transaction, seconds: int) -> bool:
+    return payment_transaction.created_at < timezone.now() - timezone.timedelta(seconds=seconds)
+
+
+class PaystackService(BaseGatewayService):
     """Service class for Paystack API integration.
 
     Methods return a consistent structure:
         {"success": bool, "data": {...}, "error": "message"}
     """
 
+    gateway_name = "paystack"
+
     def __init__(self):
         self.secret_key = settings.PAYSTACK_SECRET_KEY
         self.public_key = getattr(settings, "PAYSTACK_PUBLIC_KEY", None)
         self.base_url = "https://api.paystack.co"
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Pooled, process-wide connection; see payments.gateways
+        self.session = self._client({
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json",
         })
@@ -61,13 +99,6 @@ class PaystackService:
     # ------------------------
     # Helpers
     # ------------------------
-    def _get_gateway(self):
-        try:
-            return PaymentGateway.objects.get(name__iexact="paystack")
-        except PaymentGateway.DoesNotExist:
-            logger.error("Paystack PaymentGateway not configured in DB")
-            return None
-
     # ------------------------
     # Initialize funding (checkout)
     # ------------------------
@@ -89,85 +120,77 @@ class PaystackService:
             except (InvalidOperation, TypeError):
                 return {"success": False, "data": {}, "error": "Invalid amount"}
             import uuid
-            with transaction.atomic():
-                # Create local pending PaymentTransaction
-                payment_transaction = PaymentTransaction.objects.create(
-                    user=user,
-                    gateway=gateway,
-                    transaction_type=PaymentTransaction.TransactionType.FUNDING,
-                    currency=currency,
-                    amount_usd=amount_usd,          # ✅ Store original USD
-                    amount_local=amount_local,      # ✅ Add this field if missing
-                    gateway_reference=f"PS_{timezone.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}",
-                    status=PaymentTransaction.Status.PENDING,
-                    description=f"Wallet funding via Paystack {amount_usd} NGN"
-                    
+            # Intent: committed on its own, no transaction is held across the HTTP call
+            payment_transaction = PaymentTransaction.objects.create(
+                user=user,
+                gateway=gateway,
+                transaction_type=PaymentTransaction.TransactionType.FUNDING,
+                currency=currency,
+                amount_usd=amount_usd,          # ✅ Store original USD
+                amount_local=amount_local,      # ✅ Add this field if missing
+                gateway_reference=f"PS_{timezone.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}",
+                status=PaymentTransaction.Status.PENDING,
+                description=f"Wallet funding via Paystack {amount_usd} NGN"
+            )
+
+            url = f"{self.base_url}/transaction/initialize"
+            payload = {
+                "email": user.email,
+                "amount": int(amount_dec * Decimal("100")),  # convert to kobo
+                "currency": currency,
+                "reference": payment_transaction.gateway_reference,
+                "callback_url": callback_url,
+                "metadata": {
+                    "user_id": str(user.id),
+                    "transaction_id": str(payment_transaction.id),
+                    "purpose": "wallet_funding",
+                    "internal_reference": payment_transaction.internal_reference,
+                },
+            }
+
+            # A network error leaves the intent PENDING for the reconciler
+            resp = self.session.post(url, json=payload)
+            resp_data = _safe_json(resp)
+
+            if _ok_resp(resp) and resp_data.get("status") is True:
+                pay_data = resp_data.get("data", {})
+                # Defensive check for authorization_url
+                if "authorization_url" not in pay_data:
+                    PaymentIntentService.fail_intent(payment_transaction, resp_data)
+                    err = "Missing authorization URL from gateway"
+                    logger.error(err + " - resp: %s", resp_data)
+                    return {"success": False, "data": resp_data, "error": err}
+
+                # Persist PaystackTransaction
+                PaymentIntentService.mark_submitted(
+                    payment_transaction,
+                    resp_data,
+                    PaystackTransaction,
+                    authorization_url=pay_data.get("authorization_url"),
+                    access_code=pay_data.get("access_code"),
+                    paystack_reference=pay_data.get("reference") or "",
                 )
 
-                url = f"{self.base_url}/transaction/initialize"
-                payload = {
-                    "email": user.email,
-                    "amount": int(amount_dec * Decimal("100")),  # convert to kobo
-                    "currency": currency,
-                    "reference": payment_transaction.gateway_reference,
-                    "callback_url": callback_url,
-                    "metadata": {
-                        "user_id": str(user.id),
+                return {
+                    "success": True,
+                    "data": {
                         "transaction_id": str(payment_transaction.id),
-                        "purpose": "wallet_funding",
                         "internal_reference": payment_transaction.internal_reference,
+                        "gateway_reference": payment_transaction.gateway_reference,
+                        "authorization_url": pay_data.get("authorization_url"),
+                        "access_code": pay_data.get("access_code"),
+                        "reference": pay_data.get("reference"),
+                        "raw": resp_data,
                     },
+                    "error": None,
                 }
 
-                resp = self.session.post(url, json=payload, timeout=HTTP_TIMEOUT)
-                resp_data = _safe_json(resp)
-
-                if _ok_resp(resp) and resp_data.get("status") is True:
-                    pay_data = resp_data.get("data", {})
-                    # Defensive check for authorization_url
-                    if "authorization_url" not in pay_data:
-                        # mark txn failed and return
-                        payment_transaction.status = PaymentTransaction.Status.FAILED
-                        payment_transaction.gateway_response = resp_data
-                        payment_transaction.save(update_fields=["status", "gateway_response", "updated_at"])
-                        err = "Missing authorization URL from gateway"
-                        logger.error(err + " - resp: %s", resp_data)
-                        return {"success": False, "data": resp_data, "error": err}
-
-                    # Persist PaystackTransaction
-                    PaystackTransaction.objects.create(
-                        transaction=payment_transaction,
-                        authorization_url=pay_data.get("authorization_url"),
-                        access_code=pay_data.get("access_code"),
-                        paystack_reference=pay_data.get("reference") or "",
-                    )
+            # Failure path: mark txn failed
+            PaymentIntentService.fail_intent(payment_transaction, resp_data)
 
-                    payment_transaction.gateway_response = resp_data
-                    payment_transaction.description=f"Wallet funding via Paystack {payment_transaction.amount_usd} NGN"
-                    payment_transaction.save(update_fields=["gateway_response", "updated_at","description"])
-
-                    return {
-                        "success": True,
-                        "data": {
-                            "transaction_id": str(payment_transaction.id),
-                            "internal_reference": payment_transaction.internal_reference,
-                            "gateway_reference": payment_transaction.gateway_reference,
-                            "authorization_url": pay_data.get("authorization_url"),
-                            "access_code": pay_data.get("access_code"),
-                            "reference": pay_data.get("reference"),
-                            "raw": resp_data,
-                        },
-                        "error": None,
-                    }
-
-                # Failure path: mark txn failed
-                payment_transaction.status = PaymentTransaction.Status.FAILED
-                payment_transaction.gateway_response = resp_data
-                payment_transaction.save(update_fields=["status", "gateway_response", "updated_at"])
-
-                err_msg = resp_data.get("message") or resp_data.get("error") or "Payment initialization failed"
-                logger.info("Paystack init failed: %s", err_msg)
-                return {"success": False, "data": resp_data, "error": err_msg}
+            err_msg = resp_data.get("message") or resp_data.get("error") or "Payment initialization failed"
+            logger.info("Paystack init failed: %s", err_msg)
+            return {"success": False, "data": resp_data, "error": err_msg}
 
         except requests.RequestException as exc:
             logger.exception("HTTP error during payment initialization: %s", exc)
@@ -186,7 +209,7 @@ class PaystackService:
         """
         try:
             url = f"{self.base_url}/transaction/verify/{reference}"
-            resp = self.session.get(url, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url)
             resp_data = _safe_json(resp)
 
             ok = _ok_resp(resp) and resp_data.get("status", False)
@@ -213,7 +236,7 @@ class PaystackService:
                 "currency": "NGN",
                 "metadata": {"user_id": str(user.id)},
             }
-            resp = self.session.post(url, json=payload, timeout=HTTP_TIMEOUT)
+            resp = self.session.post(url, json=payload)
             resp_data = _safe_json(resp)
             ok = _ok_resp(resp) and resp_data.get("status", False)
 
@@ -227,6 +250,47 @@ class PaystackService:
             logger.exception("Unexpected error creating transfer recipient: %s", exc)
             return {"success": False, "data": {}, "error": str(exc)}
 
+    def _create_transfer_recipient(self, user, bank_code: str, account_number: str) -> Dict[str, Any]:
+        result = self.create_transfer_recipient(user, bank_code, account_number)
+        if result["success"]:
+            data = result["data"]
+            result["data"] = {
+                "recipient_code": data.get("recipient_code", ""),
+                "account_name": (data.get("details") or {}).get("account_name", ""),
+            }
+        return result
+
+    # ------------------------
+    # Bulk transfer (batched withdrawals)
+    # ------------------------
+    def initiate_bulk_transfer(self, transfers) -> Dict[str, Any]:
+        """
+        Submit up to PAYSTACK_BULK_TRANSFER_LIMIT transfers in one request.
+        `transfers` items are {"amount" (kobo), "recipient", "reference", "reason"}.
+
+        Only the HTTP call happens here; callers own the bookkeeping. Network
+        errors and 5xx responses are flagged `ambiguous` because Paystack may
+        still have queued the batch: those transfers must be settled by
+        webhook, not refunded.
+        """
+        try:
+            url = f"{self.base_url}/transfer/bulk"
+            payload = {"currency": "NGN", "source": "balance", "transfers": transfers}
+            resp = self.session.post(url, json=payload)
+            resp_data = _safe_json(resp)
+
+            if _ok_resp(resp) and resp_data.get("status", False):
+                return {"success": True, "data": resp_data.get("data", []), "error": None}
+
+            error = resp_data.get("message", "Bulk transfer failed")
+            if resp.status_code >= 500:
+                logger.warning("Paystack bulk transfer outcome unknown: %s", error)
+                return {"success": False, "data": resp_data, "error": error, "ambiguous": True}
+            return {"success": False, "data": resp_data, "error": error}
+        except requests.RequestException as exc:
+            logger.exception("HTTP error initiating Paystack bulk transfer: %s", exc)
+            return {"success": False, "data": {}, "error": str(exc), "ambiguous": True}
+
     # ------------------------
     # Initiate transfer (withdrawal)
     # ------------------------
@@ -234,7 +298,8 @@ class PaystackService:
         """
         Initiate a transfer to a recipient (withdrawal).
         amount_usd → wallet amount (always NGN).
-        Creates a PENDING PaymentTransaction and PaystackTransaction on acknowledgement.
+        Commits the wallet debit and a PENDING PaymentTransaction first, then
+        submits the transfer outside the transaction (see submit_transfer).
         """
         try:
             gateway = self._get_gateway()
@@ -249,67 +314,124 @@ class PaystackService:
             # Convert NGN → NGN for Paystack
             amount_ngn = CurrencyService.convert_usd_to_local(amount_usd, "NGN").quantize(Decimal("0.01"))
 
-            with transaction.atomic():
-                payment_transaction = PaymentTransaction.objects.create(
-                    user=user,
-                    gateway=gateway,
-                    transaction_type=PaymentTransaction.TransactionType.WITHDRAWAL,
-                    amount_usd=amount_usd,      # ✅ NGN amount
-                    amount_local=amount_ngn,    # ✅ NGN amount      # store local amount for gateway
-                    currency="NGN",
-                    gateway_reference=f"WD_{timezone.now().strftime('%Y%m%d%H%M%S')}_{str(user.id)[:8]}",
-                    status=PaymentTransaction.Status.PENDING,
-                )
-                from wallets.services import WalletService
-
-                # Debit wallet in NGN
-                WalletService.debit_wallet(
-                    user=user,
-                    amount=amount_usd,
-                    category="withdrawal",
-                    description=f"Withdrawal {amount_usd} NGN → {amount_ngn} NGN",
-                    reference=payment_transaction.internal_reference,
-                    payment_transaction=payment_transaction,
-                    extra_data={
-                        "amount_usd": amount_usd,
-                        "amount_local": amount_ngn,
-                        "currency": "NGN",
-                    }
-                )
+            payment_transaction = PaymentIntentService.create_withdrawal_intent(
+                user=user,
+                gateway=gateway,
+                amount_usd=amount_usd,      # ✅ NGN amount
+                amount_local=amount_ngn,    # ✅ NGN amount      # store local amount for gateway
+                currency="NGN",
+                gateway_reference=f"WD_{timezone.now().strftime('%Y%m%d%H%M%S')}_{str(user.id)[:8]}",
+                description=f"Withdrawal {amount_usd} NGN → {amount_ngn} NGN",
+                extra_data={
+                    "amount_usd": amount_usd,
+                    "amount_local": amount_ngn,
+                    "currency": "NGN",
+                },
+            )
+        except Exception as exc:
+            logger.exception("Unexpected error initiating Paystack transfer: %s", exc)
+            return {"success": False, "data": {}, "error": str(exc)}
 
-                # Call Paystack API
-                url = f"{self.base_url}/transfer"
-                payload = {
-                    "source": "balance",
-                    "amount": int(amount_ngn * Decimal("100")),  # kobo
-                    "recipient": recipient_code,
-                    "reason": reason,
-                    "reference": payment_transaction.gateway_reference,
-                }
+        return self.submit_transfer(payment_transaction, recipient_code, reason)
 
-                resp = self.session.post(url, json=payload, timeout=HTTP_TIMEOUT)
-                resp_data = _safe_json(resp)
+    def submit_transfer(self, payment_transaction, recipient_code: str, reason: str = "Wallet withdrawal",
+                        **details) -> Dict[str, Any]:
+        """
+        Send a committed withdrawal intent to Paystack. Call this with no
+        transaction open. Rejections fail the intent (refunding the wallet);
+        network errors and 5xx responses are `ambiguous` and left PENDING for
+        the intent reconciler. `details` are extra PaystackTransaction fields.
+        """
+        url = f"{self.base_url}/transfer"
+        payload = {
+            "source": "balance",
+            "amount": int(payment_transaction.amount_local * Decimal("100")),  # kobo
+            "recipient": recipient_code,
+            "reason": reason,
+            "reference": payment_transaction.gateway_reference,
+        }
 
-                if _ok_resp(resp) and resp_data.get("status", False):
-                    pay_data = resp_data.get("data", {})
-                    PaystackTransaction.objects.create(
-                        transaction=payment_transaction,
-                        paystack_reference=pay_data.get("reference") or "",
-                        transfer_code=pay_data.get("transfer_code") or "",
-                    )
-                    payment_transaction.gateway_response = resp_data
-                    payment_transaction.save(update_fields=["gateway_response", "updated_at"])
-                    return {"success": True, "data": pay_data, "error": None}
+        try:
+            resp = self.session.post(url, json=payload)
+        except requests.RequestException as exc:
+            logger.exception("HTTP error initiating Paystack transfer: %s", exc)
+            return {"success": False, "data": {}, "error": str(exc), "ambiguous": True}
+
+        resp_data = _safe_json(resp)
+        if _ok_resp(resp) and resp_data.get("status", False):
+            pay_data = resp_data.get("data", {})
+            PaymentIntentService.mark_submitted(
+                payment_transaction,
+                resp_data,
+                PaystackTransaction,
+                paystack_reference=pay_data.get("reference") or payment_transaction.gateway_reference,
+                recipient_code=recipient_code,
+                transfer_code=pay_data.get("transfer_code") or "",
+                **details,
+            )
+            return {"success": True, "data": {**pay_data, "transaction_id": str(payment_transaction.id)}, "error": None}
+
+        error = resp_data.get("message", "Transfer initiation failed")
+        if resp.status_code >= 500:
+            logger.warning("Paystack transfer %s outcome unknown: %s", payment_transaction.gateway_reference, error)
+            return {"success": False, "data": resp_data, "error": error, "ambiguous": True}
+
+        PaymentIntentService.fail_intent(payment_transaction, resp_data)
+        return {"success": False, "data": resp_data, "error": error}
+
+    def _fetch_by_reference(self, payment_transaction):
+        """GET the transaction or transfer by our reference; (None, {}) on network errors."""
+        reference = payment_transaction.gateway_reference
+        if payment_transaction.transaction_type == PaymentTransaction.TransactionType.WITHDRAWAL:
+            url = f"{self.base_url}/transfer/verify/{reference}"
+        else:
+            url = f"{self.base_url}/transaction/verify/{reference}"
 
-                payment_transaction.status = PaymentTransaction.Status.FAILED
-                payment_transaction.gateway_response = resp_data
-                payment_transaction.save(update_fields=["status", "gateway_response", "updated_at"])
-                return {"success": False, "data": resp_data, "error": resp_data.get("message", "Transfer initiation failed")}
+        try:
+            resp = self.session.get(url)
+        except requests.RequestException as exc:
+            logger.warning("Paystack lookup for %s failed: %s", reference, exc)
+            return None, {}
+        return resp, _safe_json(resp)
+
+    def lookup_intent(self, payment_transaction):
+        """
+        Look an unacknowledged intent up by reference. Returns ("found" |
+        "missing" | None, response); None means the lookup itself failed.
+        """
+        resp, resp_data = self._fetch_by_reference(payment_transaction)
+        if resp is None:
+            return None, resp_data
+        if _ok_resp(resp) and resp_data.get("status"):
+            return "found", resp_data
+        if resp.status_code in (400, 404):
+            return "missing", resp_data
+        return None, resp_data
+
+    def verification_event(self, payment_transaction):
+        """
+        Current gateway state of a submitted transaction, as
+        ("settle", webhook body) | ("fail", response) | ("pending", response) |
+        (None, response) when the lookup failed.
+        """
+        resp, resp_data = self._fetch_by_reference(payment_transaction)
+        if resp is None or not (_ok_resp(resp) and resp_data.get("status")):
+            return None, resp_data
+
+        data = resp_data.get("data") or {}
+        status = (data.get("status") or "").lower()
+        data.setdefault("reference", payment_transaction.gateway_reference)
+        if payment_transaction.transaction_type == PaymentTransaction.TransactionType.WITHDRAWAL:
+            if status in ("success", "failed", "reversed"):
+                return "settle", {"event": f"transfer.{status}", "data": data}
+            return "pending", resp_data
+
+        if status == "success":
+            return "settle", {"event": "charge.success", "data": data}
+        if status in ("failed", "reversed") or (status == "abandoned" and _older_than(payment_transaction, PAYMENT_ABANDON_AFTER)):
+            return "fail", resp_data
+        return "pending", resp_data
 
-        except Exception as exc:
-            logger.exception("Unexpected error initiating Paystack transfer: %s", exc)
-            return {"success": False, "data": {}, "error": str(exc)}
-        
     # ------------------------
     # Get banks
     # ------------------------
@@ -317,7 +439,7 @@ class PaystackService:
         """Return list of banks from Paystack (data list)"""
         try:
             url = f"{self.base_url}/bank"
-            resp = self.session.get(url, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url)
             resp_data = _safe_json(resp)
             ok = _ok_resp(resp)
 
@@ -339,7 +461,7 @@ class PaystackService:
         try:
             url = f"{self.base_url}/bank/resolve"
             params = {"account_number": account_number, "bank_code": bank_code}
-            resp = self.session.get(url, params=params, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url, params=params)
             resp_data = _safe_json(resp)
             ok = _ok_resp(resp) and resp_data.get("status", False)
 
@@ -377,9 +499,7 @@ class WebhookService:
     @staticmethod
     def process_paystack_webhook(event_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process incoming Paystack webhook JSON and handle idempotency."""
-        event_type = event_data.get("event")
-        data = event_data.get("data", {}) or {}
-        reference = data.get("reference")
+        event_type, reference, data = WebhookService._parse_paystack_event(event_data)
         if not reference:
             logger.warning("Webhook missing reference: %s", event_data)
             return {"success": False, "error": "No reference found", "data": {}}
@@ -389,39 +509,38 @@ class WebhookService:
             logger.error("Webhook received but PaymentGateway 'paystack' not configured")
             return {"success": False, "error": "Gateway not configured", "data": {}}
 
-        webhook_event, created = WebhookEvent.objects.get_or_create(
-            gateway=gateway,
-            reference=reference,
-            defaults={"event_type": event_type, "payload": event_data},
-        )
+        webhook_event, created = WebhookService._record_webhook_event(gateway, reference, event_type, event_data)
         
         if webhook_event.processed:
             # Already handled; idempotent behavior
             logger.info("Duplicate webhook ignored for reference %s", reference)
             return {"success": True, "message": "Duplicate event ignored", "data": {}}
         
-        # Now mark as processing (prevents race conditions)
-        webhook_event.processing_started = timezone.now()
-        webhook_event.save()
         try:
-            if event_type == "charge.success":
-                result = WebhookService._handle_successful_charge(data, webhook_event)
-            elif event_type == "transfer.success":
-                result = WebhookService._handle_successful_transfer(data, webhook_event)
-            elif event_type in ("transfer.failed", "transfer.reversed"):
-                result = WebhookService._handle_failed_transfer(data, webhook_event)
-            else:
-                # Unhandled event recorded for audit
-                webhook_event.event_type = WebhookEvent.EventType.OTHER
-                webhook_event.payload = event_data
-                webhook_event.save(update_fields=["event_type", "payload"])
-                result = {"success": True, "message": "Unhandled event recorded", "data": {}}
-
-            return result
+            return WebhookService._dispatch_paystack_event(event_type, data, event_data, webhook_event)
         except Exception as exc:
             logger.exception("Error processing webhook for reference %s: %s", reference, exc)
             return {"success": False, "error": str(exc), "data": {}}
 
+    @staticmethod
+    def _parse_paystack_event(event_data: Dict[str, Any]):
+        """Return (event_type, reference, data) for a Paystack webhook body."""
+        data = event_data.get("data", {}) or {}
+        return event_data.get("event"), data.get("reference"), data
+
+    @staticmethod
+    def _dispatch_paystack_event(event_type, data, event_data, webhook_event: WebhookEvent) -> Dict[str, Any]:
+        if event_type == "charge.success":
+            return WebhookService._handle_successful_charge(data, webhook_event)
+        if event_type == "transfer.success":
+            return WebhookService._handle_successful_transfer(data, webhook_event)
+        if event_type in ("transfer.failed", "transfer.reversed"):
+            return WebhookService._handle_failed_transfer(data, webhook_event)
+
+        # Unhandled event recorded for audit
+        WebhookService._mark_unhandled(webhook_event)
+        return {"success": True, "message": "Unhandled event recorded", "data": {}}
+
     # -----------------
     # Paystack event handlers
     # # -----------------
@@ -563,6 +682,13 @@ class WebhookService:
                         withdrawal.gateway_response = data
                         withdrawal.save(update_fields=["status", "processed_at", "gateway_response"])
 
+                    # The account may have been closed or changed; register it afresh next time
+                    details = (data.get("recipient") or {}).get("details") or {}
+                    TransferRecipient.forget(
+                        payment_txn.user, payment_txn.gateway,
+                        details.get("bank_code"), details.get("account_number"),
+                    )
+
                     webhook_event.processed = True
                     webhook_event.processed_at = timezone.now()
                     webhook_event.payload = data
@@ -591,6 +717,32 @@ class WebhookService:
     @staticmethod
     def process_flutterwave_webhook(event_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process incoming Flutterwave webhook JSON and handle idempotency."""
+        event_type, tx_ref, data = WebhookService._parse_flutterwave_event(event_data)
+
+        if not tx_ref:
+            logger.warning("Flutterwave webhook missing tx_ref: %s", event_data)
+            return {"success": False, "error": "No tx_ref found", "data": {}}
+
+        gateway = PaymentGateway.objects.filter(name__iexact="flutterwave").first()
+        if not gateway:
+            logger.error("Webhook received but PaymentGateway 'flutterwave' not configured")
+            return {"success": False, "error": "Gateway not configured", "data": {}}
+
+        webhook_event, created = WebhookService._record_webhook_event(gateway, tx_ref, event_type, event_data)
+
+        if webhook_event.processed:
+            logger.info("Duplicate Flutterwave webhook ignored for reference %s", tx_ref)
+            return {"success": True, "message": "Duplicate event ignored", "data": {}}
+
+        try:
+            return WebhookService._dispatch_flutterwave_event(event_type, data, event_data, webhook_event)
+        except Exception as exc:
+            logger.exception("Error processing Flutterwave webhook for reference %s: %s", tx_ref, exc)
+            return {"success": False, "error": str(exc), "data": {}}
+
+    @staticmethod
+    def _parse_flutterwave_event(event_data: Dict[str, Any]):
+        """Return (event_type, tx_ref, data) for a Flutterwave webhook body."""
         # Flutterwave sometimes sends 'event' or 'event.type'
         event_type = (
             event_data.get("event")
@@ -610,59 +762,30 @@ class WebhookService:
             or data.get("reference")
             or data.get("orderRef")
         )
+        return event_type, tx_ref, data
 
+    @staticmethod
+    def _dispatch_flutterwave_event(event_type, data, event_data, webhook_event: WebhookEvent) -> Dict[str, Any]:
+        status = data.get("status", "").lower()
 
-        if not tx_ref:
-            logger.warning("Flutterwave webhook missing tx_ref: %s", event_data)
-            return {"success": False, "error": "No tx_ref found", "data": {}}
-
-        gateway = PaymentGateway.objects.filter(name__iexact="flutterwave").first()
-        if not gateway:
-            logger.error("Webhook received but PaymentGateway 'flutterwave' not configured")
-            return {"success": False, "error": "Gateway not configured", "data": {}}
+        # Card/charge payment
+        if event_type == "charge.completed" and status == "successful":
+            return WebhookService._handle_successful_flutterwave_charge(data, webhook_event)
 
-        webhook_event, created = WebhookEvent.objects.get_or_create(
-            gateway=gateway,
-            reference=tx_ref,
-            defaults={"event_type": event_type, "payload": event_data},
-        )
+        # Bank transfer webhook (your current payload)
+        if event_type == "BANK_TRANSFER_TRANSACTION" and status == "successful":
+            return WebhookService._handle_successful_flutterwave_charge(data, webhook_event)
 
-        if webhook_event.processed:
-            logger.info("Duplicate Flutterwave webhook ignored for reference %s", tx_ref)
-            return {"success": True, "message": "Duplicate event ignored", "data": {}}
-                
-        # Now mark as processing (prevents race conditions)
-        webhook_event.processing_started = timezone.now()
-        webhook_event.save()
-        try:
-            status = data.get("status", "").lower()
-
-            # Card/charge payment
-            if event_type == "charge.completed" and status == "successful":
-                result = WebhookService._handle_successful_flutterwave_charge(data, webhook_event)
-
-            # Bank transfer webhook (your current payload)
-            elif event_type == "BANK_TRANSFER_TRANSACTION" and status == "successful":
-                result = WebhookService._handle_successful_flutterwave_charge(data, webhook_event)
-
-            # Transfers
-            elif event_type == "transfer.completed":
-                if status == "successful":
-                    result = WebhookService._handle_successful_flutterwave_transfer(data, webhook_event)
-                elif status in ["failed", "cancelled"]:
-                    result = WebhookService._handle_failed_flutterwave_transfer(data, webhook_event)
-                else:
-                    result = {"success": True, "message": "Unhandled transfer status", "data": data}
-            else:
-                webhook_event.event_type = WebhookEvent.EventType.OTHER
-                webhook_event.payload = event_data
-                webhook_event.save(update_fields=["event_type", "payload"])
-                result = {"success": True, "message": f"Unhandled Flutterwave event {event_type}", "data": data}
+        # Transfers
+        if event_type == "transfer.completed":
+            if status == "successful":
+                return WebhookService._handle_successful_flutterwave_transfer(data, webhook_event)
+            if status in ["failed", "cancelled"]:
+                return WebhookService._handle_failed_flutterwave_transfer(data, webhook_event)
+            return {"success": True, "message": "Unhandled transfer status", "data": data}
 
-            return result
-        except Exception as exc:
-            logger.exception("Error processing Flutterwave webhook for reference %s: %s", tx_ref, exc)
-            return {"success": False, "error": str(exc), "data": {}}
+        WebhookService._mark_unhandled(webhook_event)
+        return {"success": True, "message": f"Unhandled Flutterwave event {event_type}", "data": data}
 
     # Flutterwave event handlers
     @staticmethod
@@ -818,6 +941,12 @@ class WebhookService:
                         withdrawal.gateway_response = data
                         withdrawal.save(update_fields=["status", "processed_at", "gateway_response"])
 
+                    # The account may have been closed or changed; register it afresh next time
+                    TransferRecipient.forget(
+                        payment_txn.user, payment_txn.gateway,
+                        data.get("bank_code"), data.get("account_number"),
+                    )
+
                     webhook_event.processed = True
                     webhook_event.processed_at = timezone.now()
                     webhook_event.payload = data
@@ -849,11 +978,7 @@ class WebhookService:
     @staticmethod
     def process_monnify_webhook(event_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process incoming Monnify webhook JSON and handle idempotency."""
-        event_type = event_data.get("eventType")
-        data = event_data.get("eventData", {})
-        
-        # Monnify uses transactionReference
-        reference = data.get("paymentReference") or data.get("transactionReference")
+        event_type, reference, data = WebhookService._parse_monnify_event(event_data)
         
         if not reference:
             logger.warning("Monnify webhook missing reference: %s", event_data)
@@ -864,35 +989,38 @@ class WebhookService:
             logger.error("Webhook received but PaymentGateway 'monnify' not configured")
             return {"success": False, "error": "Gateway not configured", "data": {}}
 
-        webhook_event, created = WebhookEvent.objects.get_or_create(
-            gateway=gateway,
-            reference=reference,
-            event_type=event_type,
-            defaults={"payload": event_data},
-        )
+        webhook_event, created = WebhookService._record_webhook_event(gateway, reference, event_type, event_data)
         
         if webhook_event.processed:
             logger.info("Duplicate Monnify webhook ignored for reference %s", reference)
             return {"success": True, "message": "Duplicate event ignored", "data": {}}
         
         try:
-            if event_type == "SUCCESSFUL_TRANSACTION":
-                result = WebhookService._handle_successful_monnify_payment(data, webhook_event)
-            elif event_type == "SUCCESSFUL_DISBURSEMENT":
-                result = WebhookService._handle_successful_monnify_transfer(data, webhook_event)
-            elif event_type == "FAILED_DISBURSEMENT":
-                result = WebhookService._handle_failed_monnify_transfer(data, webhook_event)
-            else:
-                webhook_event.event_type = WebhookEvent.EventType.OTHER
-                webhook_event.payload = event_data
-                webhook_event.save(update_fields=["event_type", "payload"])
-                result = {"success": True, "message": f"Unhandled Monnify event {event_type}", "data": data}
-
-            return result
+            return WebhookService._dispatch_monnify_event(event_type, data, event_data, webhook_event)
         except Exception as exc:
             logger.exception("Error processing Monnify webhook for reference %s: %s", reference, exc)
             return {"success": False, "error": str(exc), "data": {}}
 
+    @staticmethod
+    def _parse_monnify_event(event_data: Dict[str, Any]):
+        """Return (event_type, reference, data) for a Monnify webhook body."""
+        data = event_data.get("eventData", {})
+        # Monnify uses transactionReference
+        reference = data.get("paymentReference") or data.get("transactionReference")
+        return event_data.get("eventType"), reference, data
+
+    @staticmethod
+    def _dispatch_monnify_event(event_type, data, event_data, webhook_event: WebhookEvent) -> Dict[str, Any]:
+        if event_type == "SUCCESSFUL_TRANSACTION":
+            return WebhookService._handle_successful_monnify_payment(data, webhook_event)
+        if event_type == "SUCCESSFUL_DISBURSEMENT":
+            return WebhookService._handle_successful_monnify_transfer(data, webhook_event)
+        if event_type == "FAILED_DISBURSEMENT":
+            return WebhookService._handle_failed_monnify_transfer(data, webhook_event)
+
+        WebhookService._mark_unhandled(webhook_event)
+        return {"success": True, "message": f"Unhandled Monnify event {event_type}", "data": data}
+
     @staticmethod
     @transaction.atomic
     def _handle_successful_monnify_payment(data: Dict[str, Any], webhook_event: WebhookEvent) -> Dict[str, Any]:
@@ -1002,6 +1130,12 @@ class WebhookService:
                         reference=payment_txn.internal_reference,
                     )
 
+                    # The account may have been closed or changed; validate it afresh next time
+                    TransferRecipient.forget(
+                        payment_txn.user, payment_txn.gateway,
+                        data.get("destinationBankCode"), data.get("destinationAccountNumber"),
+                    )
+
                     webhook_event.processed = True
                     webhook_event.processed_at = timezone.now()
                     webhook_event.save(update_fields=["processed", "processed_at"])
@@ -1012,20 +1146,273 @@ class WebhookService:
             logger.warning("Withdrawal transaction not found for failed Monnify transfer %s", reference)
             return {"success": False, "error": "Withdrawal transaction not found", "data": {}}
 
+    # -----------------
+    # Idempotency
+    # -----------------
+
+    @staticmethod
+    def _webhook_dedupe_key(gateway_id, reference: str, event_type: str) -> str:
+        digest = hashlib.sha1(f"{gateway_id}:{event_type}:{reference}".encode("utf-8")).hexdigest()
+        return f"webhook:seen:{digest}"
+
+    @staticmethod
+    def _seen_recently(dedupe_key: str) -> bool:
+        """Recent-reference cache lookup; a cache outage just means no fast path."""
+        try:
+            return bool(cache.get(dedupe_key))
+        except Exception as exc:
+            logger.warning("Webhook dedupe cache unavailable: %s", exc)
+            return False
+
+    @staticmethod
+    def _remember_seen(dedupe_key: str) -> None:
+        try:
+            cache.set(dedupe_key, 1, WEBHOOK_DEDUPE_TTL)
+        except Exception as exc:
+            logger.warning("Webhook dedupe cache unavailable: %s", exc)
+
+    @staticmethod
+    def _insert_webhook_event(gateway, reference: str, event_type: str, event_data: Dict[str, Any]):
+        """
+        Insert-or-skip on the (gateway, reference, event_type) idempotency key
+        (INSERT ... ON CONFLICT DO NOTHING), so concurrent duplicate deliveries
+        never wait on each other's row locks. Returns (event, created); event
+        is None when the key already existed.
+        """
+        candidate = WebhookEvent(
+            gateway=gateway,
+            reference=reference,
+            event_type=event_type,
+            payload=event_data,
+        )
+        WebhookEvent.objects.bulk_create([candidate], ignore_conflicts=True)
+        # The primary key is generated client-side, so it only exists if our row won
+        if WebhookEvent.objects.filter(pk=candidate.pk).exists():
+            return candidate, True
+        return None, False
+
+    @staticmethod
+    def _record_webhook_event(gateway, reference: str, event_type: str, event_data: Dict[str, Any]):
+        """Insert-or-skip, falling back to the stored event for duplicates."""
+        event_type = event_type or WebhookEvent.EventType.OTHER
+        webhook_event, created = WebhookService._insert_webhook_event(gateway, reference, event_type, event_data)
+        if not created:
+            webhook_event = WebhookEvent.objects.get(gateway=gateway, reference=reference, event_type=event_type)
+        return webhook_event, created
+
+    @staticmethod
+    def _mark_unhandled(webhook_event: WebhookEvent) -> None:
+        """
+        Record an event we don't act on as processed. The original event_type
+        is kept: it is part of the idempotency key, so rewriting it would let a
+        redelivery insert a second row.
+        """
+        webhook_event.processed = True
+        webhook_event.processed_at = timezone.now()
+        webhook_event.save(update_fields=["processed", "processed_at"])
+
+    # -----------------
+    # Async ingestion queue
+    # -----------------
+
+    @staticmethod
+    def _webhook_handlers():
+        """Gateway name -> (parser, dispatcher) used by the ingestion queue."""
+        return {
+            "paystack": (WebhookService._parse_paystack_event, WebhookService._dispatch_paystack_event),
+            "flutterwave": (WebhookService._parse_flutterwave_event, WebhookService._dispatch_flutterwave_event),
+            "monnify": (WebhookService._parse_monnify_event, WebhookService._dispatch_monnify_event),
+        }
+
+    @staticmethod
+    def enqueue_webhook(gateway_name: str, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persist a signature-verified webhook as a pending WebhookEvent and hand
+        it to the workers. Only a single insert happens on the request path, so
+        gateways get their 200 without waiting on wallet credits or row locks.
+        """
+        parse_event, _ = WebhookService._webhook_handlers()[gateway_name]
+        event_type, reference, _ = parse_event(event_data)
+        if not reference:
+            logger.warning("%s webhook missing reference: %s", gateway_name, event_data)
+            return {"success": False, "error": "No reference found", "data": {}}
+
+        gateway = PaymentGateway.objects.filter(name__iexact=gateway_name).first()
+        if not gateway:
+            logger.error("Webhook received but PaymentGateway '%s' not configured", gateway_name)
+            return {"success": False, "error": "Gateway not configured", "data": {}}
+
+        event_type = event_type or WebhookEvent.EventType.OTHER
+        dedupe_key = WebhookService._webhook_dedupe_key(gateway.id, reference, event_type)
+        # ✅ Duplicate storms are answered from the cache without touching the table
+        if WebhookService._seen_recently(dedupe_key):
+            logger.info("Duplicate %s webhook ignored (cached) for reference %s", gateway_name, reference)
+            return {"success": True, "message": "Duplicate event ignored", "data": {}}
+
+        webhook_event, created = WebhookService._insert_webhook_event(gateway, reference, event_type, event_data)
+        # Only remember the key once the row is durable
+        transaction.on_commit(lambda: WebhookService._remember_seen(dedupe_key))
+        if not created:
+            logger.info("Duplicate %s webhook ignored for reference %s", gateway_name, reference)
+            return {"success": True, "message": "Duplicate event ignored", "data": {}}
+
+        event_id = webhook_event.id
+        transaction.on_commit(lambda: WebhookService._notify_webhook_worker(event_id))
+        return {"success": True, "message": "Event queued", "data": {"event_id": str(event_id)}}
+
+    @staticmethod
+    def _notify_webhook_worker(event_id) -> None:
+        """Ask a worker to pick the event up now; the periodic drain is the fallback."""
+        from .celery_tasks import process_webhook_event
+
+        try:
+            process_webhook_event.delay(str(event_id))
+        except Exception as exc:
+            logger.error("Failed to enqueue webhook event %s: %s", event_id, exc)
+
+    @staticmethod
+    def requeue_webhook_event(gateway_name: str, event_data: Dict[str, Any]) -> bool:
+        """
+        Send the stored event for this payload back to the queue if it was
+        dead-lettered or is backing off after a failed attempt, so it runs now.
+        Returns True if an event was requeued.
+        """
+        parse_event, _ = WebhookService._webhook_handlers()[gateway_name]
+        event_type, reference, _ = parse_event(event_data)
+        events = WebhookEvent.objects.filter(
+            gateway__name__iexact=gateway_name,
+            reference=reference,
+            event_type=event_type or WebhookEvent.EventType.OTHER,
+        )
+        requeued = events.filter(status=WebhookEvent.Status.DEAD).update(
+            status=WebhookEvent.Status.PENDING, attempts=0, next_attempt_at=None, locked_at=None,
+        )
+        requeued += events.filter(status=WebhookEvent.Status.PENDING, attempts__gt=0).update(next_attempt_at=None)
+        if not requeued:
+            return False
+
+        for event_id in events.values_list("id", flat=True):
+            transaction.on_commit(lambda event_id=event_id: WebhookService._notify_webhook_worker(event_id))
+        logger.info("Requeued failed %s webhook for reference %s", gateway_name, reference)
+        return True
 
-class FlutterwaveService:
+    @staticmethod
+    @transaction.atomic
+    def claim_webhook_events(batch_size: int = WEBHOOK_DRAIN_BATCH_SIZE, event_ids=None):
+        """
+        Claim due events with SELECT ... FOR UPDATE SKIP LOCKED so concurrent
+        workers never process the same event. Events stuck in PROCESSING past
+        the visibility timeout (crashed worker) are claimed again.
+        """
+        now = timezone.now()
+        due = (
+            Q(status=WebhookEvent.Status.PENDING)
+            & (Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+        ) | Q(
+            status=WebhookEvent.Status.PROCESSING,
+            locked_at__lt=now - timezone.timedelta(seconds=WEBHOOK_PROCESSING_TIMEOUT),
+        )
+        candidates = WebhookEvent.objects.filter(due)
+        if event_ids is not None:
+            candidates = candidates.filter(id__in=event_ids)
+
+        claimed = list(
+            candidates.select_related("gateway")
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("created_at")[:batch_size]
+        )
+        if claimed:
+            WebhookEvent.objects.filter(id__in=[event.id for event in claimed]).update(
+                status=WebhookEvent.Status.PROCESSING,
+                locked_at=now,
+                attempts=F("attempts") + 1,
+            )
+        for event in claimed:
+            event.status = WebhookEvent.Status.PROCESSING
+            event.attempts += 1
+        return claimed
+
+    @staticmethod
+    def run_webhook_event(webhook_event: WebhookEvent) -> str:
+        """
+        Run the gateway handler for a claimed event and record the outcome:
+        processed, rescheduled with exponential backoff, or dead-lettered once
+        WEBHOOK_MAX_ATTEMPTS is reached. Returns the resulting status.
+        """
+        gateway_name = webhook_event.gateway.name.lower()
+        try:
+            parse_event, dispatch_event = WebhookService._webhook_handlers()[gateway_name]
+            event_type, _, data = parse_event(webhook_event.payload)
+            result = dispatch_event(event_type, data, webhook_event.payload, webhook_event)
+        except Exception as exc:
+            logger.exception("Error processing webhook event %s: %s", webhook_event.id, exc)
+            result = {"success": False, "error": str(exc)}
+
+        now = timezone.now()
+        # Handlers may have saved the event already, so only touch queue fields
+        events = WebhookEvent.objects.filter(pk=webhook_event.pk)
+        if result.get("success"):
+            events.update(
+                status=WebhookEvent.Status.PROCESSED,
+                processed=True,
+                processed_at=Coalesce(F("processed_at"), Value(now)),
+                locked_at=None,
+                last_error="",
+            )
+            return WebhookEvent.Status.PROCESSED
+
+        error = str(result.get("error") or "Unknown error")
+        if webhook_event.attempts >= WEBHOOK_MAX_ATTEMPTS:
+            events.update(status=WebhookEvent.Status.DEAD, locked_at=None, last_error=error)
+            logger.error(
+                "Webhook event %s dead-lettered after %s attempts: %s",
+                webhook_event.id, webhook_event.attempts, error,
+            )
+            return WebhookEvent.Status.DEAD
+
+        delay = min(WEBHOOK_RETRY_BASE_DELAY * 2 ** (webhook_event.attempts - 1), WEBHOOK_RETRY_MAX_DELAY)
+        events.update(
+            status=WebhookEvent.Status.PENDING,
+            next_attempt_at=now + timezone.timedelta(seconds=delay),
+            locked_at=None,
+            last_error=error,
+        )
+        logger.warning(
+            "Webhook event %s failed (attempt %s), retrying in %ss: %s",
+            webhook_event.id, webhook_event.attempts, delay, error,
+        )
+        return WebhookEvent.Status.PENDING
+
+    @staticmethod
+    def drain_webhook_events(batch_size: int = WEBHOOK_DRAIN_BATCH_SIZE, event_ids=None) -> Dict[str, int]:
+        """Claim one batch of due events and process them outside the claim transaction."""
+        claimed = WebhookService.claim_webhook_events(batch_size=batch_size, event_ids=event_ids)
+        totals = {"claimed": len(claimed), "processed": 0, "retried": 0, "dead": 0}
+        outcome_keys = {
+            WebhookEvent.Status.PROCESSED: "processed",
+            WebhookEvent.Status.PENDING: "retried",
+            WebhookEvent.Status.DEAD: "dead",
+        }
+        for webhook_event in claimed:
+            totals[outcome_keys[WebhookService.run_webhook_event(webhook_event)]] += 1
+        return totals
+
+
+class FlutterwaveService(BaseGatewayService):
     """Service class for Flutterwave API integration.
 
     Methods return a consistent structure:
         {"success": bool, "data": {...}, "error": "message"}
     """
 
+    gateway_name = "flutterwave"
+
     def __init__(self):
         self.secret_key = settings.FLUTTERWAVE_SECRET_KEY
         self.public_key = getattr(settings, "FLUTTERWAVE_PUBLIC_KEY", None)
         self.base_url = "https://api.flutterwave.com/v3"
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Pooled, process-wide connection; see payments.gateways
+        self.session = self._client({
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json",
         })
@@ -1033,13 +1420,6 @@ class FlutterwaveService:
     # ------------------------
     # Helpers
     # ------------------------
-    def _get_gateway(self):
-        try:
-            return PaymentGateway.objects.get(name__iexact="flutterwave")
-        except PaymentGateway.DoesNotExist:
-            logger.error("Flutterwave PaymentGateway not configured in DB")
-            return None
-
     # ------------------------
     # Initialize funding (payment)
     # ------------------------
@@ -1061,91 +1441,85 @@ class FlutterwaveService:
             except (InvalidOperation, TypeError):
                 return {"success": False, "data": {}, "error": "Invalid amount"}
 
-            with transaction.atomic():
-                # Create local pending PaymentTransaction
-                payment_transaction = PaymentTransaction.objects.create(
-                    user=user,
-                    gateway=gateway,
-                    transaction_type=PaymentTransaction.TransactionType.FUNDING,
-                    amount_usd=amount_usd,          # ✅ Store original NGN
-                    amount_local=amount_local,      # ✅ Add this field if missing
-                    currency=currency,
-                    gateway_reference=f"FLW_{timezone.now().strftime('%Y%m%d%H%M%S')}_{str(user.id)[:8]}",
-                    status=PaymentTransaction.Status.PENDING,
-                    description=f"Wallet funding via Flutterwave {amount_usd} NGN ",
+            # Intent: committed on its own, no transaction is held across the HTTP call
+            payment_transaction = PaymentTransaction.objects.create(
+                user=user,
+                gateway=gateway,
+                transaction_type=PaymentTransaction.TransactionType.FUNDING,
+                amount_usd=amount_usd,          # ✅ Store original NGN
+                amount_local=amount_local,      # ✅ Add this field if missing
+                currency=currency,
+                gateway_reference=f"FLW_{timezone.now().strftime('%Y%m%d%H%M%S')}_{str(user.id)[:8]}",
+                status=PaymentTransaction.Status.PENDING,
+                description=f"Wallet funding via Flutterwave {amount_usd} NGN ",
+            )
+
+            url = f"{self.base_url}/payments"
+            payload = {
+                "tx_ref": payment_transaction.gateway_reference,
+                "amount": str(amount_dec),  # Flutterwave expects string
+                "currency": currency,
+                "redirect_url": callback_url or "https://example.com/callback",
+                "payment_options": "card,banktransfer,ussd",
+                "customer": {
+                    "email": user.email,
+                    "phonenumber": getattr(user, 'phone', ''),
+                    "name": f"{user.first_name} {user.last_name}".strip() or getattr(user, 'username', str(user.id)),
+                },
+                "customizations": {
+                    "title": "Wallet Funding",
+                    "description": "Fund your wallet",
+                    "logo": "https://yourapp.com/logo.png",  # Update with your logo
+                },
+                "meta": {
+                    "user_id": str(user.id),
+                    "transaction_id": str(payment_transaction.id),
+                    "purpose": "wallet_funding",
+                    "internal_reference": payment_transaction.internal_reference,
+                },
+            }
+
+            # A network error leaves the intent PENDING for the reconciler
+            resp = self.session.post(url, json=payload)
+            resp_data = _safe_json(resp)
+
+            if _ok_resp(resp) and resp_data.get("status") == "success":
+                pay_data = resp_data.get("data", {})
+
+                # Check for payment link
+                if "link" not in pay_data:
+                    PaymentIntentService.fail_intent(payment_transaction, resp_data)
+                    err = "Missing payment link from gateway"
+                    logger.error(err + " - resp: %s", resp_data)
+                    return {"success": False, "data": resp_data, "error": err}
+
+                # Persist FlutterwaveTransaction
+                PaymentIntentService.mark_submitted(
+                    payment_transaction,
+                    resp_data,
+                    FlutterwaveTransaction,
+                    payment_link=pay_data.get("link"),
+                    flutterwave_reference=payment_transaction.gateway_reference,
                 )
 
-                url = f"{self.base_url}/payments"
-                payload = {
-                    "tx_ref": payment_transaction.gateway_reference,
-                    "amount": str(amount_dec),  # Flutterwave expects string
-                    "currency": currency,
-                    "redirect_url": callback_url or "https://example.com/callback",
-                    "payment_options": "card,banktransfer,ussd",
-                    "customer": {
-                        "email": user.email,
-                        "phonenumber": getattr(user, 'phone', ''),
-                        "name": f"{user.first_name} {user.last_name}".strip() or getattr(user, 'username', str(user.id)),
-                    },
-                    "customizations": {
-                        "title": "Wallet Funding",
-                        "description": "Fund your wallet",
-                        "logo": "https://yourapp.com/logo.png",  # Update with your logo
-                    },
-                    "meta": {
-                        "user_id": str(user.id),
+                return {
+                    "success": True,
+                    "data": {
                         "transaction_id": str(payment_transaction.id),
-                        "purpose": "wallet_funding",
                         "internal_reference": payment_transaction.internal_reference,
+                        "gateway_reference": payment_transaction.gateway_reference,
+                        "payment_link": pay_data.get("link"),
+                        "raw": resp_data,
                     },
+                    "error": None,
                 }
 
-                resp = self.session.post(url, json=payload, timeout=HTTP_TIMEOUT)
-                resp_data = _safe_json(resp)
-
-                if _ok_resp(resp) and resp_data.get("status") == "success":
-                    pay_data = resp_data.get("data", {})
-                    
-                    # Check for payment link
-                    if "link" not in pay_data:
-                        payment_transaction.status = PaymentTransaction.Status.FAILED
-                        payment_transaction.gateway_response = resp_data
-                        payment_transaction.save(update_fields=["status", "gateway_response", "updated_at"])
-                        err = "Missing payment link from gateway"
-                        logger.error(err + " - resp: %s", resp_data)
-                        return {"success": False, "data": resp_data, "error": err}
-
-                    # Persist FlutterwaveTransaction
-                    FlutterwaveTransaction.objects.create(
-                        transaction=payment_transaction,
-                        payment_link=pay_data.get("link"),
-                        flutterwave_reference=payment_transaction.gateway_reference,
-                    )
+            # Failure path: mark txn failed
+            PaymentIntentService.fail_intent(payment_transaction, resp_data)
 
-                    payment_transaction.gateway_response = resp_data
-                    payment_transaction.save(update_fields=["gateway_response", "updated_at"])
-
-                    return {
-                        "success": True,
-                        "data": {
-                            "transaction_id": str(payment_transaction.id),
-                            "internal_reference": payment_transaction.internal_reference,
-                            "gateway_reference": payment_transaction.gateway_reference,
-                            "payment_link": pay_data.get("link"),
-                            "raw": resp_data,
-                        },
-                        "error": None,
-                    }
-
-                # Failure path: mark txn failed
-                payment_transaction.status = PaymentTransaction.Status.FAILED
-                payment_transaction.gateway_response = resp_data
-                payment_transaction.description=f"Wallet funding via Flutterwave {payment_transaction.amount_usd} NGN ",
-                payment_transaction.save(update_fields=["status", "gateway_response", "updated_at"])
-
-                err_msg = resp_data.get("message") or "Payment initialization failed"
-                logger.info("Flutterwave init failed: %s", err_msg)
-                return {"success": False, "data": resp_data, "error": err_msg}
+            err_msg = resp_data.get("message") or "Payment initialization failed"
+            logger.info("Flutterwave init failed: %s", err_msg)
+            return {"success": False, "data": resp_data, "error": err_msg}
 
         except requests.RequestException as exc:
             logger.exception("HTTP error during payment initialization: %s", exc)
@@ -1164,7 +1538,7 @@ class FlutterwaveService:
         """
         try:
             url = f"{self.base_url}/transactions/{transaction_id}/verify"
-            resp = self.session.get(url, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url)
             resp_data = _safe_json(resp)
 
             ok = _ok_resp(resp) and resp_data.get("status") == "success"
@@ -1184,7 +1558,7 @@ class FlutterwaveService:
         try:
             url = f"{self.base_url}/transactions/verify_by_reference"
             params = {"tx_ref": tx_ref}
-            resp = self.session.get(url, params=params, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url, params=params)
             resp_data = _safe_json(resp)
 
             ok = _ok_resp(resp) and resp_data.get("status") == "success"
@@ -1208,7 +1582,7 @@ class FlutterwaveService:
                 "account_number": account_number,
                 "beneficiary_name": f"{user.first_name} {user.last_name}".strip() or getattr(user, "username", str(user.id)),
             }
-            resp = self.session.post(url, json=payload, timeout=HTTP_TIMEOUT)
+            resp = self.session.post(url, json=payload)
             resp_data = _safe_json(resp)
             ok = _ok_resp(resp) and resp_data.get("status") == "success"
 
@@ -1222,13 +1596,24 @@ class FlutterwaveService:
             logger.exception("Unexpected error creating beneficiary: %s", exc)
             return {"success": False, "data": {}, "error": str(exc)}
 
+    def _create_transfer_recipient(self, user, bank_code: str, account_number: str) -> Dict[str, Any]:
+        result = self.create_beneficiary(user, bank_code, account_number)
+        if result["success"]:
+            data = result["data"]
+            result["data"] = {
+                "recipient_code": str(data.get("id", "")),
+                "account_name": data.get("full_name", ""),
+            }
+        return result
+
     # ------------------------
     # Initiate transfer (withdrawal)
     # ------------------------
     def initiate_transfer(self, user, amount_usd, bank_code: str, account_number: str, narration: str = "Wallet withdrawal") -> Dict[str, Any]:
         """
         Initiate a transfer (withdrawal).
-        Creates a PENDING PaymentTransaction and FlutterwaveTransaction.
+        Commits the wallet debit and a PENDING PaymentTransaction first, then
+        submits the transfer outside the transaction (see submit_transfer).
         """
         try:
             gateway = self._get_gateway()
@@ -1247,71 +1632,140 @@ class FlutterwaveService:
             # Convert NGN → NGN for Flutterwave
             amount_ngn = CurrencyService.convert_usd_to_local(amount_usd, currency).quantize(Decimal("0.01"))
             import uuid
-            with transaction.atomic():
-                payment_transaction = PaymentTransaction.objects.create(
-                    user=user,
-                    gateway=gateway,
-                    transaction_type=PaymentTransaction.TransactionType.WITHDRAWAL,
-                    amount_usd=amount_usd,      # ✅ NGN amount
-                    amount_local=amount_ngn,    # ✅ NGN amount                    
-                    currency=currency,
-                    gateway_reference=f"FW_{timezone.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}",
-                    status=PaymentTransaction.Status.PENDING,
-                )
-                from wallets.services import WalletService
-
-                # Debit wallet in NGN
-                WalletService.debit_wallet(
-                    user=user,
-                    amount=amount_usd,
-                    category="withdrawal",
-                    description=f"Withdrawal {amount_usd} NGN → {amount_ngn} NGN",
-                    reference=payment_transaction.internal_reference,
-                    payment_transaction=payment_transaction,
-                    extra_data={
-                        "amount_usd": amount_usd,
-                        "amount_local": amount_ngn,
-                        "currency": "NGN",
-                    }
-                )
-
-                url = f"{self.base_url}/transfers"
-                payload = {
-                    "account_bank": bank_code,
-                    "account_number": account_number,
-                    "amount": int(amount_ngn),  # Flutterwave uses integer NGN
+            payment_transaction = PaymentIntentService.create_withdrawal_intent(
+                user=user,
+                gateway=gateway,
+                amount_usd=amount_usd,      # ✅ NGN amount
+                amount_local=amount_ngn,    # ✅ NGN amount
+                currency=currency,
+                gateway_reference=f"FW_{timezone.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}",
+                description=f"Withdrawal {amount_usd} NGN → {amount_ngn} NGN",
+                extra_data={
+                    "amount_usd": amount_usd,
+                    "amount_local": amount_ngn,
                     "currency": "NGN",
-                    "reference": payment_transaction.gateway_reference,
-                    "narration": narration,
-                    "callback_url": "https://cc-marketers.onrender.com/payments/webhooks/flutterwave/",
-                    "debit_currency": "NGN",
-                }
-
-                resp = self.session.post(url, json=payload, timeout=HTTP_TIMEOUT)
-                resp_data = _safe_json(resp)
-
-                if _ok_resp(resp) and resp_data.get("status") == "success":
-                    pay_data = resp_data.get("data", {})
-                    FlutterwaveTransaction.objects.create(
-                        transaction=payment_transaction,
-                        flutterwave_reference=payment_transaction.gateway_reference,
-                        transfer_id=str(pay_data.get("id", "")),
-                        bank_code=bank_code,
-                        account_number=account_number,
-                    )
-                    payment_transaction.gateway_response = resp_data
-                    payment_transaction.save(update_fields=["gateway_response", "updated_at"])
-                    return {"success": True, "data": pay_data, "error": None}
-
-                payment_transaction.status = PaymentTransaction.Status.FAILED
-                payment_transaction.gateway_response = resp_data
-                payment_transaction.save(update_fields=["status", "gateway_response", "updated_at"])
-                return {"success": False, "data": resp_data, "error": resp_data.get("message", "Transfer initiation failed")}
-
+                },
+            )
         except Exception as exc:
             logger.exception("Unexpected error initiating Flutterwave transfer: %s", exc)
             return {"success": False, "data": {}, "error": str(exc)}
 
+        return self.submit_transfer(payment_transaction, bank_code, account_number, narration)
+
+    def submit_transfer(self, payment_transaction, bank_code: str, account_number: str,
+                        narration: str = "Wallet withdrawal") -> Dict[str, Any]:
+        """
+        Send a committed withdrawal intent to Flutterwave. Call this with no
+        transaction open. Rejections fail the intent (refunding the wallet);
+        network errors and 5xx responses are `ambiguous` and left PENDING for
+        the intent reconciler.
+        """
+        url = f"{self.base_url}/transfers"
+        payload = {
+            "account_bank": bank_code,
+            "account_number": account_number,
+            "amount": int(payment_transaction.amount_local),  # Flutterwave uses integer NGN
+            "currency": "NGN",
+            "reference": payment_transaction.gateway_reference,
+            "narration": narration,
+            "callback_url": "https://cc-marketers.onrender.com/payments/webhooks/flutterwave/",
+            "debit_currency": "NGN",
+        }
+
+        try:
+            resp = self.session.post(url, json=payload)
+        except requests.RequestException as exc:
+            logger.exception("HTTP error initiating Flutterwave transfer: %s", exc)
+            return {"success": False, "data": {}, "error": str(exc), "ambiguous": True}
+
+        resp_data = _safe_json(resp)
+        if _ok_resp(resp) and resp_data.get("status") == "success":
+            pay_data = resp_data.get("data", {})
+            recipient = self._lookup_transfer_recipient(
+                payment_transaction.user, payment_transaction.gateway, bank_code, account_number
+            )
+            PaymentIntentService.mark_submitted(
+                payment_transaction,
+                resp_data,
+                FlutterwaveTransaction,
+                flutterwave_reference=payment_transaction.gateway_reference,
+                transfer_id=str(pay_data.get("id", "")),
+                beneficiary_id=recipient.recipient_code if recipient else "",
+                bank_code=bank_code,
+                account_number=account_number,
+                account_name=pay_data.get("full_name") or (recipient.account_name if recipient else ""),
+            )
+            return {"success": True, "data": {**pay_data, "transaction_id": str(payment_transaction.id)}, "error": None}
+
+        error = resp_data.get("message", "Transfer initiation failed")
+        if resp.status_code >= 500:
+            logger.warning("Flutterwave transfer %s outcome unknown: %s", payment_transaction.gateway_reference, error)
+            return {"success": False, "data": resp_data, "error": error, "ambiguous": True}
+
+        PaymentIntentService.fail_intent(payment_transaction, resp_data)
+        return {"success": False, "data": resp_data, "error": error}
+
+    def _fetch_by_reference(self, payment_transaction):
+        """GET the transaction or transfer by our reference; (None, {}) on network errors."""
+        reference = payment_transaction.gateway_reference
+        try:
+            if payment_transaction.transaction_type == PaymentTransaction.TransactionType.WITHDRAWAL:
+                resp = self.session.get(f"{self.base_url}/transfers", params={"reference": reference})
+            else:
+                resp = self.session.get(f"{self.base_url}/transactions/verify_by_reference", params={"tx_ref": reference})
+        except requests.RequestException as exc:
+            logger.warning("Flutterwave lookup for %s failed: %s", reference, exc)
+            return None, {}
+        return resp, _safe_json(resp)
+
+    def lookup_intent(self, payment_transaction):
+        """
+        Look an unacknowledged intent up by reference. Returns ("found" |
+        "missing" | None, response); None means the lookup itself failed.
+        """
+        resp, resp_data = self._fetch_by_reference(payment_transaction)
+        if resp is None:
+            return None, resp_data
+        if _ok_resp(resp) and resp_data.get("status") == "success":
+            # Transfers are listed; an empty list means Flutterwave never got it
+            is_transfer = payment_transaction.transaction_type == PaymentTransaction.TransactionType.WITHDRAWAL
+            if is_transfer and not resp_data.get("data"):
+                return "missing", resp_data
+            return "found", resp_data
+        if resp.status_code in (400, 404):
+            return "missing", resp_data
+        return None, resp_data
+
+    def verification_event(self, payment_transaction):
+        """
+        Current gateway state of a submitted transaction, as
+        ("settle", webhook body) | ("fail", response) | ("pending", response) |
+        (None, response) when the lookup failed.
+        """
+        resp, resp_data = self._fetch_by_reference(payment_transaction)
+        if resp is None or not (_ok_resp(resp) and resp_data.get("status") == "success"):
+            return None, resp_data
+
+        if payment_transaction.transaction_type == PaymentTransaction.TransactionType.WITHDRAWAL:
+            transfers = resp_data.get("data") or []
+            if not transfers:
+                return None, resp_data
+            data = dict(transfers[0])
+            status = (data.get("status") or "").lower()
+            data["status"] = status
+            data.setdefault("reference", payment_transaction.gateway_reference)
+            if status in ("successful", "failed", "cancelled"):
+                return "settle", {"event": "transfer.completed", "data": data}
+            return "pending", resp_data
+
+        data = resp_data.get("data") or {}
+        status = (data.get("status") or "").lower()
+        if status == "successful":
+            return "settle", {"event": "charge.completed", "data": data}
+        if status in ("failed", "cancelled"):
+            return "fail", resp_data
+        return "pending", resp_data
+
     # ------------------------
     # Get banks
     # ------------------------
@@ -1319,7 +1773,7 @@ class FlutterwaveService:
         """Return list of banks from Flutterwave."""
         try:
             url = f"{self.base_url}/banks/{country}"
-            resp = self.session.get(url, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url)
             resp_data = _safe_json(resp)
             ok = _ok_resp(resp) and resp_data.get("status") == "success"
 
@@ -1344,7 +1798,7 @@ class FlutterwaveService:
                 "account_number": account_number,
                 "account_bank": bank_code
             }
-            resp = self.session.post(url, json=payload, timeout=HTTP_TIMEOUT)
+            resp = self.session.post(url, json=payload)
             resp_data = _safe_json(resp)
             ok = _ok_resp(resp) and resp_data.get("status") == "success"
 
@@ -1359,40 +1813,39 @@ class FlutterwaveService:
             return {"success": False, "data": {}, "error": str(exc)}
 
 
-class MonnifyService:
+class MonnifyService(BaseGatewayService):
     """Service class for Monnify API integration.
 
     Methods return a consistent structure:
         {"success": bool, "data": {...}, "error": "message"}
     """
 
+    gateway_name = "monnify"
+
     def __init__(self):
         self.api_key = settings.MONNIFY_API_KEY
         self.secret_key = settings.MONNIFY_SECRET_KEY
         self.contract_code = settings.MONNIFY_CONTRACT_CODE
         self.base_url = getattr(settings, "MONNIFY_BASE_URL", "https://sandbox.monnify.com")
-        self.session = requests.Session()
-        self._access_token = None
-        self._token_expiry = None
+        self.session = self._client()
 
     def _get_access_token(self) -> str:
-        """Get or refresh access token using Basic Auth."""
-        # Check if token is still valid
-        if self._access_token and self._token_expiry and timezone.now() < self._token_expiry:
-            return self._access_token
+        """Access token shared across workers, refreshed ahead of expiry."""
+        return MonnifyTokenCache.get_token(self._login)
 
+    def _login(self):
+        """Authenticate with Basic Auth; returns (access_token, expires_in_seconds)."""
         try:
             url = f"{self.base_url}/api/v1/auth/login"
             auth = (self.api_key, self.secret_key)
             
-            resp = requests.post(url, auth=auth, timeout=HTTP_TIMEOUT)
+            resp = self.session.post(url, auth=auth)
             resp_data = _safe_json(resp)
 
             if resp_data.get("requestSuccessful"):
-                self._access_token = resp_data["responseBody"]["accessToken"]
-                # Token typically expires in 1 hour, set expiry to 55 mins to be safe
-                self._token_expiry = timezone.now() + timezone.timedelta(minutes=55)
-                return self._access_token
+                body = resp_data["responseBody"]
+                # Token typically expires in 1 hour
+                return body["accessToken"], int(body.get("expiresIn") or 3600)
             
             logger.error("Monnify auth failed: %s", resp_data)
             raise Exception("Failed to authenticate with Monnify")
@@ -1408,13 +1861,6 @@ class MonnifyService:
             "Content-Type": "application/json",
         }
 
-    def _get_gateway(self):
-        try:
-            return PaymentGateway.objects.get(name__iexact="monnify")
-        except PaymentGateway.DoesNotExist:
-            logger.error("Monnify PaymentGateway not configured in DB")
-            return None
-
     # ------------------------
     # Initialize funding (payment)
     # ------------------------
@@ -1433,82 +1879,79 @@ class MonnifyService:
             except (InvalidOperation, TypeError):
                 return {"success": False, "data": {}, "error": "Invalid amount"}
 
-            with transaction.atomic():
-                # Create local pending PaymentTransaction
-                payment_transaction = PaymentTransaction.objects.create(
-                    user=user,
-                    gateway=gateway,
-                    transaction_type=PaymentTransaction.TransactionType.FUNDING,
-                    amount_usd=amount_usd,
-                    amount_local=amount_local,
-                    currency=currency,
-                    gateway_reference=f"MON_{timezone.now().strftime('%Y%m%d%H%M%S')}_{str(user.id)[:8]}",
-                    status=PaymentTransaction.Status.PENDING,
-                    description=f"Wallet funding via Monnify {amount_usd} NGN",
+            # Intent: committed on its own, no transaction is held across the HTTP call
+            payment_transaction = PaymentTransaction.objects.create(
+                user=user,
+                gateway=gateway,
+                transaction_type=PaymentTransaction.TransactionType.FUNDING,
+                amount_usd=amount_usd,
+                amount_local=amount_local,
+                currency=currency,
+                gateway_reference=f"MON_{timezone.now().strftime('%Y%m%d%H%M%S')}_{str(user.id)[:8]}",
+                status=PaymentTransaction.Status.PENDING,
+                description=f"Wallet funding via Monnify {amount_usd} NGN",
+            )
+
+            url = f"{self.base_url}/api/v1/merchant/transactions/init-transaction"
+            payload = {
+                "amount": float(amount_dec),
+                "customerName": f"{user.first_name} {user.last_name}".strip() or getattr(user, 'username', str(user.id)),
+                "customerEmail": user.email,
+                "paymentReference": payment_transaction.gateway_reference,
+                "paymentDescription": "Wallet Funding",
+                "currencyCode": currency,
+                "contractCode": self.contract_code,
+                "redirectUrl": callback_url or "https://yourapp.com/callback",
+                "paymentMethods": ["CARD", "ACCOUNT_TRANSFER"],
+                "metaData": {
+                    "user_id": str(user.id),
+                    "transaction_id": str(payment_transaction.id),
+                    "internal_reference": payment_transaction.internal_reference,
+                }
+            }
+
+            # A network error leaves the intent PENDING for the reconciler
+            headers = self._get_headers()
+            resp = self.session.post(url, json=payload, headers=headers)
+            resp_data = _safe_json(resp)
+
+            if resp_data.get("requestSuccessful") and resp_data.get("responseBody"):
+                pay_data = resp_data["responseBody"]
+
+                # Persist MonnifyTransaction
+                PaymentIntentService.mark_submitted(
+                    payment_transaction,
+                    resp_data,
+                    MonnifyTransaction,
+                    checkout_url=pay_data.get("checkoutUrl", ""),
+                    transaction_reference=pay_data.get("transactionReference", ""),
+                    account_number=pay_data.get("accountNumber", ""),
+                    account_name=pay_data.get("accountName", ""),
+                    bank_name=pay_data.get("bankName", ""),
+                    bank_code=pay_data.get("bankCode", ""),
                 )
 
-                url = f"{self.base_url}/api/v1/merchant/transactions/init-transaction"
-                payload = {
-                    "amount": float(amount_dec),
-                    "customerName": f"{user.first_name} {user.last_name}".strip() or getattr(user, 'username', str(user.id)),
-                    "customerEmail": user.email,
-                    "paymentReference": payment_transaction.gateway_reference,
-                    "paymentDescription": "Wallet Funding",
-                    "currencyCode": currency,
-                    "contractCode": self.contract_code,
-                    "redirectUrl": callback_url or "https://yourapp.com/callback",
-                    "paymentMethods": ["CARD", "ACCOUNT_TRANSFER"],
-                    "metaData": {
-                        "user_id": str(user.id),
+                return {
+                    "success": True,
+                    "data": {
                         "transaction_id": str(payment_transaction.id),
                         "internal_reference": payment_transaction.internal_reference,
-                    }
+                        "gateway_reference": payment_transaction.gateway_reference,
+                        "checkout_url": pay_data.get("checkoutUrl"),
+                        "transaction_reference": pay_data.get("transactionReference"),
+                        "account_number": pay_data.get("accountNumber"),
+                        "bank_name": pay_data.get("bankName"),
+                        "raw": resp_data,
+                    },
+                    "error": None,
                 }
 
-                headers = self._get_headers()
-                resp = requests.post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
-                resp_data = _safe_json(resp)
-
-                if resp_data.get("requestSuccessful") and resp_data.get("responseBody"):
-                    pay_data = resp_data["responseBody"]
-                    
-                    # Persist MonnifyTransaction
-                    MonnifyTransaction.objects.create(
-                        transaction=payment_transaction,
-                        checkout_url=pay_data.get("checkoutUrl", ""),
-                        transaction_reference=pay_data.get("transactionReference", ""),
-                        account_number=pay_data.get("accountNumber", ""),
-                        account_name=pay_data.get("accountName", ""),
-                        bank_name=pay_data.get("bankName", ""),
-                        bank_code=pay_data.get("bankCode", ""),
-                    )
+            # Failure path
+            PaymentIntentService.fail_intent(payment_transaction, resp_data)
 
-                    payment_transaction.gateway_response = resp_data
-                    payment_transaction.save(update_fields=["gateway_response", "updated_at"])
-
-                    return {
-                        "success": True,
-                        "data": {
-                            "transaction_id": str(payment_transaction.id),
-                            "internal_reference": payment_transaction.internal_reference,
-                            "gateway_reference": payment_transaction.gateway_reference,
-                            "checkout_url": pay_data.get("checkoutUrl"),
-                            "transaction_reference": pay_data.get("transactionReference"),
-                            "account_number": pay_data.get("accountNumber"),
-                            "bank_name": pay_data.get("bankName"),
-                            "raw": resp_data,
-                        },
-                        "error": None,
-                    }
-
-                # Failure path
-                payment_transaction.status = PaymentTransaction.Status.FAILED
-                payment_transaction.gateway_response = resp_data
-                payment_transaction.save(update_fields=["status", "gateway_response", "updated_at"])
-
-                err_msg = resp_data.get("responseMessage") or "Payment initialization failed"
-                logger.info("Monnify init failed: %s", err_msg)
-                return {"success": False, "data": resp_data, "error": err_msg}
+            err_msg = resp_data.get("responseMessage") or "Payment initialization failed"
+            logger.info("Monnify init failed: %s", err_msg)
+            return {"success": False, "data": resp_data, "error": err_msg}
 
         except Exception as exc:
             logger.exception("Unexpected error in Monnify initialize_payment: %s", exc)
@@ -1528,7 +1971,7 @@ class MonnifyService:
             url = f"{self.base_url}/api/v2/transactions/{encoded_ref}"
             
             headers = self._get_headers()
-            resp = requests.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url, headers=headers)
             resp_data = _safe_json(resp)
 
             ok = resp_data.get("requestSuccessful", False)
@@ -1541,13 +1984,21 @@ class MonnifyService:
             logger.exception("Error during Monnify payment verification: %s", exc)
             return {"success": False, "data": {}, "error": str(exc)}
 
+    def _create_transfer_recipient(self, user, bank_code: str, account_number: str) -> Dict[str, Any]:
+        # Monnify disburses straight to account details; registering means validating the account
+        result = self.resolve_account_number(account_number, bank_code)
+        if result["success"]:
+            result["data"] = {"recipient_code": "", "account_name": result["data"].get("accountName", "")}
+        return result
+
     # ------------------------
     # Initiate transfer (withdrawal)
     # ------------------------
     def initiate_transfer(self, user, amount_usd, bank_code: str, account_number: str, narration: str = "Wallet withdrawal") -> Dict[str, Any]:
         """
         Initiate a transfer (withdrawal).
-        Creates a PENDING PaymentTransaction and MonnifyTransaction.
+        Commits the wallet debit and a PENDING PaymentTransaction first, then
+        submits the transfer outside the transaction (see submit_transfer).
         """
         try:
             gateway = self._get_gateway()
@@ -1562,67 +2013,138 @@ class MonnifyService:
             currency = user.currency
             amount_local = CurrencyService.convert_usd_to_local(amount_usd, currency).quantize(Decimal("0.01"))
 
-            with transaction.atomic():
-                payment_transaction = PaymentTransaction.objects.create(
-                    user=user,
-                    gateway=gateway,
-                    transaction_type=PaymentTransaction.TransactionType.WITHDRAWAL,
-                    amount_usd=amount_usd,
-                    amount_local=amount_local,
-                    currency=currency,
-                    gateway_reference=f"MON_WD_{timezone.now().strftime('%Y%m%d%H%M%S')}_{str(user.id)[:8]}",
-                    status=PaymentTransaction.Status.PENDING,
-                )
-
-                from wallets.services import WalletService
-
-                # Debit wallet in NGN
-                WalletService.debit_wallet(
-                    user=user,
-                    amount=amount_usd,
-                    category="withdrawal",
-                    description=f"Withdrawal {amount_usd} NGN → {amount_local} {currency}",
-                    reference=payment_transaction.internal_reference,
-                    payment_transaction=payment_transaction,
-                )
-
-                url = f"{self.base_url}/api/v2/disbursements/single"
-                payload = {
-                    "amount": float(amount_local),
-                    "reference": payment_transaction.gateway_reference,
-                    "narration": narration,
-                    "destinationBankCode": bank_code,
-                    "destinationAccountNumber": account_number,
-                    "currency": currency,
-                    "sourceAccountNumber": self.contract_code,  # Your Monnify wallet account
-                }
+            payment_transaction = PaymentIntentService.create_withdrawal_intent(
+                user=user,
+                gateway=gateway,
+                amount_usd=amount_usd,
+                amount_local=amount_local,
+                currency=currency,
+                gateway_reference=f"MON_WD_{timezone.now().strftime('%Y%m%d%H%M%S')}_{str(user.id)[:8]}",
+                description=f"Withdrawal {amount_usd} NGN → {amount_local} {currency}",
+            )
+        except Exception as exc:
+            logger.exception("Error initiating Monnify transfer: %s", exc)
+            return {"success": False, "data": {}, "error": str(exc)}
 
-                headers = self._get_headers()
-                resp = requests.post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
-                resp_data = _safe_json(resp)
-
-                if resp_data.get("requestSuccessful"):
-                    pay_data = resp_data.get("responseBody", {})
-                    MonnifyTransaction.objects.create(
-                        transaction=payment_transaction,
-                        transaction_reference=payment_transaction.gateway_reference,
-                        transfer_reference=pay_data.get("reference", ""),
-                        destination_account_number=account_number,
-                        destination_bank_code=bank_code,
-                        destination_account_name=pay_data.get("destinationAccountName", ""),
-                    )
-                    payment_transaction.gateway_response = resp_data
-                    payment_transaction.save(update_fields=["gateway_response", "updated_at"])
-                    return {"success": True, "data": pay_data, "error": None}
+        return self.submit_transfer(payment_transaction, bank_code, account_number, narration)
 
-                payment_transaction.status = PaymentTransaction.Status.FAILED
-                payment_transaction.gateway_response = resp_data
-                payment_transaction.save(update_fields=["status", "gateway_response", "updated_at"])
-                return {"success": False, "data": resp_data, "error": resp_data.get("responseMessage", "Transfer failed")}
+    def submit_transfer(self, payment_transaction, bank_code: str, account_number: str,
+                        narration: str = "Wallet withdrawal") -> Dict[str, Any]:
+        """
+        Send a committed withdrawal intent to Monnify. Call this with no
+        transaction open. Rejections fail the intent (refunding the wallet);
+        network errors and 5xx responses are `ambiguous` and left PENDING for
+        the intent reconciler.
+        """
+        url = f"{self.base_url}/api/v2/disbursements/single"
+        payload = {
+            "amount": float(payment_transaction.amount_local),
+            "reference": payment_transaction.gateway_reference,
+            "narration": narration,
+            "destinationBankCode": bank_code,
+            "destinationAccountNumber": account_number,
+            "currency": payment_transaction.currency,
+            "sourceAccountNumber": self.contract_code,  # Your Monnify wallet account
+        }
 
+        try:
+            headers = self._get_headers()
+            resp = self.session.post(url, json=payload, headers=headers)
         except Exception as exc:
             logger.exception("Error initiating Monnify transfer: %s", exc)
-            return {"success": False, "data": {}, "error": str(exc)}
+            return {"success": False, "data": {}, "error": str(exc), "ambiguous": True}
+
+        resp_data = _safe_json(resp)
+        if resp_data.get("requestSuccessful"):
+            pay_data = resp_data.get("responseBody", {})
+            PaymentIntentService.mark_submitted(
+                payment_transaction,
+                resp_data,
+                MonnifyTransaction,
+                transaction_reference=payment_transaction.gateway_reference,
+                transfer_reference=pay_data.get("reference", ""),
+                destination_account_number=account_number,
+                destination_bank_code=bank_code,
+                destination_account_name=pay_data.get("destinationAccountName", ""),
+            )
+            if pay_data.get("destinationAccountName"):
+                # Monnify has validated the account; get_transfer_recipient can skip the validate call
+                TransferRecipient.objects.update_or_create(
+                    user=payment_transaction.user,
+                    gateway=payment_transaction.gateway,
+                    bank_code=bank_code,
+                    account_number=account_number,
+                    defaults={"account_name": pay_data["destinationAccountName"]},
+                )
+            return {"success": True, "data": {**pay_data, "transaction_id": str(payment_transaction.id)}, "error": None}
+
+        error = resp_data.get("responseMessage", "Transfer failed")
+        if resp.status_code >= 500:
+            logger.warning("Monnify transfer %s outcome unknown: %s", payment_transaction.gateway_reference, error)
+            return {"success": False, "data": resp_data, "error": error, "ambiguous": True}
+
+        PaymentIntentService.fail_intent(payment_transaction, resp_data)
+        return {"success": False, "data": resp_data, "error": error}
+
+    def _fetch_by_reference(self, payment_transaction):
+        """GET the transaction or disbursement by our reference; (None, {}) on errors."""
+        reference = payment_transaction.gateway_reference
+        if payment_transaction.transaction_type == PaymentTransaction.TransactionType.WITHDRAWAL:
+            url = f"{self.base_url}/api/v2/disbursements/single/summary"
+            params = {"reference": reference}
+        else:
+            url = f"{self.base_url}/api/v2/merchant/transactions/query"
+            params = {"paymentReference": reference}
+
+        try:
+            resp = self.session.get(url, params=params, headers=self._get_headers())
+        except Exception as exc:
+            logger.warning("Monnify lookup for %s failed: %s", reference, exc)
+            return None, {}
+        return resp, _safe_json(resp)
+
+    def lookup_intent(self, payment_transaction):
+        """
+        Look an unacknowledged intent up by reference. Returns ("found" |
+        "missing" | None, response); None means the lookup itself failed.
+        """
+        resp, resp_data = self._fetch_by_reference(payment_transaction)
+        if resp is None:
+            return None, resp_data
+        if resp_data.get("requestSuccessful"):
+            return "found", resp_data
+        if resp.status_code in (400, 404):
+            return "missing", resp_data
+        return None, resp_data
+
+    def verification_event(self, payment_transaction):
+        """
+        Current gateway state of a submitted transaction, as
+        ("settle", webhook body) | ("fail", response) | ("pending", response) |
+        (None, response) when the lookup failed.
+        """
+        resp, resp_data = self._fetch_by_reference(payment_transaction)
+        if resp is None or not resp_data.get("requestSuccessful"):
+            return None, resp_data
+
+        body = dict(resp_data.get("responseBody") or {})
+        if payment_transaction.transaction_type == PaymentTransaction.TransactionType.WITHDRAWAL:
+            status = (body.get("status") or "").upper()
+            body.setdefault("reference", payment_transaction.gateway_reference)
+            body.setdefault("transactionReference", payment_transaction.gateway_reference)
+            if status == "SUCCESS":
+                return "settle", {"eventType": "SUCCESSFUL_DISBURSEMENT", "eventData": body}
+            if status in ("FAILED", "REVERSED"):
+                return "settle", {"eventType": "FAILED_DISBURSEMENT", "eventData": body}
+            return "pending", resp_data
+
+        status = (body.get("paymentStatus") or "").upper()
+        body.setdefault("paymentReference", payment_transaction.gateway_reference)
+        if status == "PAID":
+            return "settle", {"eventType": "SUCCESSFUL_TRANSACTION", "eventData": body}
+        if status in ("FAILED", "EXPIRED", "CANCELLED"):
+            return "fail", resp_data
+        return "pending", resp_data
 
     # ------------------------
     # Get banks
@@ -1632,7 +2154,7 @@ class MonnifyService:
         try:
             url = f"{self.base_url}/api/v1/banks"
             headers = self._get_headers()
-            resp = requests.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url, headers=headers)
             resp_data = _safe_json(resp)
 
             if resp_data.get("requestSuccessful"):
@@ -1652,7 +2174,7 @@ class MonnifyService:
             params = {"accountNumber": account_number, "bankCode": bank_code}
             headers = self._get_headers()
             
-            resp = requests.get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
+            resp = self.session.get(url, params=params, headers=headers)
             resp_data = _safe_json(resp)
 
             if resp_data.get("requestSuccessful"):
@@ -1662,6 +2184,310 @@ class MonnifyService:
             logger.exception("Error resolving Monnify account: %s", exc)
             return {"success": False, "data": {}, "error": str(exc)}
 
+class PaymentIntentService:
+    """
+    Gateway calls follow a saga: commit a PENDING PaymentTransaction (the
+    intent, with the wallet debit for withdrawals), call the gateway with no
+    transaction open, then finalize with mark_submitted or fail_intent.
+    Intents stuck in between - a crash or timeout during the call - are
+    settled by reconcile_stale_intents.
+    """
+
+    @staticmethod
+    def _gateway_services():
+        return {
+            "paystack": PaystackService,
+            "flutterwave": FlutterwaveService,
+            "monnify": MonnifyService,
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def create_withdrawal_intent(user, gateway, amount_usd, amount_local, currency, gateway_reference,
+                                 description, extra_data=None) -> PaymentTransaction:
+        """Commit a PENDING withdrawal transaction and debit the wallet for it."""
+        from wallets.services import WalletService
+
+        payment_transaction = PaymentTransaction.objects.create(
+            user=user,
+            gateway=gateway,
+            transaction_type=PaymentTransaction.TransactionType.WITHDRAWAL,
+            category=PaymentTransaction.Category.USER_WITHDRAWAL,
+            amount_usd=amount_usd,
+            amount_local=amount_local,
+            currency=currency,
+            gateway_reference=gateway_reference,
+            status=PaymentTransaction.Status.PENDING,
+        )
+        WalletService.debit_wallet(
+            user=user,
+            amount=amount_usd,
+            category="withdrawal",
+            description=description,
+            reference=payment_transaction.internal_reference,
+            payment_transaction=payment_transaction,
+            extra_data=extra_data,
+        )
+        return payment_transaction
+
+    @staticmethod
+    def mark_submitted(payment_transaction, resp_data, detail_model=None, **detail_fields) -> bool:
+        """
+        Record the gateway's acknowledgement of an intent, with its
+        gateway-specific detail row. Returns False if the intent was settled
+        in the meantime.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            updated = PaymentTransaction.objects.filter(
+                pk=payment_transaction.pk, status=PaymentTransaction.Status.PENDING
+            ).update(gateway_response=resp_data, submitted_at=now, updated_at=now)
+            if updated and detail_model is not None:
+                detail_model.objects.update_or_create(transaction=payment_transaction, defaults=detail_fields)
+
+        if not updated:
+            logger.error(
+                "Gateway accepted %s after the intent was settled; needs manual review",
+                payment_transaction.gateway_reference,
+            )
+            return False
+        payment_transaction.gateway_response = resp_data
+        payment_transaction.submitted_at = now
+        return True
+
+    @staticmethod
+    def fail_intent(payment_transaction, resp_data) -> bool:
+        """
+        Fail an intent the gateway rejected (or never received). Withdrawals
+        are refunded and their WithdrawalRequest marked failed. Returns False
+        if the intent was already settled.
+        """
+        from wallets.services import WalletService
+        from wallets.models import WithdrawalRequest
+
+        with transaction.atomic():
+            payment_txn = PaymentTransaction.objects.select_for_update().get(pk=payment_transaction.pk)
+            if payment_txn.status != PaymentTransaction.Status.PENDING:
+                return False
+
+            payment_txn.status = PaymentTransaction.Status.FAILED
+            payment_txn.gateway_response = resp_data
+            payment_txn.save(update_fields=["status", "gateway_response", "updated_at"])
+
+            if payment_txn.transaction_type == PaymentTransaction.TransactionType.WITHDRAWAL:
+                WalletService.credit_wallet(
+                    user=payment_txn.user,
+                    amount=payment_txn.amount_usd,
+                    category="withdrawal_refund",
+                    description=f"Refund for failed withdrawal (Ref: {payment_txn.gateway_reference})",
+                    reference=f"{payment_txn.internal_reference}_REFUND",
+                )
+                WithdrawalRequest.objects.filter(transaction=payment_txn).update(
+                    status="failed",
+                    gateway_response=resp_data,
+                )
+
+        payment_transaction.status = payment_txn.status
+        payment_transaction.gateway_response = resp_data
+        return True
+
+    @staticmethod
+    def reconcile_stale_intents(older_than: int = PAYMENT_INTENT_STALE_AFTER,
+                                batch_size: int = PAYMENT_INTENT_RECONCILE_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Settle intents whose gateway call never completed. Each one is looked
+        up at its gateway by reference: known ones are marked submitted (their
+        webhook settles them), unknown ones are failed and refunded, and
+        lookups that error are left for the next run.
+        """
+        from wallets.models import WithdrawalRequest
+
+        totals = {"checked": 0, "submitted": 0, "failed": 0, "unknown": 0}
+        # Never judge an intent whose submit call may still be running
+        older_than = max(older_than, PAYMENT_SUBMIT_IN_FLIGHT_MAX)
+        cutoff = timezone.now() - timezone.timedelta(seconds=older_than)
+        intents = list(
+            PaymentTransaction.objects
+            .filter(
+                status=PaymentTransaction.Status.PENDING,
+                submitted_at__isnull=True,
+                created_at__lt=cutoff,
+                gateway__isnull=False,
+            )
+            # Withdrawals are approved long before they are sent: they age from
+            # the payout worker's submit attempt, not from approval, and ones
+            # still queued for it haven't been sent at all
+            .exclude(Exists(WithdrawalRequest.objects.filter(
+                Q(payout_submitted_at__isnull=True) | Q(payout_submitted_at__gte=cutoff),
+                transaction=OuterRef("pk"),
+            )))
+            .select_related("gateway", "user")
+            .order_by("created_at")[:batch_size]
+        )
+
+        services = {}
+        service_classes = PaymentIntentService._gateway_services()
+        for payment_txn in intents:
+            totals["checked"] += 1
+            name = payment_txn.gateway.name.lower()
+            if name not in service_classes:
+                totals["unknown"] += 1
+                continue
+            if name not in services:
+                services[name] = service_classes[name]()
+
+            state, resp_data = services[name].lookup_intent(payment_txn)
+            if state == "found":
+                PaymentIntentService.mark_submitted(payment_txn, resp_data)
+                totals["submitted"] += 1
+            elif state == "missing":
+                PaymentIntentService.fail_intent(payment_txn, {"error": "Not found at gateway", "response": resp_data})
+                totals["failed"] += 1
+            else:
+                totals["unknown"] += 1
+
+        if totals["checked"]:
+            logger.info("Payment intent reconciliation: %s", totals)
+        return totals
+
+
+class PaymentReconciliationService:
+    """
+    Sweeps submitted transactions that are still PENDING because their webhook
+    never arrived. Each run resumes from the previous run's watermark, checks
+    a bounded number of batches against the gateway verify APIs in a small
+    thread pool, and settles what it finds through the webhook queue, so the
+    same idempotent handlers apply. Once the sweep reaches the newest eligible
+    row it wraps back to the lookback horizon.
+    """
+
+    LOCK_KEY = "payments:reconciliation:lock"
+
+    @staticmethod
+    def _eligible(now=None):
+        now = now or timezone.now()
+        return PaymentTransaction.objects.filter(
+            status=PaymentTransaction.Status.PENDING,
+            submitted_at__isnull=False,
+            gateway__isnull=False,
+            created_at__lt=now - timezone.timedelta(seconds=PAYMENT_RECONCILE_GRACE),
+            created_at__gte=now - timezone.timedelta(seconds=PAYMENT_RECONCILE_LOOKBACK),
+        )
+
+    @staticmethod
+    def sweep(max_batches: int = 10, batch_size: int = PAYMENT_RECONCILE_BATCH_SIZE,
+              workers: int = PAYMENT_RECONCILE_WORKERS, dry_run: bool = False):
+        """Run one incremental sweep; returns the ReconciliationRun, or None if one is already running."""
+        if not cache.add(PaymentReconciliationService.LOCK_KEY, 1, PAYMENT_RECONCILE_LOCK_TTL):
+            logger.info("Payment reconciliation already running, skipping")
+            return None
+        try:
+            return PaymentReconciliationService._sweep(max_batches, batch_size, workers, dry_run)
+        finally:
+            cache.delete(PaymentReconciliationService.LOCK_KEY)
+
+    @staticmethod
+    def _sweep(max_batches, batch_size, workers, dry_run):
+        previous = ReconciliationRun.objects.exclude(finished_at__isnull=True).first()
+        run = ReconciliationRun(
+            cursor_created_at=previous.cursor_created_at if previous else None,
+            cursor_id=previous.cursor_id if previous else None,
+        )
+        if not dry_run:
+            run.save()
+
+        eligible = PaymentReconciliationService._eligible().select_related("gateway", "user")
+        service_classes = PaymentIntentService._gateway_services()
+        services = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in range(max_batches):
+                batch = eligible
+                if run.cursor_created_at:
+                    # ✅ Keyset pagination on (created_at, id): no rescans, no OFFSET
+                    batch = batch.filter(
+                        Q(created_at__gt=run.cursor_created_at)
+                        | Q(created_at=run.cursor_created_at, id__gt=run.cursor_id)
+                    )
+                batch = list(batch.order_by("created_at", "id")[:batch_size])
+                if not batch:
+                    # Caught up; the next run starts over from the lookback horizon
+                    run.cursor_created_at = run.cursor_id = None
+                    break
+
+                for payment_txn in batch:
+                    name = payment_txn.gateway.name.lower()
+                    if name in service_classes and name not in services:
+                        services[name] = service_classes[name]()
+
+                # Only the HTTP lookups run in the pool; settlement stays on this thread
+                lookups = pool.map(
+                    lambda txn: PaymentReconciliationService._verify(services, txn), batch
+                )
+                for payment_txn, (outcome, payload) in zip(batch, lookups):
+                    PaymentReconciliationService._apply(run, payment_txn, outcome, payload, dry_run)
+
+                last = batch[-1]
+                run.cursor_created_at, run.cursor_id = last.created_at, last.id
+
+        run.finished_at = timezone.now()
+        if not dry_run:
+            run.save()
+        logger.info(
+            "Payment reconciliation: checked=%s settled=%s failed=%s pending=%s errors=%s drift=%s",
+            run.checked, run.settled, run.failed, run.still_pending, run.errors, len(run.drift),
+        )
+        return run
+
+    @staticmethod
+    def _verify(services, payment_txn):
+        service = services.get(payment_txn.gateway.name.lower())
+        if service is None:
+            return None, {}
+        try:
+            return service.verification_event(payment_txn)
+        except Exception as exc:
+            logger.exception("Verification of %s failed: %s", payment_txn.gateway_reference, exc)
+            return None, {}
+
+    @staticmethod
+    def _apply(run, payment_txn, outcome, payload, dry_run):
+        run.checked += 1
+        if outcome is None:
+            run.errors += 1
+            return
+        if outcome == "pending":
+            run.still_pending += 1
+            return
+
+        run.drift.append({
+            "reference": payment_txn.gateway_reference,
+            "gateway": payment_txn.gateway.name,
+            "type": payment_txn.transaction_type,
+            "amount": str(payment_txn.amount_usd),
+            "created_at": payment_txn.created_at.isoformat(),
+            "action": outcome,
+        })
+        if dry_run:
+            return
+
+        if outcome == "settle":
+            gateway_name = payment_txn.gateway.name.lower()
+            result = WebhookService.enqueue_webhook(gateway_name, payload)
+            if not result.get("success"):
+                run.errors += 1
+            elif result.get("data", {}).get("event_id"):
+                run.settled += 1
+            elif WebhookService.requeue_webhook_event(gateway_name, payload):
+                # The settling event already existed but had failed
+                run.settled += 1
+            else:
+                # Duplicate of an event that is still queued or in flight
+                run.still_pending += 1
+        elif PaymentIntentService.fail_intent(payment_txn, payload):
+            run.failed += 1
+
+
 class CurrencyService:
     """Handles currency conversion and rate management — now fixed to Naira"""
 
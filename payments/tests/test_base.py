@@ -3,11 +3,13 @@ import uuid
 from decimal import Decimal
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from payments.models import PaymentGateway, PaymentTransaction, PaystackTransaction, WebhookEvent
 from wallets.models import Wallet
+from wallets.services import WalletService
 
 User = get_user_model()
 
@@ -49,19 +51,25 @@ class BaseTestCase(TestCase):
             config={'secret_key': 'test_key', 'public_key': 'test_pub_key'}
         )
         
-        # Create wallets
-        cls.user_wallet, _ = Wallet.objects.get_or_create(
-            user=cls.user,
-            defaults={'balance': Decimal('1000.00')}
-        )
-        
-        cls.other_user_wallet, _ = Wallet.objects.get_or_create(
-            user=cls.other_user,
-            defaults={'balance': Decimal('500.00')}
-        )
-    
     def setUp(self):
         """Set up for each test method"""
+        # Bank lists and account lookups are cached across requests
+        cache.clear()
+
+        # Tests mock GatewayClient.get/post; anything they miss must not reach a real gateway
+        gateway_guard = patch(
+            'payments.gateways.GatewayClient.request',
+            side_effect=AssertionError('Unmocked payment gateway call'),
+        )
+        gateway_guard.start()
+        self.addCleanup(gateway_guard.stop)
+
+        # Balances only move through the ledger, so fund the wallets with it
+        WalletService.credit_wallet(self.user, Decimal('1000.00'), 'funding', 'Test funding')
+        WalletService.credit_wallet(self.other_user, Decimal('500.00'), 'funding', 'Test funding')
+        self.user_wallet = Wallet.objects.get(user=self.user)
+        self.other_user_wallet = Wallet.objects.get(user=self.other_user)
+
         self.client = Client()
         self.authenticated_client = Client()
         self.authenticated_client.force_login(self.user)
@@ -72,7 +80,7 @@ class BaseTestCase(TestCase):
         # Common URLs
         self.fund_url = reverse('payments:initiate_funding')
         self.callback_url = reverse('payments:payment_callback')
-        self.withdraw_url = reverse('payments:withdraw')
+        self.withdraw_url = reverse('payments:withdraw_funds')
         self.banks_url = reverse('payments:get_banks')
         self.verify_account_url = reverse('payments:verify_account')
         self.webhook_url = reverse('payments:paystack_webhook')
@@ -0,0 +1,98 @@
+# payments/tests/test_caching.py
+import time
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from payments import caching
+
+
+class BankListCacheTestCase(TestCase):
+    """Bank lists are shared, served stale while refreshing, and never cached empty"""
+
+    def setUp(self):
+        cache.clear()
+        self.banks = [{'name': 'Access Bank', 'code': '044'}]
+
+    def test_bank_list_fetched_once(self):
+        fetcher = Mock(return_value={'success': True, 'data': self.banks})
+
+        self.assertEqual(caching.get_bank_list('paystack', fetcher), self.banks)
+        self.assertEqual(caching.get_bank_list('paystack', fetcher), self.banks)
+
+        fetcher.assert_called_once()
+
+    def test_failed_fetch_not_cached(self):
+        failing = Mock(return_value={'success': False, 'data': [], 'error': 'Network error'})
+        self.assertEqual(caching.get_bank_list('paystack', failing), [])
+
+        fetcher = Mock(return_value={'success': True, 'data': self.banks})
+        self.assertEqual(caching.get_bank_list('paystack', fetcher), self.banks)
+
+    @patch('payments.caching._refresh_in_background')
+    def test_stale_entry_served_while_refreshing(self, mock_refresh):
+        fetcher = Mock(return_value={'success': True, 'data': self.banks})
+        caching.get_bank_list('paystack', fetcher)
+
+        key = caching._bank_list_key('paystack')
+        entry = cache.get(key)
+        entry['refresh_at'] = time.time() - 1
+        cache.set(key, entry)
+
+        self.assertEqual(caching.get_bank_list('paystack', fetcher), self.banks)
+        mock_refresh.assert_called_once_with(key, fetcher)
+        fetcher.assert_called_once()
+
+    @patch('payments.caching.SINGLE_FLIGHT_WAIT', 0.2)
+    def test_concurrent_miss_waits_for_in_flight_fetch(self):
+        key = caching._bank_list_key('paystack')
+        entry = {'banks': self.banks, 'refresh_at': time.time() + 60}
+        # Another worker holds the fetch lock and publishes its result
+        cache.add(caching._lock_key(key), 1)
+        cache.set(key, entry)
+        load = Mock()
+
+        self.assertEqual(caching._single_flight(key, load), entry)
+        load.assert_not_called()
+
+    @patch('payments.caching.SINGLE_FLIGHT_WAIT', 0.1)
+    def test_single_flight_falls_back_to_loading(self):
+        key = caching._bank_list_key('paystack')
+        cache.add(caching._lock_key(key), 1)
+        load = Mock(return_value='loaded')
+
+        self.assertEqual(caching._single_flight(key, load), 'loaded')
+
+
+class AccountResolutionCacheTestCase(TestCase):
+    """Only successful account resolutions are remembered"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_successful_resolution_cached(self):
+        resolver = Mock(return_value={'success': True, 'data': {'account_name': 'John Doe'}})
+
+        first = caching.resolve_account('paystack', '044', '1234567890', resolver)
+        second = caching.resolve_account('paystack', '044', '1234567890', resolver)
+
+        self.assertEqual(first, second)
+        resolver.assert_called_once()
+
+    def test_failed_resolution_not_cached(self):
+        resolver = Mock(return_value={'success': False, 'data': {}, 'error': 'Could not resolve'})
+
+        caching.resolve_account('paystack', '044', '9999999999', resolver)
+        caching.resolve_account('paystack', '044', '9999999999', resolver)
+
+        self.assertEqual(resolver.call_count, 2)
+
+    def test_invalidate_account(self):
+        resolver = Mock(return_value={'success': True, 'data': {'account_name': 'John Doe'}})
+        caching.resolve_account('paystack', '044', '1234567890', resolver)
+
+        caching.invalidate_account('paystack', '044', '1234567890')
+        caching.resolve_account('paystack', '044', '1234567890', resolver)
+
+        self.assertEqual(resolver.call_count, 2)
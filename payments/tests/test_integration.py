@@ -21,8 +21,8 @@ class PaymentIntegrationTestCase(BaseTestCase, PaystackMockMixin, WalletServiceM
     """End-to-end integration tests for payment flows"""
     
     @patch('wallets.services.WalletService.credit_wallet')
-    @patch('payments.services.requests.get')
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.get')
+    @patch('payments.gateways.GatewayClient.post')
     def test_complete_funding_flow(self, mock_post, mock_get, mock_credit):
         """Test complete funding flow from initiation to webhook processing"""
         
@@ -110,8 +110,8 @@ class PaymentIntegrationTestCase(BaseTestCase, PaystackMockMixin, WalletServiceM
     
     @patch('wallets.services.WalletService.credit_wallet')
     @patch('wallets.services.WalletService.debit_wallet')
-    @patch('payments.services.requests.get')
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.get')
+    @patch('payments.gateways.GatewayClient.post')
     @patch('wallets.services.WalletService.get_or_create_wallet')
     def test_complete_withdrawal_flow(self, mock_get_wallet, mock_post, mock_get, mock_debit, mock_credit):
         """Test complete withdrawal flow from initiation to webhook processing"""
@@ -209,8 +209,8 @@ class PaymentIntegrationTestCase(BaseTestCase, PaystackMockMixin, WalletServiceM
     
     @patch('wallets.services.WalletService.credit_wallet')
     @patch('wallets.services.WalletService.debit_wallet')
-    @patch('payments.services.requests.get')
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.get')
+    @patch('payments.gateways.GatewayClient.post')
     @patch('wallets.services.WalletService.get_or_create_wallet')
     def test_failed_withdrawal_with_refund(self, mock_get_wallet, mock_post, mock_get, mock_debit, mock_credit):
         """Test withdrawal flow when transfer fails and wallet is refunded"""
@@ -365,7 +365,7 @@ class PaymentIntegrationTestCase(BaseTestCase, PaystackMockMixin, WalletServiceM
             'PS_DETAIL_REF'
         )
     
-    @patch('payments.services.requests.get')
+    @patch('payments.gateways.GatewayClient.get')
     def test_api_integration(self, mock_get):
         """Test API endpoints integration"""
         
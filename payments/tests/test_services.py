@@ -2,11 +2,13 @@
 import json
 from decimal import Decimal
 from unittest.mock import patch, Mock, MagicMock
+
+import requests
 from django.test import TestCase
 from django.utils import timezone
 
-from payments.services import PaystackService, WebhookService
-from payments.models import PaymentTransaction, PaystackTransaction, WebhookEvent
+from payments.services import PaymentIntentService, PaymentReconciliationService, PaystackService, WebhookService
+from payments.models import PaymentTransaction, PaystackTransaction, TransferRecipient, WebhookEvent
 from .test_base import BaseTestCase, PaystackMockMixin
 
 
@@ -17,7 +19,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         super().setUp()
         self.service = PaystackService()
     
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.post')
     def test_initialize_payment_success(self, mock_post):
         """Test successful payment initialization"""
         # Setup mock response
@@ -54,7 +56,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         self.assertEqual(request_data['currency'], 'NGN')
         self.assertIn('callback_url', request_data)
     
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.post')
     def test_initialize_payment_api_failure(self, mock_post):
         """Test payment initialization when Paystack API fails"""
         # Setup mock response for failure
@@ -76,7 +78,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         transaction = PaymentTransaction.objects.get(user=self.user)
         self.assertEqual(transaction.status, 'failed')
     
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.post')
     def test_initialize_payment_missing_auth_url(self, mock_post):
         """Test when Paystack returns success but missing authorization_url"""
         # Setup mock response without authorization_url
@@ -100,7 +102,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         self.assertFalse(result['success'])
         self.assertIn('No authorization_url returned', result['error'])
     
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.post')
     def test_initialize_payment_network_error(self, mock_post):
         """Test payment initialization with network error"""
         mock_post.side_effect = Exception('Network timeout')
@@ -113,7 +115,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         self.assertFalse(result['success'])
         self.assertEqual(result['error'], 'Network timeout')
     
-    @patch('payments.services.requests.get')
+    @patch('payments.gateways.GatewayClient.get')
     def test_verify_payment_success(self, mock_get):
         """Test successful payment verification"""
         mock_response = Mock()
@@ -130,7 +132,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         mock_get.assert_called_once()
         self.assertIn('test_reference_123', mock_get.call_args[0][0])
     
-    @patch('payments.services.requests.get')
+    @patch('payments.gateways.GatewayClient.get')
     def test_verify_payment_failure(self, mock_get):
         """Test failed payment verification"""
         mock_response = Mock()
@@ -142,7 +144,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         
         self.assertFalse(result['success'])
     
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.post')
     def test_create_transfer_recipient_success(self, mock_post):
         """Test successful transfer recipient creation"""
         mock_response = Mock()
@@ -166,7 +168,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         self.assertEqual(request_data['account_number'], '1234567890')
         self.assertEqual(request_data['type'], 'nuban')
     
-    @patch('payments.services.requests.post')
+    @patch('payments.gateways.GatewayClient.post')
     def test_initiate_transfer_success(self, mock_post):
         """Test successful transfer initiation"""
         mock_response = Mock()
@@ -191,7 +193,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         self.assertEqual(transaction.amount, Decimal('200.00'))
         self.assertEqual(transaction.status, 'pending')
     
-    @patch('payments.services.requests.get')
+    @patch('payments.gateways.GatewayClient.get')
     def test_get_banks_success(self, mock_get):
         """Test successful banks retrieval"""
         mock_response = Mock()
@@ -206,7 +208,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         self.assertEqual(len(result['data']), 3)
         self.assertEqual(result['data'][0]['name'], 'Access Bank')
     
-    @patch('payments.services.requests.get')
+    @patch('payments.gateways.GatewayClient.get')
     def test_resolve_account_number_success(self, mock_get):
         """Test successful account number resolution"""
         mock_response = Mock()
@@ -220,7 +222,7 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         self.assertIn('data', result)
         self.assertEqual(result['data']['account_name'], 'John Doe')
     
-    @patch('payments.services.requests.get')
+    @patch('payments.gateways.GatewayClient.get')
     def test_resolve_account_number_failure(self, mock_get):
         """Test failed account number resolution"""
         mock_response = Mock()
@@ -233,6 +235,47 @@ class PaystackServiceTestCase(BaseTestCase, PaystackMockMixin):
         self.assertFalse(result['success'])
         self.assertIn('error', result)
 
+    @patch.object(PaystackService, 'create_transfer_recipient')
+    def test_get_transfer_recipient_registers_account_once(self, mock_create):
+        """Repeat payouts to the same account reuse the registered recipient"""
+        mock_create.return_value = {
+            'success': True,
+            'data': {'recipient_code': 'RCP_1', 'details': {'account_name': 'Test Account'}},
+            'error': None,
+        }
+
+        first = self.service.get_transfer_recipient(self.user, '044', '1234567890')
+        second = self.service.get_transfer_recipient(self.user, '044', '1234567890')
+
+        mock_create.assert_called_once()
+        self.assertEqual(first['data']['recipient_code'], 'RCP_1')
+        self.assertEqual(second['data'], first['data'])
+        self.assertEqual(TransferRecipient.objects.filter(user=self.user).count(), 1)
+
+        # A different account is registered separately
+        self.service.get_transfer_recipient(self.user, '044', '0987654321')
+        self.assertEqual(mock_create.call_count, 2)
+
+    @patch.object(PaystackService, 'create_transfer_recipient')
+    def test_get_transfer_recipient_failure_not_registered(self, mock_create):
+        """Rejected registrations are not persisted"""
+        mock_create.return_value = {'success': False, 'data': {}, 'error': 'Invalid account'}
+
+        result = self.service.get_transfer_recipient(self.user, '044', '1234567890')
+
+        self.assertFalse(result['success'])
+        self.assertFalse(TransferRecipient.objects.exists())
+
+    def test_forget_transfer_recipient(self):
+        """Forgotten accounts are registered afresh on the next payout"""
+        TransferRecipient.objects.create(
+            user=self.user, gateway=self.gateway, bank_code='044',
+            account_number='1234567890', recipient_code='RCP_1',
+        )
+
+        self.assertEqual(TransferRecipient.forget(self.user, self.gateway, '044', '1234567890'), 1)
+        self.assertFalse(TransferRecipient.objects.exists())
+
 
 class WebhookServiceTestCase(BaseTestCase):
     """Test cases for WebhookService"""
@@ -472,9 +515,10 @@ class WebhookServiceTestCase(BaseTestCase):
         self.assertTrue(result['success'])
         self.assertEqual(result['message'], 'Unhandled event recorded')
         
-        # Verify webhook event was created and marked as 'other'
+        # Verify webhook event was recorded under its own event type
         webhook_event = WebhookEvent.objects.get(reference='WEBHOOK_TEST_REF')
-        self.assertEqual(webhook_event.event_type, 'other')
+        self.assertEqual(webhook_event.event_type, 'subscription.create')
+        self.assertTrue(webhook_event.processed)
     
     def test_process_webhook_exception_handling(self):
         """Test webhook processing with exception in handler"""
@@ -494,4 +538,423 @@ class WebhookServiceTestCase(BaseTestCase):
             result = WebhookService.process_paystack_webhook(webhook_data)
             
             self.assertFalse(result['success'])
-            self.assertEqual(result['error'], 'Database error')
\ No newline at end of file
+            self.assertEqual(result['error'], 'Database error')
+
+class WebhookQueueTestCase(BaseTestCase):
+    """Test cases for the asynchronous webhook ingestion queue"""
+
+    def setUp(self):
+        super().setUp()
+        self.webhook_data = {
+            'event': 'charge.success',
+            'data': {
+                'reference': 'QUEUE_TEST_REF',
+                'amount': 10000,
+                'status': 'success'
+            }
+        }
+
+    @patch('payments.services.WebhookService._notify_webhook_worker')
+    def test_enqueue_persists_pending_event_once(self, mock_notify):
+        """Ingestion stores a pending event and ignores duplicate deliveries"""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = WebhookService.enqueue_webhook('paystack', self.webhook_data)
+            second = WebhookService.enqueue_webhook('paystack', self.webhook_data)
+
+        self.assertTrue(first['success'])
+        self.assertEqual(second['message'], 'Duplicate event ignored')
+        event = WebhookEvent.objects.get(reference='QUEUE_TEST_REF')
+        self.assertEqual(event.status, WebhookEvent.Status.PENDING)
+        self.assertFalse(event.processed)
+        mock_notify.assert_called_once_with(event.id)
+
+    @patch('payments.services.WebhookService._dispatch_paystack_event')
+    def test_drain_processes_and_retries_with_backoff(self, mock_dispatch):
+        """Failed events are rescheduled, successful ones marked processed"""
+        with patch('payments.services.WebhookService._notify_webhook_worker'):
+            WebhookService.enqueue_webhook('paystack', self.webhook_data)
+
+        mock_dispatch.return_value = {'success': False, 'error': 'Temporary failure'}
+        totals = WebhookService.drain_webhook_events()
+        self.assertEqual(totals['retried'], 1)
+
+        event = WebhookEvent.objects.get(reference='QUEUE_TEST_REF')
+        self.assertEqual(event.status, WebhookEvent.Status.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, 'Temporary failure')
+        self.assertGreater(event.next_attempt_at, timezone.now())
+
+        # Not due yet, so nothing is claimed
+        self.assertEqual(WebhookService.drain_webhook_events()['claimed'], 0)
+
+        WebhookEvent.objects.filter(pk=event.pk).update(next_attempt_at=timezone.now())
+        mock_dispatch.return_value = {'success': True}
+        totals = WebhookService.drain_webhook_events()
+        self.assertEqual(totals['processed'], 1)
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, WebhookEvent.Status.PROCESSED)
+        self.assertTrue(event.processed)
+
+    @patch('payments.services.WEBHOOK_MAX_ATTEMPTS', 1)
+    @patch('payments.services.WebhookService._dispatch_paystack_event')
+    def test_drain_dead_letters_after_max_attempts(self, mock_dispatch):
+        """Events that keep failing are dead-lettered"""
+        with patch('payments.services.WebhookService._notify_webhook_worker'):
+            WebhookService.enqueue_webhook('paystack', self.webhook_data)
+
+        mock_dispatch.side_effect = Exception('Database error')
+        totals = WebhookService.drain_webhook_events()
+
+        self.assertEqual(totals['dead'], 1)
+        event = WebhookEvent.objects.get(reference='QUEUE_TEST_REF')
+        self.assertEqual(event.status, WebhookEvent.Status.DEAD)
+        self.assertEqual(event.last_error, 'Database error')
+
+    @patch('payments.services.WebhookService._notify_webhook_worker')
+    def test_enqueue_keys_events_by_type(self, mock_notify):
+        """The same reference with a different event type is a separate event"""
+        transfer_data = {'event': 'transfer.success', 'data': {'reference': 'QUEUE_TEST_REF'}}
+
+        WebhookService.enqueue_webhook('paystack', self.webhook_data)
+        result = WebhookService.enqueue_webhook('paystack', transfer_data)
+
+        self.assertEqual(result['message'], 'Event queued')
+        self.assertEqual(WebhookEvent.objects.filter(reference='QUEUE_TEST_REF').count(), 2)
+
+    @patch('payments.services.WebhookService._notify_webhook_worker')
+    def test_enqueue_rejects_recent_duplicates_from_cache(self, mock_notify):
+        """Once committed, redeliveries are rejected without touching webhook_events"""
+        from django.core.cache import cache
+
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            WebhookService.enqueue_webhook('paystack', self.webhook_data)
+
+        # Only the gateway lookup hits the database
+        with self.assertNumQueries(1):
+            result = WebhookService.enqueue_webhook('paystack', self.webhook_data)
+
+        self.assertEqual(result['message'], 'Duplicate event ignored')
+        self.assertEqual(WebhookEvent.objects.filter(reference='QUEUE_TEST_REF').count(), 1)
+
+
+class PaymentIntentTestCase(BaseTestCase):
+    """Gateway calls run outside transactions; stuck intents are reconciled"""
+
+    def setUp(self):
+        super().setUp()
+        self.service = PaystackService()
+
+    def _intent(self, reference='WD_INTENT_1'):
+        return PaymentIntentService.create_withdrawal_intent(
+            user=self.user,
+            gateway=self.gateway,
+            amount_usd=Decimal('200.00'),
+            amount_local=Decimal('200.00'),
+            currency='NGN',
+            gateway_reference=reference,
+            description='Withdrawal intent',
+        )
+
+    def _age(self, payment_txn, minutes=30):
+        PaymentTransaction.objects.filter(pk=payment_txn.pk).update(
+            created_at=timezone.now() - timezone.timedelta(minutes=minutes)
+        )
+
+    def test_intent_commits_debit_before_gateway_call(self):
+        payment_txn = self._intent()
+
+        self.user_wallet.refresh_from_db()
+        self.assertEqual(self.user_wallet.balance, Decimal('800.00'))
+        self.assertEqual(payment_txn.status, PaymentTransaction.Status.PENDING)
+        self.assertIsNone(payment_txn.submitted_at)
+
+    def test_submit_transfer_success_marks_submitted(self):
+        payment_txn = self._intent()
+        response = Mock(status_code=200)
+        response.json.return_value = {
+            'status': True,
+            'data': {'reference': 'WD_INTENT_1', 'transfer_code': 'TRF_1'},
+        }
+
+        with patch.object(self.service.session, 'post', return_value=response):
+            result = self.service.submit_transfer(payment_txn, 'RCP_1')
+
+        self.assertTrue(result['success'])
+        payment_txn.refresh_from_db()
+        self.assertIsNotNone(payment_txn.submitted_at)
+        self.assertEqual(payment_txn.paystack_details.transfer_code, 'TRF_1')
+
+    def test_submit_transfer_rejection_refunds(self):
+        payment_txn = self._intent()
+        response = Mock(status_code=400)
+        response.json.return_value = {'status': False, 'message': 'Invalid recipient'}
+
+        with patch.object(self.service.session, 'post', return_value=response):
+            result = self.service.submit_transfer(payment_txn, 'RCP_1')
+
+        self.assertFalse(result['success'])
+        self.assertNotIn('ambiguous', result)
+        payment_txn.refresh_from_db()
+        self.assertEqual(payment_txn.status, PaymentTransaction.Status.FAILED)
+        self.user_wallet.refresh_from_db()
+        self.assertEqual(self.user_wallet.balance, Decimal('1000.00'))
+
+    def test_submit_transfer_network_error_is_ambiguous(self):
+        payment_txn = self._intent()
+
+        with patch.object(self.service.session, 'post', side_effect=requests.ConnectionError('reset')):
+            result = self.service.submit_transfer(payment_txn, 'RCP_1')
+
+        self.assertTrue(result['ambiguous'])
+        payment_txn.refresh_from_db()
+        self.assertEqual(payment_txn.status, PaymentTransaction.Status.PENDING)
+        self.user_wallet.refresh_from_db()
+        self.assertEqual(self.user_wallet.balance, Decimal('800.00'))
+
+    def test_bulk_transfer_server_error_is_ambiguous(self):
+        response = Mock(status_code=503)
+        response.json.return_value = {'status': False, 'message': 'Service unavailable'}
+
+        with patch.object(self.service.session, 'post', return_value=response):
+            result = self.service.initiate_bulk_transfer([])
+
+        self.assertFalse(result['success'])
+        self.assertTrue(result['ambiguous'])
+
+    def test_bulk_transfer_rejection_is_not_ambiguous(self):
+        response = Mock(status_code=400)
+        response.json.return_value = {'status': False, 'message': 'Insufficient balance'}
+
+        with patch.object(self.service.session, 'post', return_value=response):
+            result = self.service.initiate_bulk_transfer([])
+
+        self.assertFalse(result['success'])
+        self.assertNotIn('ambiguous', result)
+
+    @patch.object(PaystackService, 'lookup_intent')
+    def test_reconcile_fails_intents_unknown_to_gateway(self, mock_lookup):
+        missing = self._intent('WD_MISSING')
+        found = self._intent('WD_FOUND')
+        fresh = self._intent('WD_FRESH')
+        self._age(missing)
+        self._age(found)
+        mock_lookup.side_effect = lambda txn: (
+            ('missing', {}) if txn.gateway_reference == 'WD_MISSING' else ('found', {'status': True})
+        )
+
+        totals = PaymentIntentService.reconcile_stale_intents()
+
+        self.assertEqual(totals['checked'], 2)
+        self.assertEqual(totals['failed'], 1)
+        self.assertEqual(totals['submitted'], 1)
+        missing.refresh_from_db()
+        found.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(missing.status, PaymentTransaction.Status.FAILED)
+        self.assertIsNotNone(found.submitted_at)
+        self.assertIsNone(fresh.submitted_at)
+        # Only the missing intent was refunded
+        self.user_wallet.refresh_from_db()
+        self.assertEqual(self.user_wallet.balance, Decimal('600.00'))
+
+
+    @patch.object(PaystackService, 'lookup_intent', return_value=('missing', {}))
+    def test_reconcile_ages_withdrawals_from_submit_attempt(self, mock_lookup):
+        from wallets.models import WithdrawalRequest
+
+        payment_txn = self._intent('WD_SLOW_CLAIM')
+        self._age(payment_txn, minutes=60)  # approved an hour ago...
+        withdrawal = WithdrawalRequest.objects.create(
+            user=self.user,
+            amount_usd=Decimal('200.00'),
+            withdrawal_method='bank_transfer',
+            status='approved',
+            transaction=payment_txn,
+            payout_submitted_at=timezone.now(),  # ...but only just handed to the payout worker
+        )
+
+        totals = PaymentIntentService.reconcile_stale_intents()
+
+        self.assertEqual(totals['checked'], 0)
+        mock_lookup.assert_not_called()
+        payment_txn.refresh_from_db()
+        self.assertEqual(payment_txn.status, PaymentTransaction.Status.PENDING)
+
+        # Once the submit attempt itself is stale the lookup may fail it
+        WithdrawalRequest.objects.filter(pk=withdrawal.pk).update(
+            payout_submitted_at=timezone.now() - timezone.timedelta(minutes=30)
+        )
+        totals = PaymentIntentService.reconcile_stale_intents()
+        self.assertEqual(totals['failed'], 1)
+
+    def test_reconcile_never_undercuts_submit_timeout(self):
+        from payments.services import PAYMENT_SUBMIT_IN_FLIGHT_MAX
+
+        payment_txn = self._intent('WD_IN_FLIGHT')
+        self._age(payment_txn, minutes=0)
+        PaymentTransaction.objects.filter(pk=payment_txn.pk).update(
+            created_at=timezone.now() - timezone.timedelta(seconds=PAYMENT_SUBMIT_IN_FLIGHT_MAX - 5)
+        )
+
+        with patch.object(PaystackService, 'lookup_intent') as mock_lookup:
+            totals = PaymentIntentService.reconcile_stale_intents(older_than=1)
+
+        self.assertEqual(totals['checked'], 0)
+        mock_lookup.assert_not_called()
+
+
+class PaymentReconciliationTestCase(BaseTestCase):
+    """Stale pending payments are verified and settled through the webhook queue"""
+
+    def _submitted_funding(self, reference, hours=2):
+        payment_txn = PaymentTransaction.objects.create(
+            user=self.user,
+            gateway=self.gateway,
+            transaction_type=PaymentTransaction.TransactionType.FUNDING,
+            amount_usd=Decimal('100.00'),
+            amount_local=Decimal('100.00'),
+            gateway_reference=reference,
+            status=PaymentTransaction.Status.PENDING,
+            submitted_at=timezone.now(),
+        )
+        PaymentTransaction.objects.filter(pk=payment_txn.pk).update(
+            created_at=timezone.now() - timezone.timedelta(hours=hours)
+        )
+        return payment_txn
+
+    @patch('payments.services.WebhookService._notify_webhook_worker')
+    @patch.object(PaystackService, 'verification_event')
+    def test_sweep_settles_through_webhook_queue(self, mock_verify, mock_notify):
+        settled = self._submitted_funding('RECON_PAID')
+        self._submitted_funding('RECON_WAITING')
+        self._submitted_funding('RECON_RECENT', hours=0)
+        mock_verify.side_effect = lambda txn: (
+            ('settle', {'event': 'charge.success', 'data': {'reference': txn.gateway_reference, 'status': 'success'}})
+            if txn.gateway_reference == 'RECON_PAID' else ('pending', {})
+        )
+
+        run = PaymentReconciliationService.sweep()
+
+        self.assertEqual(run.checked, 2)
+        self.assertEqual(run.settled, 1)
+        self.assertEqual(run.still_pending, 1)
+        self.assertEqual([item['reference'] for item in run.drift], ['RECON_PAID'])
+        event = WebhookEvent.objects.get(reference='RECON_PAID')
+        self.assertEqual(event.event_type, 'charge.success')
+        self.assertEqual(event.status, WebhookEvent.Status.PENDING)
+
+        # Draining the queue runs the regular charge handler
+        WebhookService.drain_webhook_events()
+        settled.refresh_from_db()
+        self.assertEqual(settled.status, PaymentTransaction.Status.SUCCESS)
+
+    def _existing_event(self, reference, **fields):
+        return WebhookEvent.objects.create(
+            gateway=self.gateway,
+            reference=reference,
+            event_type='charge.success',
+            payload={'event': 'charge.success', 'data': {'reference': reference, 'status': 'success'}},
+            **fields,
+        )
+
+    @staticmethod
+    def _settle(txn):
+        return 'settle', {'event': 'charge.success', 'data': {'reference': txn.gateway_reference, 'status': 'success'}}
+
+    @patch('payments.services.WebhookService._notify_webhook_worker')
+    @patch.object(PaystackService, 'verification_event')
+    def test_sweep_requeues_dead_settling_event(self, mock_verify, mock_notify):
+        self._submitted_funding('RECON_DEAD')
+        event = self._existing_event('RECON_DEAD', status=WebhookEvent.Status.DEAD, attempts=5, last_error='boom')
+        mock_verify.side_effect = self._settle
+
+        run = PaymentReconciliationService.sweep()
+
+        self.assertEqual(run.settled, 1)
+        event.refresh_from_db()
+        self.assertEqual(event.status, WebhookEvent.Status.PENDING)
+        self.assertEqual(event.attempts, 0)
+        self.assertIsNone(event.next_attempt_at)
+
+    @patch('payments.services.WebhookService._notify_webhook_worker')
+    @patch.object(PaystackService, 'verification_event')
+    def test_sweep_does_not_count_queued_duplicate_as_settled(self, mock_verify, mock_notify):
+        self._submitted_funding('RECON_QUEUED')
+        self._existing_event('RECON_QUEUED')
+        mock_verify.side_effect = self._settle
+
+        run = PaymentReconciliationService.sweep()
+
+        self.assertEqual(run.settled, 0)
+        self.assertEqual(run.still_pending, 1)
+        self.assertEqual(WebhookEvent.objects.filter(reference='RECON_QUEUED').count(), 1)
+
+    @patch.object(PaystackService, 'verification_event', return_value=('pending', {}))
+    def test_sweep_resumes_from_watermark(self, mock_verify):
+        first = self._submitted_funding('RECON_1', hours=3)
+        second = self._submitted_funding('RECON_2', hours=2)
+
+        run = PaymentReconciliationService.sweep(max_batches=1, batch_size=1)
+        self.assertEqual(mock_verify.call_args[0][0].pk, first.pk)
+        self.assertEqual(run.cursor_id, first.pk)
+
+        PaymentReconciliationService.sweep(max_batches=1, batch_size=1)
+        self.assertEqual(mock_verify.call_args[0][0].pk, second.pk)
+
+        # Caught up: the watermark wraps back to the lookback horizon
+        run = PaymentReconciliationService.sweep(max_batches=2, batch_size=1)
+        self.assertIsNone(run.cursor_id)
+
+    @patch.object(PaystackService, 'verification_event')
+    def test_sweep_fails_abandoned_funding(self, mock_verify):
+        payment_txn = self._submitted_funding('RECON_FAILED')
+        mock_verify.return_value = ('fail', {'data': {'status': 'failed'}})
+
+        run = PaymentReconciliationService.sweep()
+
+        self.assertEqual(run.failed, 1)
+        payment_txn.refresh_from_db()
+        self.assertEqual(payment_txn.status, PaymentTransaction.Status.FAILED)
+
+
+class GatewayClientTestCase(TestCase):
+    """Test cases for the shared gateway HTTP plumbing"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_services_share_pooled_session(self):
+        """Service instances reuse one session per gateway"""
+        with self.settings(PAYSTACK_SECRET_KEY='sk_test'):
+            first = PaystackService()
+            second = PaystackService()
+
+        self.assertIs(first.session.session, second.session.session)
+
+    def test_monnify_token_is_shared_and_refreshed_ahead(self):
+        """The Monnify token is cached across callers and refreshed before expiry"""
+        from payments.gateways import MonnifyTokenCache, MONNIFY_TOKEN_REFRESH_AHEAD
+
+        login = Mock(return_value=('token-1', 3600))
+        self.assertEqual(MonnifyTokenCache.get_token(login), 'token-1')
+        self.assertEqual(MonnifyTokenCache.get_token(login), 'token-1')
+        login.assert_called_once()
+
+        # Inside the refresh-ahead window a new token is fetched
+        login.return_value = ('token-2', MONNIFY_TOKEN_REFRESH_AHEAD - 1)
+        MonnifyTokenCache.invalidate()
+        MonnifyTokenCache.get_token(login)
+        login.return_value = ('token-3', 3600)
+        self.assertEqual(MonnifyTokenCache.get_token(login), 'token-3')
+
+    def test_monnify_refresh_failure_keeps_valid_token(self):
+        """A failed refresh-ahead falls back to the still-valid token"""
+        from payments.gateways import MonnifyTokenCache, MONNIFY_TOKEN_REFRESH_AHEAD
+
+        MonnifyTokenCache.get_token(Mock(return_value=('token-1', MONNIFY_TOKEN_REFRESH_AHEAD - 1)))
+        failing_login = Mock(side_effect=Exception('Monnify down'))
+
+        self.assertEqual(MonnifyTokenCache.get_token(failing_login), 'token-1')
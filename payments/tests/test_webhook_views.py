@@ -73,7 +73,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.content.decode(), 'Invalid JSON')
     
-    @patch('payments.views.WebhookService.process_paystack_webhook')
+    @patch('payments.views.WebhookService.enqueue_webhook')
     def test_webhook_successful_processing(self, mock_process_webhook):
         """Test webhook with successful event processing"""
         mock_process_webhook.return_value = {
@@ -94,9 +94,9 @@ class PaystackWebhookViewTestCase(BaseTestCase):
         self.assertEqual(response.content.decode(), 'OK')
         
         # Verify webhook service was called
-        mock_process_webhook.assert_called_once_with(self.webhook_payload)
+        mock_process_webhook.assert_called_once_with('paystack', self.webhook_payload)
     
-    @patch('payments.views.WebhookService.process_paystack_webhook')
+    @patch('payments.views.WebhookService.enqueue_webhook')
     def test_webhook_processing_failure(self, mock_process_webhook):
         """Test webhook with failed event processing"""
         error_message = 'Transaction not found'
@@ -117,7 +117,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.content.decode(), error_message)
     
-    @patch('payments.views.WebhookService.process_paystack_webhook')
+    @patch('payments.views.WebhookService.enqueue_webhook')
     def test_webhook_processing_exception(self, mock_process_webhook):
         """Test webhook when processing raises an exception"""
         mock_process_webhook.side_effect = Exception('Database connection failed')
@@ -152,7 +152,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
         mock_verify_signature.return_value = True
         
         # Mock the webhook processing to avoid errors
-        with patch('payments.views.WebhookService.process_paystack_webhook') as mock_process:
+        with patch('payments.views.WebhookService.enqueue_webhook') as mock_process:
             mock_process.return_value = {'success': True}
             
             signature = 'test_signature'
@@ -178,7 +178,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
             hashlib.sha512
         ).hexdigest()
         
-        with patch('payments.views.WebhookService.process_paystack_webhook') as mock_process:
+        with patch('payments.views.WebhookService.enqueue_webhook') as mock_process:
             mock_process.return_value = {'success': True}
             
             response = self.client.post(
@@ -219,7 +219,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
         large_json = json.dumps(large_payload).encode('utf-8')
         signature = self.generate_paystack_signature(large_json)
         
-        with patch('payments.views.WebhookService.process_paystack_webhook') as mock_process:
+        with patch('payments.views.WebhookService.enqueue_webhook') as mock_process:
             mock_process.return_value = {'success': True}
             
             response = self.client.post(
@@ -244,7 +244,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
         json_payload = json.dumps(payload).encode('utf-8')
         signature = self.generate_paystack_signature(json_payload)
         
-        with patch('payments.views.WebhookService.process_paystack_webhook') as mock_process:
+        with patch('payments.views.WebhookService.enqueue_webhook') as mock_process:
             mock_process.return_value = {'success': True}
             
             response = self.client.post(
@@ -255,7 +255,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
             )
             
             self.assertEqual(response.status_code, 200)
-            mock_process.assert_called_once_with(payload)
+            mock_process.assert_called_once_with('paystack', payload)
     
     def test_webhook_transfer_success_event(self):
         """Test webhook specifically for transfer.success event"""
@@ -271,7 +271,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
         json_payload = json.dumps(payload).encode('utf-8')
         signature = self.generate_paystack_signature(json_payload)
         
-        with patch('payments.views.WebhookService.process_paystack_webhook') as mock_process:
+        with patch('payments.views.WebhookService.enqueue_webhook') as mock_process:
             mock_process.return_value = {'success': True}
             
             response = self.client.post(
@@ -282,7 +282,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
             )
             
             self.assertEqual(response.status_code, 200)
-            mock_process.assert_called_once_with(payload)
+            mock_process.assert_called_once_with('paystack', payload)
     
     def test_webhook_transfer_failed_event(self):
         """Test webhook specifically for transfer.failed event"""
@@ -298,7 +298,7 @@ class PaystackWebhookViewTestCase(BaseTestCase):
         json_payload = json.dumps(payload).encode('utf-8')
         signature = self.generate_paystack_signature(json_payload)
         
-        with patch('payments.views.WebhookService.process_paystack_webhook') as mock_process:
+        with patch('payments.views.WebhookService.enqueue_webhook') as mock_process:
             mock_process.return_value = {'success': True}
             
             response = self.client.post(
@@ -309,4 +309,4 @@ class PaystackWebhookViewTestCase(BaseTestCase):
             )
             
             self.assertEqual(response.status_code, 200)
-            mock_process.assert_called_once_with(payload)
\ No newline at end of file
+            mock_process.assert_called_once_with('paystack', payload)
\ No newline at end of file
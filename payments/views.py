@@ -7,7 +7,6 @@ from typing import Optional
 from django import forms
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
 from django.db import transaction
 from django.http import JsonResponse, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
@@ -16,9 +15,11 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods        
 from payments.services import CurrencyService
 
+from .caching import get_bank_list, resolve_account
 from .services import PaystackService, WebhookService, FlutterwaveService, MonnifyService
 from payments.forms import FundingForm  
 from wallets.models import Wallet
+from wallets.services import WalletService
 from payments.models import PaymentGateway, PaymentTransaction
 
 logger = logging.getLogger(__name__)
@@ -46,23 +47,6 @@ def _get_active_gateway_by_name(name: str) -> Optional[PaymentGateway]:
     return PaymentGateway.objects.filter(name__iexact=name, is_active=True).first()
 
 
-def _cache_bank_list(cache_key: str, fetcher_callable, ttl: int = 300):
-    """Generic cache helper for bank lists to reduce API calls."""
-    banks = cache.get(cache_key)
-    if banks is None:
-        try:
-            result = fetcher_callable()
-            if isinstance(result, dict):
-                banks = result.get("data") or result.get("banks") or []
-            else:
-                banks = result or []
-            cache.set(cache_key, banks, ttl)
-        except Exception:
-            logger.exception("Failed to fetch bank list for %s", cache_key)
-            banks = []
-    return banks
-
-
 # -------------------------
 # Funding (unified)
 # -------------------------
@@ -270,8 +254,14 @@ def withdraw_funds(request):
 
     # Create pending transaction and debit wallet within the atomic context
     try:
-        wallet.balance -= amount
-        wallet.save(update_fields=["balance"])
+        try:
+            WalletService.debit_wallet(
+                request.user, amount, category="withdrawal",
+                description=f"Withdrawal via {gateway_name}",
+            )
+        except ValueError:
+            messages.error(request, "Insufficient balance.")
+            return redirect("wallets:dashboard")
 
         txn = PaymentTransaction.objects.create(
             wallet=wallet,
@@ -285,8 +275,10 @@ def withdraw_funds(request):
         if not gateway:
             logger.warning("Gateway not found or inactive: %s", gateway_name)
             # refund balance
-            wallet.balance += amount
-            wallet.save(update_fields=["balance"])
+            WalletService.credit_wallet(
+                request.user, amount, category="withdrawal_refund",
+                description="Refund: payment gateway not available",
+            )
             txn.status = "failed"
             txn.response = "Gateway not available"
             txn.save(update_fields=["status", "response"])
@@ -306,8 +298,10 @@ def withdraw_funds(request):
             messages.success(request, f"Withdrawal of {amount} successful via {gateway.name}.")
         else:
             # refund
-            wallet.balance += amount
-            wallet.save(update_fields=["balance"])
+            WalletService.credit_wallet(
+                request.user, amount, category="withdrawal_refund",
+                description=f"Refund: withdrawal via {gateway.name} failed",
+            )
             txn.status = "failed"
             messages.error(request, f"Withdrawal failed: {response}")
 
@@ -333,9 +327,9 @@ def withdraw_funds(request):
 @login_required
 def get_banks(request):
     """
-    Get bank list (Paystack). Cached to reduce API calls.
+    Get bank list (Paystack). Served from the shared cache, refreshed in the background.
     """
-    banks = _cache_bank_list("paystack_banks", lambda: PaystackService().get_banks())
+    banks = get_bank_list("paystack", lambda: PaystackService().get_banks())
     return JsonResponse({"banks": banks})
 
 
@@ -344,7 +338,7 @@ def get_flutterwave_banks(request):
     """
     Get bank list (Flutterwave). Cached similarly.
     """
-    banks = _cache_bank_list("flutterwave_banks", lambda: FlutterwaveService().get_banks())
+    banks = get_bank_list("flutterwave", lambda: FlutterwaveService().get_banks())
     return JsonResponse({"success": bool(banks), "banks": banks})
 
 
@@ -365,8 +359,11 @@ def verify_account(request):
         return JsonResponse({"success": False, "error": "Missing parameters"}, status=400)
 
     try:
-        result = PaystackService().resolve_account_number(account_number, bank_code)
-        if result and result.get("status"):
+        result = resolve_account(
+            "paystack", bank_code, account_number,
+            lambda: PaystackService().resolve_account_number(account_number, bank_code),
+        )
+        if result and (result.get("success") or result.get("status")):
             return JsonResponse({"success": True, "account_name": result["data"]["account_name"]})
     except Exception as exc:
         logger.exception("Error resolving account via Paystack: %s", exc)
@@ -392,7 +389,10 @@ def verify_flutterwave_account(request):
         return JsonResponse({"success": False, "error": "Missing parameters"}, status=400)
 
     try:
-        result = FlutterwaveService().resolve_account_number(account_number, bank_code)
+        result = resolve_account(
+            "flutterwave", bank_code, account_number,
+            lambda: FlutterwaveService().resolve_account_number(account_number, bank_code),
+        )
         if result and result.get("success"):
             return JsonResponse({"success": True, "account_name": result["data"]["account_name"]})
     except Exception as exc:
@@ -404,6 +404,7 @@ def verify_flutterwave_account(request):
 
 # -------------------------
 # Webhooks (signature-verified, CSRF exempt)
+# Events are only persisted here; payments.celery_tasks processes them.
 # -------------------------
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -419,7 +420,7 @@ def paystack_webhook(request):
             return HttpResponse("Invalid signature", status=400)
 
         event_data = json.loads(request.body)
-        result = WebhookService.process_paystack_webhook(event_data)
+        result = WebhookService.enqueue_webhook("paystack", event_data)
         if result.get("success"):
             return HttpResponse("OK", status=200)
         logger.warning("Paystack webhook processing returned error: %s", result)
@@ -446,7 +447,7 @@ def flutterwave_webhook(request):
             return HttpResponse("Invalid signature", status=400)
 
         event_data = json.loads(request.body)
-        result = WebhookService.process_flutterwave_webhook(event_data)
+        result = WebhookService.enqueue_webhook("flutterwave", event_data)
         if result.get("success"):
             return HttpResponse("OK", status=200)
         logger.warning("Flutterwave webhook processing returned error: %s", result)
@@ -464,7 +465,7 @@ def flutterwave_webhook(request):
 @login_required
 def get_monnify_banks(request):
     """Get bank list (Monnify). Cached similarly."""
-    banks = _cache_bank_list("monnify_banks", lambda: MonnifyService().get_banks())
+    banks = get_bank_list("monnify", lambda: MonnifyService().get_banks())
     return JsonResponse({"success": bool(banks), "banks": banks})
 
 
@@ -483,7 +484,10 @@ def verify_monnify_account(request):
         return JsonResponse({"success": False, "error": "Missing parameters"}, status=400)
 
     try:
-        result = MonnifyService().resolve_account_number(account_number, bank_code)
+        result = resolve_account(
+            "monnify", bank_code, account_number,
+            lambda: MonnifyService().resolve_account_number(account_number, bank_code),
+        )
         if result and result.get("success"):
             account_name = result["data"].get("accountName")
             return JsonResponse({"success": True, "account_name": account_name})
@@ -560,7 +564,7 @@ def monnify_webhook(request):
             return HttpResponse("Invalid signature", status=400)
 
         event_data = json.loads(request.body)
-        result = WebhookService.process_monnify_webhook(event_data)
+        result = WebhookService.enqueue_webhook("monnify", event_data)
         if result.get("success"):
             return HttpResponse("OK", status=200)
         logger.warning("Monnify webhook processing returned error: %s", result)
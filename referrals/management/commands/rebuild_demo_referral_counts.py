@@ -0,0 +1,56 @@
+# referrals/management/commands/rebuild_demo_referral_counts.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from referrals.models import ReferralCode
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the maintained active Demo referral counters on ReferralCode'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show which referral codes drifted without making changes',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of referral codes updated per bulk_update',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING('DRY RUN MODE - No changes will be made')
+            )
+
+        codes = ReferralCode.objects.annotate(
+            actual_demo=ReferralCode.active_demo_referrals_subquery(),
+        ).only('id', 'user_id', 'code', 'active_demo_referrals').order_by('id')
+
+        drifted = []
+        for ref_code in codes.iterator(chunk_size=options['batch_size']):
+            if ref_code.actual_demo == ref_code.active_demo_referrals:
+                continue
+
+            self.stdout.write(
+                f'{ref_code.code}: {ref_code.active_demo_referrals}->{ref_code.actual_demo} active Demo referrals'
+            )
+            ref_code.active_demo_referrals = ref_code.actual_demo
+            drifted.append(ref_code)
+
+        if not dry_run and drifted:
+            with transaction.atomic():
+                ReferralCode.objects.bulk_update(
+                    drifted,
+                    ['active_demo_referrals'],
+                    batch_size=options['batch_size'],
+                )
+
+        verb = 'would be rebuilt' if dry_run else 'rebuilt'
+        self.stdout.write(self.style.SUCCESS(f'{len(drifted)} Demo referral counters {verb}'))
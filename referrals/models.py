@@ -6,6 +6,7 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
@@ -24,6 +25,10 @@ class ReferralCode(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     can_refer = models.BooleanField(default=True, help_text="Can this user create new referrals?")
+    active_demo_referrals = models.PositiveIntegerField(
+        default=0,
+        help_text="Level-1 referrals currently on an active Demo subscription (maintained by signals)",
+    )
 
     def save(self, *args, **kwargs):
         if not self.code:
@@ -48,26 +53,60 @@ class ReferralCode(models.Model):
         raise ValueError("Unable to generate unique referral code")
 
     def get_active_demo_referral_count(self):
-        """Count currently active Demo referrals (for Business members' 10-slot limit)."""
-        from subscriptions.services import SubscriptionService
-        
-        logger.debug(f"[REFERRAL_COUNT] Counting active Demo referrals for user: {self.user.username}")
-        
-        count = 0
-        referrals = Referral.objects.filter(
-            referrer=self.user,
-            level=1,
-            is_active=True
-        ).select_related('referred')
-        
-        for ref in referrals:
-            user_sub = SubscriptionService.get_user_active_subscription(ref.referred)
-            if user_sub and user_sub.plan.name == "Demo Account":
-                count += 1
-                logger.debug(f"[REFERRAL_COUNT] Counted Demo user: {ref.referred.username}")
-        
-        logger.info(f"[REFERRAL_COUNT] User {self.user.username} has {count} active Demo referrals")
-        return count
+        """Active Demo referrals (for Business members' 10-slot limit), read from the maintained counter."""
+        return self.active_demo_referrals
+
+    @staticmethod
+    def active_demo_referrals_subquery():
+        """
+        Correlated COUNT of a code owner's level-1 referrals whose referred
+        user currently holds an active Demo subscription.
+        """
+        from subscriptions.models import UserSubscription
+
+        active_demo = UserSubscription.objects.filter(
+            user_id=models.OuterRef("referred_id"),
+            status=UserSubscription.STATUS_ACTIVE,
+            expiry_date__gt=timezone.now(),
+            plan__name="Demo Account",
+        )
+        counts = (
+            Referral.objects.filter(
+                referrer_id=models.OuterRef("user_id"),
+                level=1,
+                is_active=True,
+            )
+            .filter(models.Exists(active_demo))
+            .order_by()
+            .values("referrer_id")
+            .annotate(total=models.Count("pk"))
+            .values("total")
+        )
+        return Coalesce(models.Subquery(counts, output_field=models.PositiveIntegerField()), 0)
+
+    @classmethod
+    def refresh_active_demo_referrals(cls, referrer_ids=None, referred_ids=None):
+        """
+        Recompute `active_demo_referrals` for the given referrers, or for the
+        level-1 referrers of the given referred users, with a single UPDATE.
+
+        Recomputing (rather than +1/-1) keeps the counter self-healing when
+        subscriptions change through bulk updates.
+        """
+        referrer_ids = set(referrer_ids or ())
+        if referred_ids:
+            referrer_ids.update(
+                Referral.objects.filter(referred_id__in=referred_ids, level=1)
+                .values_list("referrer_id", flat=True)
+            )
+        if not referrer_ids:
+            return 0
+
+        updated = cls.objects.filter(user_id__in=referrer_ids).update(
+            active_demo_referrals=cls.active_demo_referrals_subquery()
+        )
+        logger.debug(f"[REFERRAL_COUNT] Refreshed Demo referral counters for {updated} referrers")
+        return updated
 
     def __str__(self):
         return f"{self.user.get_display_name()} - {self.code}"
@@ -193,36 +232,43 @@ class ReferralEarning(models.Model):
             logger.warning(f"[WALLET_CREDIT] Duplicate detected! Skipping credit for: {ref}")
             return
 
+        # Local import: wallets.services imports this module
+        from wallets.services import WalletService
+
         try:
-            wallet, created = Wallet.objects.select_for_update().get_or_create(user=self.referrer)
+            wallet, created = Wallet.objects.get_or_create(user=self.referrer)
             if created:
                 logger.info(f"[WALLET_CREDIT] Created new wallet for user: {self.referrer.username}")
-            
-            balance_before = wallet.balance
-            balance_after = balance_before + Decimal(self.amount)
 
             logger.info(
-                f"[WALLET_CREDIT] Crediting {self.referrer.username}: "
-                f"₦{balance_before} → ₦{balance_after} (+₦{self.amount})"
+                f"[WALLET_CREDIT] Crediting {self.referrer.username}: +₦{self.amount}"
             )
 
+            description = f"Referral earning from {self.referred_user.username}"
             tx = PaymentTransaction.objects.create(
                 user=self.referrer,
                 transaction_type="funding",
                 category="referral_bonus",
                 amount_usd=self.amount,
-                balance_before=balance_before,
-                balance_after=balance_after,
+                balance_before=wallet.balance,
+                balance_after=wallet.balance,
                 status="success",
                 reference=ref,
-                description=f"Referral earning from {self.referred_user.username}",
+                description=description,
             )
             
             self.transaction_id = str(tx.id)
             super().save(update_fields=["transaction_id"])
 
-            wallet.balance = balance_after
-            wallet.save(update_fields=["balance"])
+            # Ledger entry + balance bump; also stamps tx.balance_before/after
+            WalletService.credit_wallet(
+                user=self.referrer,
+                amount=Decimal(self.amount),
+                category="referral_bonus",
+                description=description,
+                reference=ref,
+                payment_transaction=tx,
+            )
             
             logger.info(
                 f"[WALLET_CREDIT] ✅ Successfully credited {self.referrer.username} - "
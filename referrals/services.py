@@ -500,6 +500,20 @@ class ReferralEarningService:
 class ReferralSubscriptionHandler:
     """Handles subscription changes and their impact on referrals."""
     
+    @classmethod
+    def refresh_referrer_demo_counts(cls, user):
+        """
+        Recompute the active Demo counters of everyone who directly referred
+        `user`, so their Demo slot checks see this plan change immediately.
+        """
+        try:
+            ReferralCode.refresh_active_demo_referrals(referred_ids=[user.pk])
+        except Exception as e:
+            logger.error(
+                f"[DEMO_COUNT] ❌ Failed to refresh referrer Demo counts for {user.username}: {str(e)}",
+                exc_info=True
+            )
+    
     @classmethod
     def handle_subscription_upgrade(cls, user, old_plan: str, new_plan: str):  
         """
@@ -526,6 +540,8 @@ class ReferralSubscriptionHandler:
                 else:
                     logger.debug(f"[SUB_UPGRADE] can_refer already enabled for {user.username}")
                 
+                cls.refresh_referrer_demo_counts(user)
+                
                 logger.info(
                     f"[SUB_UPGRADE] ✅ {user.username} can now refer 10 Demo + unlimited Business users"
                 )
@@ -568,6 +584,8 @@ class ReferralSubscriptionHandler:
                 else:
                     logger.debug(f"[SUB_DOWNGRADE] can_refer already disabled for {user.username}")
                 
+                cls.refresh_referrer_demo_counts(user)
+                
                 # Count existing referrals
                 existing_referrals_count = Referral.objects.filter(
                     referrer=user,
@@ -615,6 +633,8 @@ class ReferralSubscriptionHandler:
                 referral_code.save(update_fields=changes)
                 logger.info(f"[SUB_CANCEL] Updated fields for {user.username}: {changes}")
             
+            cls.refresh_referrer_demo_counts(user)
+            
             logger.info(f"[SUB_CANCEL] ✅ {user.username} referral code deactivated")
             
         except ReferralCode.DoesNotExist:
@@ -1,10 +1,11 @@
 
 import logging
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import ReferralCode
+from .models import Referral, ReferralCode
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -30,3 +31,28 @@ def create_referral_code_for_new_user(sender, instance, created, **kwargs):
                 exc_info=True
             )
 
+
+
+@receiver(post_save, sender="subscriptions.UserSubscription", dispatch_uid="referral_demo_count_on_sub_save")
+@receiver(post_delete, sender="subscriptions.UserSubscription", dispatch_uid="referral_demo_count_on_sub_delete")
+def refresh_referrer_demo_counts_for_subscription(sender, instance, **kwargs):
+    """
+    A referred user's subscription was activated, upgraded, downgraded or
+    expired: recompute their referrers' active Demo counters after commit.
+    """
+    user_id = instance.user_id
+    transaction.on_commit(
+        lambda: ReferralCode.refresh_active_demo_referrals(referred_ids=[user_id])
+    )
+
+
+@receiver(post_save, sender=Referral, dispatch_uid="referral_demo_count_on_referral_save")
+@receiver(post_delete, sender=Referral, dispatch_uid="referral_demo_count_on_referral_delete")
+def refresh_referrer_demo_counts_for_referral(sender, instance, **kwargs):
+    """New or deactivated level-1 referrals change the referrer's Demo count."""
+    if instance.level != 1:
+        return
+    referrer_id = instance.referrer_id
+    transaction.on_commit(
+        lambda: ReferralCode.refresh_active_demo_referrals(referrer_ids=[referrer_id])
+    )
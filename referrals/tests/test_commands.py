@@ -0,0 +1,72 @@
+# tests/test_commands.py
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from referrals.models import Referral, ReferralCode
+from subscriptions.models import SubscriptionPlan, UserSubscription
+
+User = get_user_model()
+
+
+class AuditReferralsCommandTests(TestCase):
+    """Test audit_referrals checks the Demo limit against live counts"""
+
+    def setUp(self):
+        self.demo_plan = SubscriptionPlan.objects.create(
+            name="Demo Account", price=Decimal('0.00'), duration_days=30
+        )
+        self.business_plan = SubscriptionPlan.objects.create(
+            name="Business Member Account", price=Decimal('0.00'), duration_days=30
+        )
+        self.referrer = User.objects.create_user(
+            username='referrer', email='referrer@example.com', password='testpass123'
+        )
+        self._subscribe(self.referrer, self.business_plan)
+        self.code, _ = ReferralCode.objects.get_or_create(user=self.referrer)
+
+    def _subscribe(self, user, plan):
+        UserSubscription.objects.create(
+            user=user,
+            plan=plan,
+            expiry_date=timezone.now() + timezone.timedelta(days=30),
+            status='active',
+        )
+
+    def _refer_demo_users(self, count):
+        for i in range(count):
+            referred = User.objects.create_user(
+                username=f'demo{i}', email=f'demo{i}@example.com', password='testpass123'
+            )
+            Referral.objects.create(
+                referrer=self.referrer, referred=referred, level=1, referral_code=self.code
+            )
+            self._subscribe(referred, self.demo_plan)
+
+    def _audit(self):
+        out = StringIO()
+        call_command('audit_referrals', stdout=out)
+        return out.getvalue()
+
+    def test_stale_counter_does_not_hide_business_over_limit(self):
+        self._refer_demo_users(11)
+        ReferralCode.objects.filter(pk=self.code.pk).update(active_demo_referrals=0)
+
+        output = self._audit()
+
+        self.assertIn('referrer has 11 Demo referrals (limit: 10)', output)
+        self.assertIn('Business users over Demo limit: 1', output)
+        self.assertIn('Demo referral counters out of sync: 1', output)
+
+    def test_counters_in_sync_within_limit(self):
+        self._refer_demo_users(2)
+        ReferralCode.objects.filter(pk=self.code.pk).update(active_demo_referrals=2)
+
+        output = self._audit()
+
+        self.assertIn('Business users over Demo limit: 0', output)
+        self.assertIn('Demo referral counters out of sync: 0', output)
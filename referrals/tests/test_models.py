@@ -304,6 +304,28 @@ class ReferralEarningModelTests(TestCase):
         # Check transaction reference saved
         self.assertEqual(earning.transaction_id, str(transaction.id))
 
+    def test_referral_earning_credit_goes_through_ledger(self):
+        """Referral credits append a ledger entry instead of writing the balance directly"""
+        from wallets.models import WalletLedgerEntry
+
+        earning = ReferralEarning.objects.create(
+            referrer=self.referrer,
+            referred_user=self.referred,
+            referral=self.referral,
+            amount=Decimal('30.00'),
+            earning_type='task_completion',
+            commission_rate=Decimal('10.00'),
+            status='approved'
+        )
+
+        entry = WalletLedgerEntry.objects.get(reference=f"REFERRAL_{earning.id}")
+        self.wallet.refresh_from_db()
+        self.assertEqual(entry.entry_type, 'credit')
+        self.assertEqual(entry.category, 'referral_bonus')
+        self.assertEqual(entry.amount, Decimal('30.00'))
+        self.assertEqual(entry.sequence, self.wallet.ledger_sequence)
+        self.assertEqual(entry.balance_after, self.wallet.balance)
+
     def test_referral_earning_prevent_duplicate_crediting(self):
         """Test that duplicate crediting is prevented"""
         # Create initial earning
@@ -796,3 +818,78 @@ class ModelMethodTests(TestCase):
             
             self.assertEqual(generated, 'UNIQUE12')
             self.assertEqual(mock_choices.call_count, 2)
+
+
+class ActiveDemoReferralCounterTests(TestCase):
+    """Test the maintained active_demo_referrals counter on ReferralCode"""
+
+    def setUp(self):
+        from subscriptions.models import SubscriptionPlan
+
+        self.demo_plan = SubscriptionPlan.objects.create(
+            name="Demo Account",
+            price=Decimal('0.00'),
+            duration_days=30,
+        )
+        self.business_plan = SubscriptionPlan.objects.create(
+            name="Business Member Account",
+            price=Decimal('0.00'),
+            duration_days=30,
+        )
+        self.referrer = User.objects.create_user(
+            username='referrer',
+            email='referrer@example.com',
+            password='testpass123'
+        )
+        self.code, _ = ReferralCode.objects.get_or_create(user=self.referrer)
+
+    def _refer(self, username, plan):
+        from subscriptions.models import UserSubscription
+
+        referred = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Referral.objects.create(
+                referrer=self.referrer,
+                referred=referred,
+                level=1,
+                referral_code=self.code,
+            )
+            subscription = UserSubscription.objects.create(
+                user=referred,
+                plan=plan,
+                expiry_date=timezone.now() + timezone.timedelta(days=30),
+                status='active',
+            )
+        return subscription
+
+    def test_counter_tracks_activation_and_expiry(self):
+        """Demo activations count, Business ones don't, expiries release the slot"""
+        demo_sub = self._refer('demo1', self.demo_plan)
+        self._refer('demo2', self.demo_plan)
+        self._refer('biz1', self.business_plan)
+
+        self.code.refresh_from_db()
+        self.assertEqual(self.code.get_active_demo_referral_count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            demo_sub.status = 'expired'
+            demo_sub.save(update_fields=['status'])
+
+        self.code.refresh_from_db()
+        self.assertEqual(self.code.active_demo_referrals, 1)
+
+    def test_refresh_heals_bulk_updates(self):
+        """Bulk updates skip signals; an explicit refresh recomputes the counter"""
+        from subscriptions.models import UserSubscription
+
+        demo_sub = self._refer('demo1', self.demo_plan)
+        UserSubscription.objects.filter(pk=demo_sub.pk).update(plan=self.business_plan)
+
+        ReferralCode.refresh_active_demo_referrals(referred_ids=[demo_sub.user_id])
+
+        self.code.refresh_from_db()
+        self.assertEqual(self.code.active_demo_referrals, 0)
@@ -6,4 +6,5 @@ class SubscriptionsConfig(AppConfig):
     name = 'subscriptions'
 
     def ready(self):
-        import referrals.services 
\ No newline at end of file
+        import referrals.services
+        import subscriptions.signals  # noqa: F401 
\ No newline at end of file
@@ -0,0 +1,79 @@
+# subscriptions/celery_tasks.py - Expiry scheduling using Celery
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.cache import make_key
+from .models import UserSubscription
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Jobs are only enqueued for subscriptions expiring within this horizon, so
+# broker ETAs stay short (well under the Redis visibility timeout).
+EXPIRY_SCHEDULE_HORIZON = timedelta(seconds=getattr(settings, 'SUBSCRIPTION_EXPIRY_SCHEDULE_HORIZON', 600))
+# The sweeper looks back from the start of its last completed run, less this
+# overlap, so an outage of any length is covered; if that watermark is lost
+# it falls back to this window alone.
+EXPIRY_SWEEP_WINDOW = timedelta(seconds=getattr(settings, 'SUBSCRIPTION_EXPIRY_SWEEP_WINDOW', 60 * 60 * 24))
+EXPIRY_SWEEP_WATERMARK_KEY = make_key('subscriptions', 'expiry_sweep', 'watermark')
+
+
+def schedule_subscription_expiry(subscription):
+    """Enqueue the expiry job for one subscription at its expiry_date."""
+    try:
+        expire_subscription.apply_async(args=[subscription.id], eta=subscription.expiry_date)
+    except Exception as e:
+        # The sweeper picks it up if the broker is unavailable
+        logger.error(f'Failed to schedule expiry for subscription {subscription.id}: {str(e)}')
+
+
+@shared_task
+def expire_subscription(subscription_id):
+    """Renew or expire a single subscription right at its deadline"""
+    from .services import SubscriptionService
+
+    result = SubscriptionService.renew_expired_batch(batch_size=1, subscription_ids=[subscription_id])
+    if result['claimed']:
+        logger.info(f'Subscription {subscription_id} processed at expiry: {result}')
+    return result
+
+
+@shared_task
+def schedule_upcoming_expiries():
+    """Enqueue expiry jobs for active subscriptions expiring within the horizon"""
+    now = timezone.now()
+    upcoming = UserSubscription.objects.filter(
+        status='active',
+        expiry_date__gt=now,
+        expiry_date__lte=now + EXPIRY_SCHEDULE_HORIZON,
+    ).only('id', 'expiry_date')
+
+    scheduled = 0
+    for subscription in upcoming.iterator():
+        schedule_subscription_expiry(subscription)
+        scheduled += 1
+
+    logger.info(f'Scheduled {scheduled} subscription expiry jobs')
+    return scheduled
+
+
+@shared_task
+def sweep_expired_subscriptions():
+    """Catch expired subscriptions whose scheduled job never ran since the last sweep"""
+    from .services import SubscriptionService
+
+    started = timezone.now()
+    try:
+        since = min(cache.get(EXPIRY_SWEEP_WATERMARK_KEY) or started, started)
+        totals = SubscriptionService.check_and_renew_subscriptions(
+            expired_after=since - EXPIRY_SWEEP_WINDOW
+        )
+        cache.set(EXPIRY_SWEEP_WATERMARK_KEY, started, None)
+        logger.info(f'Subscription sweep completed: {totals}')
+        return totals
+    except Exception as e:
+        logger.error(f'Failed to sweep expired subscriptions: {str(e)}')
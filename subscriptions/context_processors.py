@@ -20,8 +20,8 @@ def subscription_context(request):
     if not request.user.is_authenticated:
         return context
 
-    # Active subscription (single query)
-    active_subscription = SubscriptionService.get_user_active_subscription(request.user)
+    # Active subscription (memoized per request, cached across requests)
+    active_subscription = SubscriptionService.get_cached_active_subscription(request.user)
     context["user_active_subscription"] = active_subscription
 
     # Wallet balance (try/catch around import and DB)
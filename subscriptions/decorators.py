@@ -25,7 +25,7 @@ def subscription_required(view_func):
             messages.info(request, "Please log in to continue.")
             return redirect("users:login")
 
-        active_subscription = SubscriptionService.get_user_active_subscription(request.user)
+        active_subscription = SubscriptionService.get_cached_active_subscription(request.user)
         if not active_subscription:
             messages.warning(request, "You need an active subscription to access this feature.")
             logger.info("User %s attempted to access %s without subscription", request.user.pk, request.path)
@@ -52,7 +52,7 @@ def plan_required(plan_name):
                 messages.info(request, "Please log in to continue.")
                 return redirect("users:login")
 
-            active_subscription = SubscriptionService.get_user_active_subscription(request.user)
+            active_subscription = SubscriptionService.get_cached_active_subscription(request.user)
             if not active_subscription or active_subscription.plan.name != plan_name:
                 messages.warning(
                     request,
@@ -14,6 +14,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be done without making changes',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of subscriptions claimed per renewal batch',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
@@ -35,9 +41,14 @@ class Command(BaseCommand):
         
         if not dry_run:
             # Process expired subscriptions
-            SubscriptionService.check_and_renew_subscriptions()
+            totals = SubscriptionService.check_and_renew_subscriptions(
+                batch_size=options['batch_size']
+            )
             self.stdout.write(
-                self.style.SUCCESS('Successfully processed expired subscriptions')
+                self.style.SUCCESS(
+                    f"Successfully processed expired subscriptions "
+                    f"(renewed {totals['renewed']}, expired {totals['expired']})"
+                )
             )
         else:
             # Show what would happen
@@ -40,7 +40,7 @@ class SubscriptionMiddleware(MiddlewareMixin):
             return None
 
         # Enforce subscription
-        active_subscription = SubscriptionService.get_user_active_subscription(request.user)
+        active_subscription = SubscriptionService.get_cached_active_subscription(request.user)
         if not active_subscription:
             messages.warning(request, "You need an active subscription to access this feature.")
             logger.info("User %s attempted to access %s without subscription", request.user.pk, view_name)
@@ -125,3 +125,7 @@ class UserSubscription(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # ✅ Expiry scheduler / sweeper range scans
+            models.Index(fields=["status", "expiry_date"], name="usersub_status_expiry_idx"),
+        ]
@@ -1,11 +1,15 @@
 # subscriptions/services.py
 import logging
 from decimal import Decimal
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
+from core.cache import get_or_set, invalidate_on_commit, make_key
 from wallets.models import Wallet
+from wallets.services import WalletService
 from tasks.services import TaskWalletService
+from referrals.models import ReferralCode
 from referrals.services import (
     ReferralEarningService, 
     ReferralSubscriptionHandler
@@ -15,6 +19,11 @@ from .models import SubscriptionPlan, UserSubscription
 
 logger = logging.getLogger(__name__)
 
+ACTIVE_SUBSCRIPTION_CACHE_TTL = getattr(settings, "ACTIVE_SUBSCRIPTION_CACHE_TTL", 300)
+_REQUEST_MEMO_ATTR = "_active_subscription_memo"
+_MISSING = object()
+RENEWAL_BATCH_SIZE = getattr(settings, "SUBSCRIPTION_RENEWAL_BATCH_SIZE", 500)
+
 
 class SubscriptionService:
     """Business logic for handling user subscriptions."""
@@ -70,15 +79,24 @@ class SubscriptionService:
                 f"(had_business_before: {had_business_before})"
             )
 
-            # Cancel existing active subscriptions
-            UserSubscription.objects.filter(user=user, status="active").update(status="cancelled")
-
-            # Deduct subscription price
-            wallet.balance -= plan.price
-            wallet.save(update_fields=["balance"])
+            # Deduct subscription price through the ledger, before any other write,
+            # so a failed debit leaves nothing behind
+            try:
+                WalletService.debit_wallet(
+                    user=user,
+                    amount=plan.price,
+                    category="subscription",
+                    description=f"Subscription to {plan.name}",
+                )
+            except ValueError:
+                logger.warning(f"[SUBSCRIPTION] Debit failed for {user.username}: insufficient balance")
+                return {"success": False, "error": "Insufficient wallet balance"}
             
             logger.info(f"[SUBSCRIPTION] Deducted ₦{plan.price} from {user.username}'s wallet")
 
+            # Cancel existing active subscriptions
+            UserSubscription.objects.filter(user=user, status="active").update(status="cancelled")
+
             # Create subscription
             subscription = UserSubscription.objects.create(
                 user=user,
@@ -150,64 +168,154 @@ class SubscriptionService:
             
             logger.info(f"[SUBSCRIPTION] 🎉 Subscription complete for {user.username}")
 
+        SubscriptionService.invalidate_active_subscription_cache(user)
+
         return {"success": True, "subscription": subscription}
 
 
     @staticmethod
-    def check_and_renew_subscriptions():
+    def check_and_renew_subscriptions(batch_size=RENEWAL_BATCH_SIZE, expired_after=None):
         """
         Check for expired subscriptions and renew if auto-renewal is enabled.
+        Works through the backlog in batches (see renew_expired_batch); safe to
+        run from several workers at once. Pass `expired_after` to only sweep
+        subscriptions that expired recently.
         ✅ NO CHANGES NEEDED HERE - renewals don't trigger new referral bonuses
         """
         logger.info("[SUBSCRIPTION_RENEWAL] Checking for expired subscriptions...")
-        
-        expired_subscriptions = UserSubscription.objects.filter(
-            status="active",
-            expiry_date__lte=timezone.now(),
-        ).select_related("user", "plan")
-        
-        logger.info(f"[SUBSCRIPTION_RENEWAL] Found {expired_subscriptions.count()} expired subscriptions")
-
-        for subscription in expired_subscriptions:
-            renewed = False
-            if getattr(subscription, "auto_renewal", False):
-                wallet = Wallet.objects.select_for_update().filter(user=subscription.user).first()
-                if wallet and wallet.balance >= subscription.plan.price:
-                    with transaction.atomic():
-                        # Deduct renewal fee
-                        wallet.balance -= subscription.plan.price
-                        wallet.save(update_fields=["balance"])
-
-                        # Renew subscription
-                        now = timezone.now()
-                        subscription.start_date = now
-                        subscription.expiry_date = now + timezone.timedelta(
-                            days=subscription.plan.duration_days
-                        )
-                        subscription.save(update_fields=["start_date", "expiry_date"])
-                        
-                        if subscription.plan.name.strip().lower() == "business member account":
-                            TaskWalletService.credit_wallet(
-                                user=subscription.user,
-                                amount=Decimal("10000.00"),
-                                category="subscription_allocation",
-                                description=f"Monthly allocation from renewed plan {subscription.plan.name}",
-                            )
-                        
-                        renewed = True
-                        logger.info(
-                            f"[SUBSCRIPTION_RENEWAL] ✅ Renewed subscription for "
-                            f"{subscription.user.username}"
-                        )
-            
-            if not renewed:
-                subscription.status = "expired"
-                subscription.save(update_fields=["status"])
-                logger.info(
-                    f"[SUBSCRIPTION_RENEWAL] Expired subscription for "
-                    f"{subscription.user.username} (not renewed)"
+
+        totals = {"claimed": 0, "renewed": 0, "expired": 0}
+        while True:
+            result = SubscriptionService.renew_expired_batch(batch_size, expired_after=expired_after)
+            if not result["claimed"]:
+                break
+            for key in totals:
+                totals[key] += result[key]
+
+        logger.info(
+            f"[SUBSCRIPTION_RENEWAL] Done - processed {totals['claimed']}, "
+            f"renewed {totals['renewed']}, expired {totals['expired']}"
+        )
+        return totals
+
+    @staticmethod
+    @transaction.atomic
+    def renew_expired_batch(batch_size=RENEWAL_BATCH_SIZE, subscription_ids=None, expired_after=None):
+        """
+        Claim up to `batch_size` expired active subscriptions and renew or expire
+        them with set-based writes.
+
+        Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED so parallel
+        workers never see the same subscription, and the claim re-checks
+        status/expiry under the lock so a subscription can't be charged twice.
+        Wallet debits, renewals, expiries and Business allocations are each
+        done with one UPDATE/bulk insert per plan.
+
+        `subscription_ids` / `expired_after` narrow the claim, e.g. for the
+        per-subscription expiry job and the recent-window sweeper.
+        """
+        now = timezone.now()
+        candidates = UserSubscription.objects.filter(status="active", expiry_date__lte=now)
+        if subscription_ids is not None:
+            candidates = candidates.filter(id__in=subscription_ids)
+        if expired_after is not None:
+            candidates = candidates.filter(expiry_date__gt=expired_after)
+        claimed = list(
+            candidates
+            .select_for_update(skip_locked=True, of=("self",))
+            .select_related("plan")
+            .order_by("expiry_date", "id")[:batch_size]
+        )
+        if not claimed:
+            return {"claimed": 0, "renewed": 0, "expired": 0}
+
+        # One renewal per user per batch; any other expired row of the same
+        # user is left for the next batch.
+        renewable = {}
+        for subscription in claimed:
+            if subscription.auto_renewal and subscription.user_id not in renewable:
+                renewable[subscription.user_id] = subscription
+
+        locked_wallets = {
+            wallet.user_id: wallet
+            for wallet in Wallet.objects.select_for_update()
+            .filter(user_id__in=list(renewable)).order_by("id")
+        }
+
+        by_plan = {}
+        for user_id, subscription in renewable.items():
+            by_plan.setdefault(subscription.plan_id, []).append(subscription)
+
+        renewed_ids = set()
+        for plan_subscriptions in by_plan.values():
+            plan = plan_subscriptions[0].plan
+            debited = WalletService.bulk_debit_wallets(
+                locked_wallets,
+                {
+                    sub.user_id: (
+                        f"SUB_RENEW_{sub.id}_{int(sub.expiry_date.timestamp())}",
+                        {"subscription_id": sub.id, "plan_id": plan.id},
+                    )
+                    for sub in plan_subscriptions
+                },
+                amount=plan.price,
+                category="subscription",
+                description=f"Subscription renewal: {plan.name}",
+            ) if plan.price > 0 else {sub.user_id: None for sub in plan_subscriptions}
+
+            plan_renewed = [sub.id for sub in plan_subscriptions if sub.user_id in debited]
+            if not plan_renewed:
+                continue
+
+            UserSubscription.objects.filter(id__in=plan_renewed).update(
+                start_date=now,
+                expiry_date=now + timezone.timedelta(days=plan.duration_days),
+            )
+            renewed_ids.update(plan_renewed)
+
+            if plan.name.strip().lower() == "business member account":
+                TaskWalletService.bulk_credit_wallets(
+                    [sub.user_id for sub in plan_subscriptions if sub.id in renewed_ids],
+                    amount=Decimal("10000.00"),
+                    category="subscription_allocation",
+                    description=f"Monthly allocation from renewed plan {plan.name}",
+                    reference_prefix=f"SUB_ALLOC_{plan.id}_{int(now.timestamp())}",
                 )
 
+            logger.info(
+                f"[SUBSCRIPTION_RENEWAL] ✅ Renewed {len(plan_renewed)} subscriptions on {plan.name}"
+            )
+
+        deferred_ids = {
+            sub.id for sub in claimed
+            if sub.auto_renewal and renewable[sub.user_id].id != sub.id
+        }
+        expired_ids = [
+            sub.id for sub in claimed
+            if sub.id not in renewed_ids and sub.id not in deferred_ids
+        ]
+        if expired_ids:
+            UserSubscription.objects.filter(id__in=expired_ids).update(status="expired")
+            logger.info(
+                f"[SUBSCRIPTION_RENEWAL] Expired {len(expired_ids)} subscriptions (not renewed)"
+            )
+
+        # Bulk updates bypass the model signals, so drop cached lookups here
+        for user_id in {sub.user_id for sub in claimed}:
+            SubscriptionService.invalidate_active_subscription_cache(user_id)
+        if expired_ids:
+            expired_set = set(expired_ids)
+            expired_user_ids = {sub.user_id for sub in claimed if sub.id in expired_set}
+            transaction.on_commit(
+                lambda: ReferralCode.refresh_active_demo_referrals(referred_ids=expired_user_ids)
+            )
+
+        return {
+            "claimed": len(claimed) - len(deferred_ids),
+            "renewed": len(renewed_ids),
+            "expired": len(expired_ids),
+        }
+
     @staticmethod
     def get_user_active_subscription(user):
         """
@@ -220,6 +328,61 @@ class SubscriptionService:
                 status="active",
                 expiry_date__gt=timezone.now(),
             )
+            .select_related("plan")
             .order_by("-expiry_date")
             .first()
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def _active_subscription_cache_key(user_id):
+        return make_key("subscriptions", "active", user_id)
+
+    @staticmethod
+    def get_cached_active_subscription(user):
+        """
+        Cached variant of get_user_active_subscription for request-time checks
+        (middleware, context processor, decorators, template tags).
+
+        The result is memoized on the user object for the rest of the request
+        and cached across requests until the subscription expires or
+        ACTIVE_SUBSCRIPTION_CACHE_TTL elapses, whichever comes first.
+        UserSubscription saves/deletes invalidate it (see signals).
+        """
+        if user is None or not getattr(user, "is_authenticated", False):
+            return None
+
+        now = timezone.now()
+        memo = getattr(user, _REQUEST_MEMO_ATTR, _MISSING)
+        if memo is not _MISSING and (memo is None or memo.expiry_date > now):
+            return memo
+
+        def timeout(subscription):
+            # Never outlive the subscription itself
+            if subscription is None:
+                return ACTIVE_SUBSCRIPTION_CACHE_TTL
+            seconds_left = int((subscription.expiry_date - now).total_seconds())
+            return max(1, min(ACTIVE_SUBSCRIPTION_CACHE_TTL, seconds_left))
+
+        subscription = get_or_set(
+            SubscriptionService._active_subscription_cache_key(user.pk),
+            lambda: SubscriptionService.get_user_active_subscription(user),
+            timeout=timeout,
+            cache_none=True,
+        )
+        if subscription is not None and (subscription.status != "active" or subscription.expiry_date <= now):
+            subscription = SubscriptionService.get_user_active_subscription(user)
+
+        setattr(user, _REQUEST_MEMO_ATTR, subscription)
+        return subscription
+
+    @staticmethod
+    def invalidate_active_subscription_cache(user_or_id):
+        """Drop the cached active subscription for a user (and its request memo)."""
+        user_id = getattr(user_or_id, "pk", user_or_id)
+        invalidate_on_commit(SubscriptionService._active_subscription_cache_key(user_id))
+
+        if hasattr(user_or_id, "pk"):
+            try:
+                delattr(user_or_id, _REQUEST_MEMO_ATTR)
+            except AttributeError:
+                pass
\ No newline at end of file
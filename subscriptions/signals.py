@@ -1,7 +1,9 @@
 # subscriptions/signals.py
 import logging
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
 from django.dispatch import receiver
 
 from .models import UserSubscription
@@ -23,3 +25,32 @@ def subscription_activated(sender, instance, created, **kwargs):
         except Exception as e:
             # Never let signal exceptions break model save
             logger.error(f"Subscription activation signal failed: {e}")
+
+
+@receiver(post_save, sender=UserSubscription, dispatch_uid="subscription_cache_invalidate_on_save")
+@receiver(post_delete, sender=UserSubscription, dispatch_uid="subscription_cache_invalidate_on_delete")
+def invalidate_active_subscription_cache(sender, instance, **kwargs):
+    """Keep the cached active-subscription resolver in sync with the table."""
+    from .services import SubscriptionService
+
+    # Pass the loaded user too, so its request memo is dropped as well
+    user_field = sender._meta.get_field("user")
+    SubscriptionService.invalidate_active_subscription_cache(
+        instance.user if user_field.is_cached(instance) else instance.user_id
+    )
+
+
+@receiver(post_save, sender=UserSubscription, dispatch_uid="subscription_schedule_expiry")
+def schedule_expiry(sender, instance, **kwargs):
+    """
+    Subscriptions expiring inside the scheduling horizon get their expiry job
+    straight away; later ones are picked up by schedule_upcoming_expiries.
+    """
+    from .celery_tasks import EXPIRY_SCHEDULE_HORIZON, schedule_subscription_expiry
+
+    if instance.status != UserSubscription.STATUS_ACTIVE:
+        return
+    # Already expired rows are left to the renewal run / sweeper
+    time_left = instance.expiry_date - timezone.now()
+    if timezone.timedelta(0) < time_left <= EXPIRY_SCHEDULE_HORIZON:
+        transaction.on_commit(lambda: schedule_subscription_expiry(instance))
@@ -9,14 +9,14 @@ register = template.Library()
 def get_user_subscription(user):
     """Get user's active subscription"""
     if user.is_authenticated:
-        return SubscriptionService.get_user_active_subscription(user)
+        return SubscriptionService.get_cached_active_subscription(user)
     return None
 
 @register.simple_tag
 def user_has_subscription(user):
     """Check if user has active subscription"""
     if user.is_authenticated:
-        subscription = SubscriptionService.get_user_active_subscription(user)
+        subscription = SubscriptionService.get_cached_active_subscription(user)
         return subscription is not None
     return False
 
@@ -24,7 +24,7 @@ def user_has_subscription(user):
 def user_has_plan(user, plan_name):
     """Check if user has specific plan"""
     if user.is_authenticated:
-        subscription = SubscriptionService.get_user_active_subscription(user)
+        subscription = SubscriptionService.get_cached_active_subscription(user)
         return subscription and subscription.plan.name == plan_name
     return False
 
@@ -0,0 +1,122 @@
+# tests/test_celery_tasks.py
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from subscriptions.celery_tasks import (
+    EXPIRY_SCHEDULE_HORIZON,
+    EXPIRY_SWEEP_WATERMARK_KEY,
+    EXPIRY_SWEEP_WINDOW,
+    expire_subscription,
+    schedule_upcoming_expiries,
+    sweep_expired_subscriptions,
+)
+from subscriptions.models import UserSubscription
+from .test_base import BaseTestMixin
+
+
+class ExpireSubscriptionTaskTest(BaseTestMixin, TestCase):
+    """Test the per-subscription expiry job"""
+
+    def test_renews_at_deadline(self):
+        subscription = self.create_subscription(expiry_date=timezone.now() - timedelta(minutes=1))
+
+        result = expire_subscription(subscription.id)
+
+        self.assertEqual(result['renewed'], 1)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.status, 'active')
+        self.assertGreater(subscription.expiry_date, timezone.now())
+        self.wallet.refresh_from_db()
+        self.assertDecimalEqual(self.wallet.balance, Decimal('95.00'))
+
+    def test_noop_after_renewal(self):
+        """A second (or late) job for an already renewed subscription does nothing"""
+        subscription = self.create_subscription(expiry_date=timezone.now() - timedelta(minutes=1))
+        expire_subscription(subscription.id)
+
+        result = expire_subscription(subscription.id)
+
+        self.assertEqual(result['claimed'], 0)
+        self.wallet.refresh_from_db()
+        self.assertDecimalEqual(self.wallet.balance, Decimal('95.00'))
+
+    def test_expires_without_auto_renewal(self):
+        subscription = self.create_subscription(
+            expiry_date=timezone.now() - timedelta(minutes=1), auto_renewal=False
+        )
+
+        result = expire_subscription(subscription.id)
+
+        self.assertEqual(result['expired'], 1)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.status, 'expired')
+
+
+@patch('subscriptions.celery_tasks.expire_subscription.apply_async')
+class ScheduleExpiryTest(BaseTestMixin, TestCase):
+    """Test expiry jobs are enqueued only inside the scheduling horizon"""
+
+    def test_schedule_upcoming_expiries_horizon(self, mock_apply):
+        now = timezone.now()
+        soon = self.create_subscription(expiry_date=now + EXPIRY_SCHEDULE_HORIZON / 2)
+        self.create_subscription(user=self.user2, expiry_date=now + EXPIRY_SCHEDULE_HORIZON * 2)
+        self.create_subscription(user=self.admin_user, expiry_date=now - timedelta(minutes=1))
+
+        self.assertEqual(schedule_upcoming_expiries(), 1)
+        mock_apply.assert_called_once_with(args=[soon.id], eta=soon.expiry_date)
+
+    def test_signal_schedules_subscription_inside_horizon(self, mock_apply):
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription = self.create_subscription(expiry_date=timezone.now() + EXPIRY_SCHEDULE_HORIZON / 2)
+
+        mock_apply.assert_called_once_with(args=[subscription.id], eta=subscription.expiry_date)
+
+    def test_signal_leaves_later_and_inactive_subscriptions(self, mock_apply):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_subscription()
+            self.create_subscription(
+                user=self.user2,
+                expiry_date=timezone.now() + EXPIRY_SCHEDULE_HORIZON / 2,
+                status=UserSubscription.STATUS_CANCELLED,
+            )
+
+        mock_apply.assert_not_called()
+
+
+class SweepExpiredSubscriptionsTest(BaseTestMixin, TestCase):
+    """Test the sweeper covers everything since its last run"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_sweeps_recent_window_without_watermark(self):
+        now = timezone.now()
+        recent = self.create_subscription(expiry_date=now - EXPIRY_SWEEP_WINDOW / 2, auto_renewal=False)
+        old = self.create_subscription(
+            user=self.user2, expiry_date=now - EXPIRY_SWEEP_WINDOW * 2, auto_renewal=False
+        )
+
+        totals = sweep_expired_subscriptions()
+
+        self.assertEqual(totals['expired'], 1)
+        recent.refresh_from_db()
+        old.refresh_from_db()
+        self.assertEqual(recent.status, 'expired')
+        self.assertEqual(old.status, 'active')
+
+    def test_watermark_covers_long_outage(self):
+        now = timezone.now()
+        cache.set(EXPIRY_SWEEP_WATERMARK_KEY, now - EXPIRY_SWEEP_WINDOW * 3, None)
+        missed = self.create_subscription(expiry_date=now - EXPIRY_SWEEP_WINDOW * 2, auto_renewal=False)
+
+        sweep_expired_subscriptions()
+
+        missed.refresh_from_db()
+        self.assertEqual(missed.status, 'expired')
+        self.assertGreaterEqual(cache.get(EXPIRY_SWEEP_WATERMARK_KEY), now)
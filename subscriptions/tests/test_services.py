@@ -33,6 +33,20 @@ class SubscriptionServiceTest(BaseTransactionTestCase, BaseTestMixin):
         self.assertEqual(subscription.plan, self.basic_plan)
         self.assertEqual(subscription.status, 'active')
 
+    def test_subscribe_user_debits_through_ledger(self):
+        """Subscription payments append a wallet ledger entry"""
+        from wallets.models import WalletLedgerEntry
+
+        result = SubscriptionService.subscribe_user(self.user, self.basic_plan.id)
+
+        self.assertTrue(result['success'])
+        self.wallet.refresh_from_db()
+        entry = WalletLedgerEntry.objects.get(wallet=self.wallet, category='subscription')
+        self.assertEqual(entry.entry_type, 'debit')
+        self.assertDecimalEqual(entry.amount, self.basic_plan.price)
+        self.assertEqual(entry.sequence, self.wallet.ledger_sequence)
+        self.assertDecimalEqual(entry.balance_after, self.wallet.balance)
+
     def test_subscribe_user_plan_not_found(self):
         """Test subscription with non-existent plan"""
         result = SubscriptionService.subscribe_user(self.user, 99999)
@@ -150,6 +164,29 @@ class SubscriptionServiceTest(BaseTransactionTestCase, BaseTestMixin):
         
         self.assertIsNone(active_sub)
 
+    def test_get_cached_active_subscription_memoizes_per_request(self):
+        """Test the cached resolver hits the database once per user object"""
+        subscription = self.create_subscription()
+
+        with self.assertNumQueries(1):
+            first = SubscriptionService.get_cached_active_subscription(self.user)
+            second = SubscriptionService.get_cached_active_subscription(self.user)
+            plan_name = second.plan.name
+
+        self.assertEqual(first, subscription)
+        self.assertEqual(plan_name, self.basic_plan.name)
+
+    def test_get_cached_active_subscription_invalidated_on_save(self):
+        """Test saving a subscription drops the cross-request cache"""
+        subscription = self.create_subscription()
+        self.assertEqual(SubscriptionService.get_cached_active_subscription(self.user), subscription)
+
+        subscription.status = 'cancelled'
+        subscription.save()
+
+        fresh_user = type(self.user).objects.get(pk=self.user.pk)
+        self.assertIsNone(SubscriptionService.get_cached_active_subscription(fresh_user))
+
     def test_check_and_renew_subscriptions_success(self):
         """Test successful subscription renewal"""
         # Create expired subscription with auto-renewal
@@ -224,10 +261,10 @@ class SubscriptionServiceTest(BaseTransactionTestCase, BaseTestMixin):
         subscription.refresh_from_db()
         self.assertEqual(subscription.status, 'expired')
 
-    @patch('tasks.services.TaskWalletService.credit_wallet')
+    @patch('tasks.services.TaskWalletService.bulk_credit_wallets')
     def test_check_and_renew_business_plan_allocates_funds(self, mock_credit):
         """Test business plan renewal allocates task wallet funds"""
-        mock_credit.return_value = MagicMock()
+        mock_credit.return_value = []
         
         # Create expired business plan subscription
         past_date = timezone.now() - timedelta(hours=1)
@@ -239,13 +276,25 @@ class SubscriptionServiceTest(BaseTransactionTestCase, BaseTestMixin):
         
         SubscriptionService.check_and_renew_subscriptions()
         
-        # Check task wallet credit was called
-        mock_credit.assert_called_once_with(
-            user=self.user,
-            amount=Decimal("10.00"),
-            category="subscription_allocation",
-            description=f"Monthly allocation from subscription plan {self.business_plan.name}"
-        )
+        # Check task wallet credit was called once for the batch
+        mock_credit.assert_called_once()
+        self.assertEqual(mock_credit.call_args.args[0], [self.user.id])
+        self.assertEqual(mock_credit.call_args.kwargs['amount'], Decimal("10000.00"))
+        self.assertEqual(mock_credit.call_args.kwargs['category'], "subscription_allocation")
+
+    def test_renew_expired_batch_does_not_charge_twice(self):
+        """Test re-running the renewal engine never charges a renewed subscription again"""
+        past_date = timezone.now() - timedelta(hours=1)
+        subscription = self.create_subscription(expiry_date=past_date, auto_renewal=True)
+        initial_balance = self.wallet.balance
+
+        first = SubscriptionService.renew_expired_batch()
+        second = SubscriptionService.renew_expired_batch()
+
+        self.assertEqual(first['renewed'], 1)
+        self.assertEqual(second['claimed'], 0)
+        self.wallet.refresh_from_db()
+        self.assertDecimalEqual(self.wallet.balance, initial_balance - subscription.plan.price)
 
     def test_check_and_renew_subscriptions_multiple_users(self):
         """Test renewal process handles multiple users"""
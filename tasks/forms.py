@@ -136,6 +136,23 @@ class TaskFilterForm(forms.Form):
         })
     )
 
+    def clean_search(self):
+        return (self.cleaned_data.get("search") or "").strip()[:200]
+
+    def filter_queryset(self, tasks):
+        """Apply the submitted filters; searches are ranked full-text matches."""
+        if not self.is_valid():
+            return tasks
+        if self.cleaned_data.get("min_payout"):
+            tasks = tasks.filter(payout_per_slot__gte=self.cleaned_data["min_payout"])
+        if self.cleaned_data.get("max_payout"):
+            tasks = tasks.filter(payout_per_slot__lte=self.cleaned_data["max_payout"])
+        if self.cleaned_data.get("category"):
+            tasks = tasks.filter(category=self.cleaned_data["category"])
+        if self.cleaned_data.get("search"):
+            tasks = tasks.search(self.cleaned_data["search"])
+        return tasks
+
 class DisputeForm(forms.ModelForm):
     class Meta:
         model = Dispute
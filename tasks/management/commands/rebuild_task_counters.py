@@ -0,0 +1,69 @@
+# tasks/management/commands/rebuild_task_counters.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized pending/approved/rejected submission counters on Task'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show which tasks drifted without making changes',
+        )
+        parser.add_argument(
+            '--task',
+            type=int,
+            help='Only rebuild this task id',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of tasks updated per bulk_update',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING('DRY RUN MODE - No changes will be made')
+            )
+
+        tasks = Task.objects.annotate(
+            actual_pending=Count('submissions', filter=Q(submissions__status='pending')),
+            actual_approved=Count('submissions', filter=Q(submissions__status='approved')),
+            actual_rejected=Count('submissions', filter=Q(submissions__status='rejected')),
+        ).only('id', 'pending_count', 'approved_count', 'rejected_count').order_by('id')
+        if options['task']:
+            tasks = tasks.filter(pk=options['task'])
+
+        drifted = []
+        for task in tasks.iterator(chunk_size=options['batch_size']):
+            actual = (task.actual_pending, task.actual_approved, task.actual_rejected)
+            stored = (task.pending_count, task.approved_count, task.rejected_count)
+            if actual == stored:
+                continue
+
+            self.stdout.write(
+                f'Task {task.id}: pending {stored[0]}->{actual[0]}, '
+                f'approved {stored[1]}->{actual[1]}, rejected {stored[2]}->{actual[2]}'
+            )
+            task.pending_count, task.approved_count, task.rejected_count = actual
+            drifted.append(task)
+
+        if not dry_run and drifted:
+            with transaction.atomic():
+                Task.objects.bulk_update(
+                    drifted,
+                    ['pending_count', 'approved_count', 'rejected_count'],
+                    batch_size=options['batch_size'],
+                )
+
+        verb = 'would be rebuilt' if dry_run else 'rebuilt'
+        self.stdout.write(self.style.SUCCESS(f'{len(drifted)} task counters {verb}'))
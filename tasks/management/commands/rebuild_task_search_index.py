@@ -0,0 +1,38 @@
+# tasks/management/commands/rebuild_task_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tasks.models import Task, TaskSearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents for tasks (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of tasks fetched per round trip',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(
+                self.style.WARNING('Search documents are only maintained on PostgreSQL - nothing to do')
+            )
+            return
+
+        pruned, _ = TaskSearchDocument.objects.exclude(
+            task_id__in=Task.objects.values('id')
+        ).delete()
+
+        rebuilt = 0
+        tasks = Task.objects.select_related('category').order_by('id')
+        for task in tasks.iterator(chunk_size=options['batch_size']):
+            task.refresh_search_document()
+            rebuilt += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {rebuilt} search documents, pruned {pruned} orphans')
+        )
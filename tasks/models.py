@@ -1,5 +1,9 @@
 # tasks/models.py
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
+from django.db import connections, models
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Greatest
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.utils import timezone
@@ -7,6 +11,35 @@ from decimal import Decimal
 import uuid
 from chat.models import ChatRoom
 
+TASK_SEARCH_CONFIG = getattr(settings, "TASK_SEARCH_CONFIG", "english")
+
+
+class TaskQuerySet(models.QuerySet):
+    def search(self, term):
+        """
+        Ranked full-text search over title, category and description.
+
+        Uses the GIN-indexed TaskSearchDocument on PostgreSQL and falls back to
+        icontains on other backends (SQLite in tests). Results carry a
+        `search_rank` annotation and are ordered by it.
+        """
+        term = (term or "").strip()
+        if not term:
+            return self
+
+        if connections[self.db].vendor == "postgresql":
+            query = SearchQuery(term, search_type="websearch", config=TASK_SEARCH_CONFIG)
+            return (
+                self.filter(search_document__document=query)
+                .annotate(search_rank=SearchRank(F("search_document__document"), query))
+                .order_by("-search_rank", "-created_at")
+            )
+
+        return self.filter(
+            Q(title__icontains=term) | Q(description__icontains=term) | Q(category__name__icontains=term)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
 class Task(models.Model):
     TASK_STATUS_CHOICES = [
         ('active', 'Active'),
@@ -51,6 +84,11 @@ class Task(models.Model):
     proof_instructions = models.TextField()
     status = models.CharField(max_length=20, choices=TASK_STATUS_CHOICES, default='active')
 
+    # ✅ Denormalized submission counters, maintained by record_submission_transition
+    pending_count = models.PositiveIntegerField(default=0)
+    approved_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+
     # ✅ New fields for media
     sample_image = models.ImageField(
         upload_to="task_samples/images/",
@@ -72,10 +110,16 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
+    SEARCH_FIELDS = {'title', 'description', 'category', 'category_id'}
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', 'deadline']),
+            # ✅ Keyset pagination for the task feed
+            models.Index(fields=['status', '-created_at', '-id'], name='task_feed_keyset_idx'),
         ]
 
     def save(self, *args, **kwargs):
@@ -89,6 +133,22 @@ class Task(models.Model):
                     self.remaining_slots = self.total_slots
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.SEARCH_FIELDS.intersection(update_fields):
+            self.refresh_search_document()
+
+    def refresh_search_document(self):
+        """Rebuild this task's weighted search vector (PostgreSQL only)."""
+        if connections[self._state.db or 'default'].vendor != 'postgresql':
+            return
+        category = self.category.name if self.category_id else ''
+        document = (
+            SearchVector(Value(self.title), weight='A', config=TASK_SEARCH_CONFIG)
+            + SearchVector(Value(category), weight='B', config=TASK_SEARCH_CONFIG)
+            + SearchVector(Value(self.description), weight='C', config=TASK_SEARCH_CONFIG)
+        )
+        TaskSearchDocument.objects.update_or_create(task=self, defaults={'document': document})
+
     def __str__(self):
         return f"Task #{self.pk}: {self.title}"
 
@@ -108,6 +168,57 @@ class Task(models.Model):
     def filled_slots(self):
         return self.total_slots - self.remaining_slots
 
+    SUBMISSION_COUNTER_FIELDS = {
+        'pending': 'pending_count',
+        'approved': 'approved_count',
+        'rejected': 'rejected_count',
+    }
+
+    @classmethod
+    def record_submission_transition(cls, task_id, from_status=None, to_status=None, count=1):
+        """
+        Move `count` submissions between the denormalized status counters with a
+        single atomic UPDATE. Pass from_status=None for new submissions.
+        """
+        from_field = cls.SUBMISSION_COUNTER_FIELDS.get(from_status)
+        to_field = cls.SUBMISSION_COUNTER_FIELDS.get(to_status)
+        if from_field == to_field or not count:
+            return
+
+        updates = {}
+        if from_field:
+            updates[from_field] = Greatest(F(from_field) - count, 0)
+        if to_field:
+            updates[to_field] = F(to_field) + count
+        cls.objects.filter(pk=task_id).update(**updates)
+
+
+class TaskSearchDocument(models.Model):
+    """
+    Weighted full-text search vector for a Task, kept up to date by Task.save().
+    Only exists on PostgreSQL; other backends fall back to icontains.
+    """
+    # No FK constraint / cascade: the table only exists on PostgreSQL, so the
+    # deletion collector must not query it. Orphans are never matched by
+    # Task.objects.search() and are pruned by rebuild_task_search_index.
+    task = models.OneToOneField(
+        Task,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        primary_key=True,
+        related_name='search_document'
+    )
+    document = SearchVectorField()
+
+    class Meta:
+        required_db_vendor = 'postgresql'
+        indexes = [
+            GinIndex(fields=['document'], name='task_search_document_gin'),
+        ]
+
+    def __str__(self):
+        return f"Search document for task #{self.task_id}"
+
 
 class Submission(models.Model):
     SUBMISSION_STATUS_CHOICES = [
@@ -159,15 +270,19 @@ class Submission(models.Model):
         self.reviewed_at = timezone.now()
 
     def approve(self, reviewer):
+        previous_status = self.status
         self.mark_reviewed(reviewer)
         self.status = 'approved'
         self.save()
+        Task.record_submission_transition(self.task_id, previous_status, 'approved')
 
     def reject(self, reviewer, reason):
+        previous_status = self.status
         self.mark_reviewed(reviewer)
         self.status = 'rejected'
         self.rejection_reason = reason
         self.save()
+        Task.record_submission_transition(self.task_id, previous_status, 'rejected')
 
 
 class Dispute(models.Model):
@@ -7,9 +7,9 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from wallets.models import EscrowTransaction
-from .models import Submission, TaskWallet, TaskWalletTransaction
+from .models import Submission, Task, TaskWallet, TaskWalletTransaction
 from django.db.models import F
-from wallets.services import WalletService  # main wallet service
+from wallets.services import WalletService, PlatformFeeService  # main wallet service
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
@@ -86,6 +86,43 @@ class TaskWalletService:
         )
         return wallet
 
+    @staticmethod
+    @transaction.atomic
+    def bulk_credit_wallets(user_ids, amount, category="admin_adjustment", description="", reference_prefix=None):
+        """
+        Credit the same amount to many TaskWallets with one UPDATE and one
+        transaction bulk insert. Each user must appear at most once.
+        """
+        amount = Decimal(amount)
+        user_ids = list(user_ids)
+        if not user_ids:
+            return []
+
+        TaskWallet.objects.bulk_create(
+            [TaskWallet(user_id=user_id) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        TaskWallet.objects.filter(user_id__in=user_ids).update(
+            balance=F("balance") + amount,
+            updated_at=timezone.now(),
+        )
+
+        wallets = list(TaskWallet.objects.filter(user_id__in=user_ids))
+        TaskWalletTransaction.objects.bulk_create([
+            TaskWalletTransaction(
+                user_id=wallet.user_id,
+                transaction_type="credit",
+                category=category,
+                amount=amount,
+                balance_before=wallet.balance - amount,
+                balance_after=wallet.balance,
+                description=description,
+                reference=f"{reference_prefix}_{wallet.user_id}" if reference_prefix else None,
+            )
+            for wallet in wallets
+        ])
+        return wallets
+
     @staticmethod
     @transaction.atomic
     def debit_wallet(user, amount, category="task_posting", description="", reference=None):
@@ -359,7 +396,8 @@ class TaskWalletService:
         try:
             escrow = (
                 EscrowTransaction.objects
-                .select_for_update(nowait=False)  # Wait for lock
+                .select_for_update(nowait=False, of=("self",))  # Wait for lock
+                .select_related("task")
                 .get(id=escrow_id)
             )
             logger.info(
@@ -372,7 +410,7 @@ class TaskWalletService:
 
         # ✅ INFO-ONLY CHECK: Log slot status but don't block release
         task = escrow.task
-        filled_slots = Submission.objects.filter(task=task, status="approved").count()
+        filled_slots = task.approved_count
         total_slots = getattr(task, "slots", None) or getattr(task, "total_slots", None)
 
         if total_slots is None:
@@ -467,35 +505,36 @@ class TaskWalletService:
             )
             raise ValueError(f"Failed to credit member wallet: {str(e)}")
         
-        # ✅ Credit company cut
+        # ✅ Record company cut in the platform fee ledger (folded into the company wallet in batches)
         try:
             company_ref = f"COMPANY_CUT_{escrow_id}_{submission_id or 'MANUAL'}_{timezone.now().timestamp()}"
             
             logger.info(
-                f"[ESCROW_RELEASE] Crediting company wallet - Amount: {company_cut}"
+                f"[ESCROW_RELEASE] Recording platform fee - Amount: {company_cut}"
             )
             
-            WalletService.credit_wallet(
-                user=get_company_user(),
-                amount=company_cut,
-                category="company_cut",
-                description=f"Platform fee: {escrow.task.title}",
-                reference=company_ref,
-                extra_data={
-                    "task_id": escrow.task.id,
-                    "escrow_id": escrow_id,
-                    "submission_id": submission_id,
-                    "member_payment": str(member_amount),
-                }
-            )
+            with transaction.atomic():  # savepoint so a failed insert can't poison the release
+                PlatformFeeService.record_fee(
+                    amount=company_cut,
+                    reference=company_ref,
+                    description=f"Platform fee: {escrow.task.title}",
+                    task=escrow.task,
+                    escrow=escrow,
+                    extra_data={
+                        "task_id": escrow.task.id,
+                        "escrow_id": escrow_id,
+                        "submission_id": submission_id,
+                        "member_payment": str(member_amount),
+                    }
+                )
             
             logger.info(
-                f"[ESCROW_RELEASE] Company credited successfully - Amount: {company_cut}"
+                f"[ESCROW_RELEASE] Platform fee recorded - Amount: {company_cut}"
             )
             
         except Exception as e:
             logger.error(
-                f"[ESCROW_RELEASE] WARNING - Failed to credit company wallet - "
+                f"[ESCROW_RELEASE] WARNING - Failed to record platform fee - "
                 f"Error: {str(e)}, Escrow: {escrow_id}"
             )
             logger.critical(
@@ -507,7 +546,7 @@ class TaskWalletService:
         # ✅ Update escrow status conditionally (only mark as released when all slots are filled)
         try:
             task = escrow.task
-            filled_slots = Submission.objects.filter(task=task, status="approved").count()
+            filled_slots = task.approved_count
             total_slots = getattr(task, "slots", None) or getattr(task, "total_slots", None)
 
             if total_slots and filled_slots >= total_slots:
@@ -562,6 +601,156 @@ class TaskWalletService:
 
 
 
+    @staticmethod
+    @transaction.atomic
+    def release_task_escrow_bulk(task, reviewer, submission_ids=None):
+        """
+        Approve many submissions of one task and release their escrow payouts
+        in a constant number of queries.
+
+        The escrow row is locked once, the member credits and platform fees are
+        bulk-inserted and the submissions are flipped to approved in one UPDATE.
+        Safe to retry: submissions that are already approved are reported as
+        such and never paid twice.
+
+        Args:
+            task: Task whose locked escrow pays out
+            reviewer: User approving the submissions
+            submission_ids: Submission ids to approve, or None for all pending
+
+        Returns:
+            dict with the escrow, per-submission `results` and `approved` count
+        """
+        from wallets.models import PlatformFeeEntry
+
+        logger.info(
+            f"[ESCROW_BULK_RELEASE] Starting bulk release - "
+            f"Task: {task.id}, Requested: {'ALL_PENDING' if submission_ids is None else len(submission_ids)}"
+        )
+
+        # ✅ Lock the escrow once for the whole batch
+        try:
+            escrow = (
+                EscrowTransaction.objects
+                .select_for_update(of=("self",))
+                .select_related("task", "taskwallet_transaction")
+                .get(task_id=task.id, status="locked")
+            )
+        except EscrowTransaction.DoesNotExist:
+            logger.error(f"[ESCROW_BULK_RELEASE] FAILED - No locked escrow found for task {task.id}")
+            raise ValueError(
+                f"No locked escrow found for task {task.id}. "
+                f"Either escrow doesn't exist or already released."
+            )
+        task = escrow.task
+
+        # ✅ Lock the candidate submissions
+        submissions = Submission.objects.select_for_update().filter(task=task)
+        if submission_ids is None:
+            submissions = submissions.filter(status="pending")
+        else:
+            submission_ids = {int(sid) for sid in submission_ids}
+            submissions = submissions.filter(id__in=submission_ids)
+        locked = list(submissions.order_by("id").values("id", "member_id", "status"))
+
+        results = []
+        to_approve = []
+        for row in locked:
+            if row["status"] == "pending":
+                to_approve.append(row)
+            elif row["status"] == "approved":
+                results.append({"submission_id": row["id"], "status": "already_approved"})
+            else:
+                results.append({
+                    "submission_id": row["id"],
+                    "status": "skipped",
+                    "detail": f"Submission is {row['status']}",
+                })
+        if submission_ids is not None:
+            for missing in sorted(submission_ids - {row["id"] for row in locked}):
+                results.append({
+                    "submission_id": missing,
+                    "status": "not_found",
+                    "detail": "Submission does not belong to this task",
+                })
+
+        if not to_approve:
+            logger.info(f"[ESCROW_BULK_RELEASE] Nothing to approve - Task: {task.id}")
+            return {"escrow": escrow, "results": results, "approved": 0}
+
+        approve_ids = [row["id"] for row in to_approve]
+        member_amount, company_cut = TaskWalletService.split_payment(task.payout_per_slot)
+
+        # ✅ Flip submissions in one UPDATE (status guard keeps retries idempotent)
+        approved = Submission.objects.filter(id__in=approve_ids, status="pending").update(
+            status="approved",
+            reviewed_at=timezone.now(),
+            reviewed_by=reviewer,
+        )
+        Task.record_submission_transition(task.id, "pending", "approved", count=approved)
+
+        # ✅ Credit every member's MAIN WALLET in one pass
+        WalletService.bulk_credit_wallets(
+            {
+                row["member_id"]: (
+                    f"ESCROW_RELEASE_{escrow.id}_{row['id']}",
+                    {"task_id": task.id, "escrow_id": escrow.id, "submission_id": row["id"]},
+                )
+                for row in to_approve
+            },
+            amount=member_amount,
+            category="task_payment",
+            description=f"Task: {task.title}",
+        )
+
+        # ✅ Platform fees go to the fee ledger in one insert
+        PlatformFeeService.record_fees([
+            PlatformFeeEntry(
+                amount=company_cut,
+                reference=f"COMPANY_CUT_{escrow.id}_{row['id']}",
+                description=f"Platform fee: {task.title}",
+                task=task,
+                escrow=escrow,
+                metadata={
+                    "task_id": task.id,
+                    "escrow_id": escrow.id,
+                    "submission_id": row["id"],
+                    "member_payment": str(member_amount),
+                },
+            )
+            for row in to_approve
+        ])
+
+        # ✅ Release the escrow once every slot is approved
+        filled_slots = Task.objects.values_list("approved_count", flat=True).get(pk=task.id)
+        if task.total_slots and filled_slots >= task.total_slots:
+            escrow.status = "released"
+            escrow.released_at = timezone.now()
+            escrow.save(update_fields=["status", "released_at"])
+            logger.info(
+                f"[ESCROW_BULK_RELEASE] All slots filled - Escrow released. "
+                f"Approved: {filled_slots}/{task.total_slots}, Task: {task.id}"
+            )
+
+        if escrow.taskwallet_transaction and escrow.taskwallet_transaction.status != "released":
+            escrow.taskwallet_transaction.status = "released"
+            escrow.taskwallet_transaction.save(update_fields=["status"])
+
+        results.extend(
+            {"submission_id": row["id"], "status": "approved", "member_amount": member_amount}
+            for row in to_approve
+        )
+        results.sort(key=lambda result: result["submission_id"])
+
+        logger.info(
+            f"[ESCROW_BULK_RELEASE] SUCCESS - "
+            f"Escrow: {escrow.id}, Approved: {len(approve_ids)}, "
+            f"Member: ₦{member_amount} each, Company: ₦{company_cut} each"
+        )
+
+        return {"escrow": escrow, "results": results, "approved": len(approve_ids)}
+
+
     @staticmethod
     def get_task_escrow(task):
         """
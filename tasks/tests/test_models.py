@@ -10,7 +10,7 @@ from django.utils import timezone
 from datetime import timedelta
 import uuid
 
-from tasks.models import Task, Submission, Dispute, TaskWallet, TaskWalletTransaction
+from tasks.models import Task, Submission, Dispute, TaskCategory, TaskWallet, TaskWalletTransaction
 from .test_base import ComprehensiveTaskTestCase
 
 
@@ -141,6 +141,28 @@ class TaskModelTest(ComprehensiveTaskTestCase):
         self.assertEqual(tasks[1], task1)
 
 
+class TaskSearchTest(ComprehensiveTaskTestCase):
+    """Test cases for Task.objects.search()."""
+
+    def test_search_matches_title_description_and_category(self):
+        """Test search covers title, description and category name."""
+        category = TaskCategory.objects.create(name='Social Media')
+        by_title = self.create_task(title='Follow our Instagram page')
+        by_description = self.create_task(description='Leave a review on the instagram app')
+        by_category = self.create_task(title='Like a post', category=category)
+        unrelated = self.create_task(title='Download the app')
+
+        self.assertCountEqual(
+            Task.objects.search('instagram'), [by_title, by_description]
+        )
+        self.assertIn(by_category, Task.objects.search('social'))
+        self.assertNotIn(unrelated, Task.objects.search('instagram'))
+
+    def test_blank_search_returns_everything(self):
+        """Test an empty term leaves the queryset untouched."""
+        self.assertEqual(Task.objects.search('  ').count(), Task.objects.count())
+
+
 class SubmissionModelTest(ComprehensiveTaskTestCase):
     """Test cases for Submission model."""
     
@@ -194,6 +216,26 @@ class SubmissionModelTest(ComprehensiveTaskTestCase):
         self.assertEqual(submission.rejection_reason, reason)
         self.assertIsNotNone(submission.reviewed_at)
 
+    def test_submission_transitions_update_task_counters(self):
+        """Test that approve/reject keep the denormalized task counters in sync."""
+        submission = self.create_submission()
+        Task.record_submission_transition(self.task.id, None, 'pending')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.pending_count, 1)
+
+        submission.reject(self.admin, 'Blurry screenshot')
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.pending_count, self.task.rejected_count), (0, 1))
+
+        Task.record_submission_transition(self.task.id, 'rejected', 'pending')
+        submission.status = 'pending'
+        submission.approve(self.admin)
+        self.task.refresh_from_db()
+        self.assertEqual(
+            (self.task.pending_count, self.task.approved_count, self.task.rejected_count),
+            (0, 1, 0)
+        )
+
     def test_submission_ordering(self):
         """Test that submissions are ordered by submission date (newest first)."""
         # Create submissions with slight time difference
@@ -148,6 +148,88 @@ class TaskListViewTest(ComprehensiveTaskTestCase):
         self.assertGreaterEqual(len(tasks), 5)  # Should have remaining tasks
 
 
+class TaskFeedApiTest(ComprehensiveTaskTestCase):
+    """Test cases for the keyset-paginated task_feed_api view."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('tasks:task_feed_api')
+        for i in range(5):
+            self.create_task(title=f'Feed Task {i}')
+
+    def test_requires_login(self):
+        """Test that the feed requires login."""
+        self.assert_requires_login(self.url)
+
+    def test_cursor_walks_every_task_once(self):
+        """Test that following next_cursor returns each task exactly once."""
+        self.login_user(self.member)
+
+        seen = []
+        params = {'limit': 2}
+        while True:
+            data = self.client.get(self.url, params).json()
+            seen.extend(item['id'] for item in data['results'])
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+
+        expected = list(
+            Task.objects.filter(status='active', remaining_slots__gt=0)
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_already_submitted_and_progress(self):
+        """Test per-user submission state and progress are annotated."""
+        self.create_submission(task=self.task, member=self.member)
+        self.task.remaining_slots = 4
+        self.task.save(update_fields=['remaining_slots'])
+
+        self.login_user(self.member)
+        data = self.client.get(self.url, {'limit': 50}).json()
+
+        item = next(i for i in data['results'] if i['id'] == self.task.id)
+        self.assertTrue(item['already_submitted'])
+        self.assertEqual(item['progress'], 20.0)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        self.login_user(self.member)
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_pages_follow_rank(self):
+        """Test that search results page by (rank, created_at, id), each once."""
+        self.create_task(title='Unrelated')
+        self.login_user(self.member)
+
+        seen = []
+        params = {'limit': 2, 'search': 'Feed'}
+        while True:
+            data = self.client.get(self.url, params).json()
+            seen.extend(item['id'] for item in data['results'])
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+
+        expected = list(
+            Task.objects.filter(status='active', remaining_slots__gt=0).search('Feed')
+            .order_by('-search_rank', '-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, expected)
+
+    def test_search_rejects_unranked_cursor(self):
+        """Test that a recency cursor can't be replayed against a search."""
+        self.login_user(self.member)
+        cursor = self.client.get(self.url, {'limit': 2}).json()['next_cursor']
+
+        response = self.client.get(self.url, {'limit': 2, 'search': 'Feed', 'cursor': cursor})
+
+        self.assertEqual(response.status_code, 400)
+
+
 class TaskDetailViewTest(ComprehensiveTaskTestCase):
     """Test cases for task_detail view."""
     
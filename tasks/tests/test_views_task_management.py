@@ -6,8 +6,10 @@ from decimal import Decimal
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+from unittest.mock import patch
 
-from tasks.models import Task
+from tasks.forms import SubmissionForm
+from tasks.models import Submission, Task
 from wallets.models import EscrowTransaction
 from .test_base import ComprehensiveTaskTestCase
 
@@ -499,4 +501,110 @@ class ReviewSubmissionViewTest(ComprehensiveTaskTestCase):
         self.login_user(self.advertiser)
         
         response = self.client.get(url)
-        self.assertEqual(response.status_code, 404)
\ No newline at end of file
+        self.assertEqual(response.status_code, 404)
+
+class BulkReviewSubmissionsViewTest(ComprehensiveTaskTestCase):
+    """Test cases for bulk_review_submissions view."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_member = self.create_user('member2', 'member2@test.com', is_subscribed=True)
+        self.submission = self.create_submission(task=self.task, member=self.member)
+        self.other_submission = self.create_submission(task=self.task, member=self.other_member)
+        self.url = reverse('tasks:bulk_review_submissions', kwargs={'task_id': self.task.id})
+
+    def test_only_owner_or_staff_can_bulk_approve(self):
+        another_user = self.create_user('another', 'another@test.com', is_subscribed=True)
+        self.login_user(another_user)
+
+        response = self.client.post(self.url, {'approve_all': '1'})
+
+        self.assertRedirects(response, reverse('tasks:task_list'))
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'pending')
+
+    def test_approve_selected(self):
+        initial_member_balance = self.member_wallet.balance
+        self.login_user(self.advertiser)
+
+        response = self.client.post(self.url, {'submission_ids': [self.submission.id]})
+
+        self.assertRedirects(response, reverse('tasks:review_submissions', kwargs={'task_id': self.task.id}))
+        self.refresh_from_db(self.submission, self.other_submission, self.member_wallet)
+        self.assertEqual(self.submission.status, 'approved')
+        self.assertEqual(self.other_submission.status, 'pending')
+        self.assertEqual(self.member_wallet.balance, initial_member_balance + Decimal('8.00'))
+
+    def test_approve_all_is_idempotent(self):
+        self.login_user(self.advertiser)
+
+        first = self.client.post(self.url, {'approve_all': '1'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(first.json()['approved'], 2)
+
+        ids = [self.submission.id, self.other_submission.id]
+        retry = self.client.post(self.url, {'submission_ids': ids}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+        self.assertEqual(retry.json()['approved'], 0)
+        self.assertEqual(
+            [r['status'] for r in retry.json()['results']],
+            ['already_approved', 'already_approved']
+        )
+        self.member_wallet.refresh_from_db()
+        self.assertEqual(self.member_wallet.balance, Decimal('108.00'))
+
+    def test_requires_selection(self):
+        self.login_user(self.advertiser)
+
+        response = self.client.post(self.url, {}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ResubmitSubmissionViewTest(ComprehensiveTaskTestCase):
+    """Test cases for resubmit_submission view."""
+
+    def setUp(self):
+        super().setUp()
+        self.submission = self.create_submission(status='rejected', rejection_reason='Blurry screenshot')
+        Task.objects.filter(pk=self.task.pk).update(rejected_count=1)
+        self.url = reverse('tasks:resubmit_submission', args=[self.submission.id])
+
+    def _counters(self):
+        self.task.refresh_from_db()
+        return self.task.pending_count, self.task.rejected_count
+
+    def test_resubmit_moves_submission_back_to_pending(self):
+        self.login_user(self.member)
+
+        response = self.client.post(self.url, {'proof_text': 'Clearer proof'})
+
+        self.assertRedirects(response, reverse('tasks:task_detail', args=[self.task.id]), fetch_redirect_response=False)
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'pending')
+        self.assertEqual(self.submission.rejection_reason, '')
+        self.assertEqual(self._counters(), (1, 0))
+
+    def test_double_post_moves_counters_once(self):
+        self.login_user(self.member)
+
+        self.client.post(self.url, {'proof_text': 'Clearer proof'})
+        retry = self.client.post(self.url, {'proof_text': 'Clearer proof'})
+
+        self.assertEqual(retry.status_code, 404)
+        self.assertEqual(self._counters(), (1, 0))
+
+    def test_review_landing_mid_request_is_not_overwritten(self):
+        """Status is re-checked under the row lock, after the form is validated"""
+        self.login_user(self.member)
+        original_is_valid = SubmissionForm.is_valid
+
+        def approve_then_validate(form):
+            Submission.objects.filter(pk=self.submission.pk).update(status='approved')
+            return original_is_valid(form)
+
+        with patch.object(SubmissionForm, 'is_valid', approve_then_validate):
+            self.client.post(self.url, {'proof_text': 'Clearer proof'})
+
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'approved')
+        self.assertEqual(self._counters(), (0, 1))
@@ -8,6 +8,7 @@ app_name = 'tasks'
 urlpatterns = [
     # Task URLs
     path('', views.task_list, name='task_list'),
+    path('feed/', views.task_feed_api, name='task_feed_api'),
     path('create/', views.create_task, name='create_task'),
     path('my-tasks/', views.my_tasks, name='my_tasks'),
     path('my-submissions/', views.my_submissions, name='my_submissions'),
@@ -29,6 +30,7 @@ urlpatterns = [
     # Review URLs
     path('<int:task_id>/review/', views.review_submissions, name='review_submissions'),
     path('submission/<int:submission_id>/review/', views.review_submission, name='review_submission'),
+    path('<int:task_id>/review/bulk-approve/', views.bulk_review_submissions, name='bulk_review_submissions'),
     path("resubmit/<int:submission_id>/", views.resubmit_submission, name="resubmit_submission"),
 
     
@@ -1,14 +1,15 @@
 # tasks/views.py
-from chat.models import ChatRoom, Message
+from chat.models import ChatRoom
+from chat.services import post_message
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Count, Q, F
+from django.db.models import Exists, ExpressionWrapper, F, FloatField, OuterRef, Q, Value
 from django.shortcuts import get_object_or_404, redirect, render
-# from django.urls import reverse_lazy
+from django.urls import reverse
 from django.utils import timezone
 from django.views.generic import DetailView, ListView
 # from django.views.generic.edit import FormView
@@ -21,7 +22,10 @@ from wallets.models import EscrowTransaction
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+import base64
+import binascii
 import hashlib
+from datetime import datetime
 from decimal import Decimal, InvalidOperation
 import logging
 from .forms import (
@@ -38,44 +42,131 @@ from .models import Dispute, Submission, Task, TaskWallet, TaskWalletTransaction
 from .services import TaskWalletService
 import secrets
 
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import require_GET, require_POST
 
 logger = logging.getLogger(__name__)
 
+TASK_FEED_PAGE_SIZE = 20
+TASK_FEED_MAX_PAGE_SIZE = 50
 
 
 
-@login_required
-def task_list(request):
-    """List all active tasks with filtering + pagination."""
+
+def _task_feed_queryset(request, form):
+    """
+    Active tasks open for submissions, with the viewer's submission state and
+    slot progress computed in SQL so the feed is a single query.
+    """
     tasks = (
         Task.objects
         .filter(status="active", deadline__gt=timezone.now(), remaining_slots__gt=0)
         .select_related("advertiser", "category")
+        .annotate(
+            already_submitted=Exists(
+                Submission.objects.filter(task=OuterRef("pk"), member=request.user)
+            ),
+            progress=ExpressionWrapper(
+                (F("total_slots") - F("remaining_slots")) * Value(100.0) / F("total_slots"),
+                output_field=FloatField(),
+            ),
+        )
     )
+    return form.filter_queryset(tasks)
+
+
+def _encode_feed_cursor(task, ranked=False):
+    parts = [task.created_at.isoformat(), str(task.id)]
+    if ranked:
+        # repr() round-trips the float exactly, so ties on rank stay ties
+        parts.insert(0, repr(task.search_rank))
+    return base64.urlsafe_b64encode("|".join(parts).encode()).decode()
+
+
+def _decode_feed_cursor(cursor, ranked=False):
+    """
+    Return (search_rank, created_at, id) from a feed cursor, or None if it is
+    malformed. search_rank is None for unranked (non-search) cursors.
+    """
+    try:
+        parts = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if len(parts) != (3 if ranked else 2):
+            return None
+        rank = float(parts.pop(0)) if ranked else None
+        return rank, datetime.fromisoformat(parts[0]), int(parts[1])
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+@login_required
+def task_list(request):
+    """List all active tasks with filtering + pagination."""
     form = TaskFilterForm(request.GET)
-    if form.is_valid():
-        if form.cleaned_data.get("min_payout"):
-            tasks = tasks.filter(payout_per_slot__gte=form.cleaned_data["min_payout"])
-        if form.cleaned_data.get("max_payout"):
-            tasks = tasks.filter(payout_per_slot__lte=form.cleaned_data["max_payout"])
-        if form.cleaned_data.get("search"):
-            search = form.cleaned_data["search"]
-            tasks = tasks.filter(Q(title__icontains=search) | Q(description__icontains=search))
-        if form.cleaned_data.get("category"):
-            tasks = tasks.filter(category=form.cleaned_data["category"])
+    tasks = _task_feed_queryset(request, form)
 
     paginator = Paginator(tasks, 10)
     page = request.GET.get("page")
     tasks = paginator.get_page(page)
 
-    # annotate per-task state for template
-    for task in tasks:
-        task.progress = (task.filled_slots / task.total_slots * 100) if task.total_slots else 0
-        task.already_submitted = Submission.objects.filter(task=task, member=request.user).exists()
-
     return render(request, "tasks/task_list.html", {"tasks": tasks, "form": form})
 
+
+@login_required
+@require_GET
+def task_feed_api(request):
+    """
+    JSON task feed with keyset pagination on (created_at, id), or on
+    (search_rank, created_at, id) when searching so results stay ranked.
+    Pass the returned `next_cursor` back as `?cursor=` for the next page.
+    """
+    form = TaskFilterForm(request.GET)
+    tasks = _task_feed_queryset(request, form)
+    ranked = form.is_valid() and bool(form.cleaned_data.get("search"))
+    if ranked:
+        tasks = tasks.order_by("-search_rank", "-created_at", "-id")
+    else:
+        tasks = tasks.order_by("-created_at", "-id")
+
+    try:
+        limit = min(max(int(request.GET.get("limit", TASK_FEED_PAGE_SIZE)), 1), TASK_FEED_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = TASK_FEED_PAGE_SIZE
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        position = _decode_feed_cursor(cursor, ranked=ranked)
+        if position is None:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+        rank, created_at, task_id = position
+        after = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=task_id)
+        if ranked:
+            after = Q(search_rank__lt=rank) | (Q(search_rank=rank) & after)
+        tasks = tasks.filter(after)
+
+    page = list(tasks[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    return JsonResponse({
+        "results": [
+            {
+                "id": task.id,
+                "title": task.title,
+                "payout_per_slot": str(task.payout_per_slot),
+                "category": task.category.name if task.category else None,
+                "advertiser": task.advertiser.username,
+                "total_slots": task.total_slots,
+                "remaining_slots": task.remaining_slots,
+                "progress": round(task.progress, 2),
+                "deadline": task.deadline.isoformat(),
+                "created_at": task.created_at.isoformat(),
+                "already_submitted": task.already_submitted,
+                "url": reverse("tasks:task_detail", args=[task.id]),
+            }
+            for task in page
+        ],
+        "next_cursor": _encode_feed_cursor(page[-1], ranked=ranked) if has_more else None,
+    })
+
 @login_required
 @subscription_required
 def task_detail(request, task_id):
@@ -102,6 +193,7 @@ def task_detail(request, task_id):
                 submission.task = task
                 submission.member = request.user
                 submission.save()
+                Task.record_submission_transition(task.id, None, submission.status)
 
                 task.remaining_slots = F("remaining_slots") - 1
                 task.save(update_fields=["remaining_slots"])
@@ -115,10 +207,10 @@ def task_detail(request, task_id):
                     )
                     
                     # Send automatic message about this task
-                    Message.objects.create(
-                        chat_room=room,
-                        sender=request.user,
-                        content=f"📋 New submission: I've completed the task '{task.title}'. Please review when you can!"
+                    post_message(
+                        room,
+                        request.user,
+                        f"📋 New submission: I've completed the task '{task.title}'. Please review when you can!"
                     )
                     
                     if created:
@@ -241,10 +333,7 @@ def my_tasks(request):
         Task.objects.filter(advertiser=request.user)
         .select_related("advertiser")
         .annotate(
-            pending_count=Count("submissions", filter=Q(submissions__status="pending")),
-            approved_count=Count("submissions", filter=Q(submissions__status="approved")),
-            rejected_count=Count("submissions", filter=Q(submissions__status="rejected")),
-            submissions_count=Count("submissions"),
+            submissions_count=F("pending_count") + F("approved_count") + F("rejected_count"),
         )
         .order_by("-created_at")
     )
@@ -350,8 +439,8 @@ def my_submissions(request):
 def review_submissions(request, task_id):
     task = get_object_or_404(Task, id=task_id, advertiser=request.user)
     submissions = task.submissions.filter(status="pending").select_related("member").order_by("-reviewed_at")
-    approved_count = task.submissions.filter(status="approved").count()
-    rejected_count = task.submissions.filter(status="rejected").count()
+    approved_count = task.approved_count
+    rejected_count = task.rejected_count
 
     return render(
         request,
@@ -410,10 +499,12 @@ def review_submission(request, submission_id):
                             return redirect("tasks:review_submissions", task_id=submission.task.id)
                         
                         # ✅ Update submission status FIRST (before escrow release)
+                        previous_status = submission.status
                         submission.status = "approved"
                         submission.reviewed_at = timezone.now()
                         submission.reviewed_by = request.user
                         submission.save(update_fields=["status", "reviewed_at", "reviewed_by"])
+                        Task.record_submission_transition(submission.task_id, previous_status, "approved")
                         
                         logger.info(
                             f"[APPROVAL] Submission {submission_id} marked approved, "
@@ -461,6 +552,7 @@ def review_submission(request, submission_id):
                     with transaction.atomic():
                         submission = Submission.objects.select_for_update().get(id=submission_id)
                         
+                        previous_status = submission.status
                         submission.status = "rejected"
                         submission.rejection_reason = reason
                         submission.reviewed_at = timezone.now()
@@ -468,6 +560,7 @@ def review_submission(request, submission_id):
                         submission.save(update_fields=[
                             "status", "rejection_reason", "reviewed_at", "reviewed_by"
                         ])
+                        Task.record_submission_transition(submission.task_id, previous_status, "rejected")
                     
                     logger.info(f"[REJECTION] Submission {submission_id} rejected: {reason}")
                     messages.success(request, "Submission rejected.")
@@ -482,6 +575,62 @@ def review_submission(request, submission_id):
         {"submission": submission, "form": form, "room": room}
     )
 
+@login_required
+@subscription_required
+@require_POST
+def bulk_review_submissions(request, task_id):
+    """
+    Approve the selected (or all pending) submissions of a task in one go.
+    Responds with per-submission results as JSON for XHR callers.
+    """
+    task = get_object_or_404(Task, id=task_id)
+    if task.advertiser != request.user and not request.user.is_staff:
+        messages.error(request, "Permission denied.")
+        return redirect("tasks:task_list")
+
+    wants_json = request.headers.get("x-requested-with") == "XMLHttpRequest"
+    submission_ids = None
+    if not request.POST.get("approve_all"):
+        try:
+            submission_ids = [int(sid) for sid in request.POST.getlist("submission_ids")]
+        except ValueError:
+            submission_ids = []
+        if not submission_ids:
+            if wants_json:
+                return JsonResponse({"success": False, "error": "No submissions selected."}, status=400)
+            messages.error(request, "Select at least one submission to approve.")
+            return redirect("tasks:review_submissions", task_id=task.id)
+
+    try:
+        outcome = TaskWalletService.release_task_escrow_bulk(
+            task, reviewer=request.user, submission_ids=submission_ids
+        )
+    except ValueError as e:
+        logger.error(f"[BULK_APPROVAL] ValueError for task {task.id}: {e}", exc_info=True)
+        if wants_json:
+            return JsonResponse({"success": False, "error": str(e)}, status=400)
+        messages.error(request, f"Payment error: {str(e)}")
+        return redirect("tasks:review_submissions", task_id=task.id)
+
+    logger.info(f"[BULK_APPROVAL] Task {task.id}: approved {outcome['approved']} submissions")
+
+    if wants_json:
+        return JsonResponse({
+            "success": True,
+            "approved": outcome["approved"],
+            "results": [
+                {**result, "member_amount": str(result["member_amount"])} if "member_amount" in result else result
+                for result in outcome["results"]
+            ],
+        })
+
+    skipped = len(outcome["results"]) - outcome["approved"]
+    if outcome["approved"]:
+        messages.success(request, f"✓ {outcome['approved']} submission(s) approved and paid.")
+    if skipped:
+        messages.warning(request, f"{skipped} submission(s) were skipped (already reviewed or not found).")
+    return redirect("tasks:review_submissions", task_id=task.id)
+
 @login_required
 @subscription_required
 def create_dispute(request, submission_id):
@@ -584,8 +733,12 @@ def resolve_dispute(request, dispute_id):
                     )
                     
                     dispute.status = "resolved_favor_member"
+                    previous_status = dispute.submission.status
                     dispute.submission.status = "approved"
                     dispute.submission.save(update_fields=["status"])
+                    Task.record_submission_transition(
+                        dispute.submission.task_id, previous_status, "approved"
+                    )
                     
                     # ✅ CORRECT: Pass task object
                     TaskWalletService.release_task_escrow(
@@ -664,12 +817,24 @@ def resubmit_submission(request, submission_id):
             return redirect("tasks:task_detail", task_id=task.id)
         elif form.is_valid():
             with transaction.atomic():
+                # Lock and re-check: a double POST or a concurrent review may
+                # have moved the submission on since it was loaded
+                previous_status = (
+                    Submission.objects.select_for_update()
+                    .values_list("status", flat=True)
+                    .get(pk=submission.pk)
+                )
+                if previous_status != "rejected":
+                    messages.warning(request, "This submission has already been resubmitted or reviewed.")
+                    return redirect("tasks:task_detail", task_id=task.id)
+
                 updated_submission = form.save(commit=False)
                 updated_submission.status = "pending"
                 updated_submission.rejection_reason = ""
                 updated_submission.reviewed_at = None
                 updated_submission.submitted_at = timezone.now()
                 updated_submission.save()
+                Task.record_submission_transition(task.id, previous_status, "pending")
 
             messages.success(request, "Your submission has been resubmitted for review.")
             return redirect("tasks:task_detail", task_id=task.id)
@@ -0,0 +1,24 @@
+# users/caching.py
+"""Cache keys and invalidation for per-user pages."""
+from django.conf import settings
+
+from core.cache import invalidate_on_commit, make_key
+
+DASHBOARD_CACHE_TTL = getattr(settings, "USER_DASHBOARD_CACHE_TTL", 30)
+
+
+def dashboard_cache_key(user_id) -> str:
+    return make_key("users", "dashboard", user_id)
+
+
+def invalidate_dashboard(user_id) -> None:
+    """Drop a user's cached dashboard context; called from model signals."""
+    if user_id:
+        invalidate_on_commit(dashboard_cache_key(user_id))
+
+
+def invalidate_dashboards(user_ids) -> None:
+    """invalidate_dashboard() for many users with one cache round trip."""
+    keys = [dashboard_cache_key(user_id) for user_id in user_ids if user_id]
+    if keys:
+        invalidate_on_commit(*keys)
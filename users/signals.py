@@ -1,8 +1,9 @@
 from datetime import timedelta
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.utils import timezone
+from .caching import invalidate_dashboard
 from .models import User, UserProfile
 
 
@@ -47,3 +48,23 @@ def user_logged_out_handler(sender, request, user, **kwargs):
     # user.profile.last_logout = timezone.now()
     # user.profile.save(update_fields=["last_logout"])
     pass
+
+
+def _invalidate_owner_dashboard(owner_field):
+    def handler(sender, instance, **kwargs):
+        invalidate_dashboard(getattr(instance, f"{owner_field}_id", None))
+    return handler
+
+
+# Everything the dashboard shows; queryset.update() bypasses these, so the short TTL still bounds staleness.
+# Wallet balances move through update() in WalletService, which invalidates explicitly.
+for _model, _owner_field in (
+    ("wallets.Wallet", "user"),
+    ("tasks.TaskWallet", "user"),
+    ("tasks.Submission", "member"),
+    ("tasks.Task", "advertiser"),
+    ("payments.PaymentTransaction", "user"),
+):
+    _handler = _invalidate_owner_dashboard(_owner_field)
+    post_save.connect(_handler, sender=_model, weak=False, dispatch_uid=f"dashboard_invalidate_save:{_model}")
+    post_delete.connect(_handler, sender=_model, weak=False, dispatch_uid=f"dashboard_invalidate_delete:{_model}")
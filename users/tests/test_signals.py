@@ -491,4 +491,72 @@ class SignalPerformanceTest(TestCase):
         
         # After transaction, profile should still exist
         user.refresh_from_db()
-        self.assertTrue(hasattr(user, 'profile'))
\ No newline at end of file
+        self.assertTrue(hasattr(user, 'profile'))
+
+class DashboardCacheInvalidationTest(TestCase):
+    """Saves to dashboard sources drop the owner's cached dashboard."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='dash@example.com',
+            password='testpass123'
+        )
+
+    def test_wallet_save_invalidates_dashboard(self):
+        from django.core.cache import cache
+        from users.caching import dashboard_cache_key
+        from wallets.models import Wallet
+
+        key = dashboard_cache_key(self.user.pk)
+        cache.set(key, {'completed_tasks_count': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Wallet.objects.get_or_create(user=self.user)[0].save()
+
+        self.assertIsNone(cache.get(key))
+
+    def test_wallet_credit_invalidates_dashboard(self):
+        """Ledger writes update the balance without a save(), so the service invalidates"""
+        from decimal import Decimal
+        from django.core.cache import cache
+        from users.caching import dashboard_cache_key
+        from wallets.services import WalletService
+
+        key = dashboard_cache_key(self.user.pk)
+        cache.set(key, {'wallet_balance': 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletService.credit_wallet(self.user, Decimal('25.00'), 'funding', 'Test funding')
+
+        self.assertIsNone(cache.get(key))
+
+    def test_wallet_debit_invalidates_dashboard(self):
+        from decimal import Decimal
+        from django.core.cache import cache
+        from users.caching import dashboard_cache_key
+        from wallets.services import WalletService
+
+        WalletService.credit_wallet(self.user, Decimal('25.00'), 'funding', 'Test funding')
+        key = dashboard_cache_key(self.user.pk)
+        cache.set(key, {'wallet_balance': 25})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletService.debit_wallet(self.user, Decimal('10.00'), 'withdrawal', 'Test debit')
+
+        self.assertIsNone(cache.get(key))
+
+    def test_other_users_dashboard_is_kept(self):
+        from django.core.cache import cache
+        from users.caching import dashboard_cache_key
+        from wallets.models import Wallet
+
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        key = dashboard_cache_key(other.pk)
+        cache.set(key, {'completed_tasks_count': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Wallet.objects.get_or_create(user=self.user)[0].save()
+
+        self.assertEqual(cache.get(key), {'completed_tasks_count': 1})
@@ -8,7 +8,6 @@ from django.contrib.auth import login, logout, update_session_auth_hash
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.views import LoginView, PasswordResetView
-from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives
 from django.http import JsonResponse, HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
@@ -35,11 +34,13 @@ from .forms import (
     PasswordChangeForm,
     ExtendedProfileForm,
 )
+from .caching import DASHBOARD_CACHE_TTL, dashboard_cache_key
 from .models import User, UserProfile, EmailVerificationToken, PhoneVerificationToken
 from django.db import transaction
 from referrals.services import ReferralValidator, ReferralEarningService
 from tasks.models import Task, Submission
 from referrals.models import ReferralCode, Referral
+from core.cache import get_or_set
 from core.services import send_verification_email
 from wallets.services import WalletService
 from payments.models import PaymentTransaction
@@ -387,13 +388,17 @@ class UserDashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
 
-        # Cache key per-user for short period to avoid heavy DB hits on high traffic
-        cache_key = f"user_dashboard_{user.pk}"
-        cached = cache.get(cache_key)
-        if cached:
-            context.update(cached)
-            return context
+        # Cached per user across workers; wallet/task/payment saves invalidate it (see signals)
+        context.update(
+            get_or_set(
+                dashboard_cache_key(user.pk),
+                lambda: self._build_dashboard_data(user),
+                timeout=DASHBOARD_CACHE_TTL,
+            )
+        )
+        return context
 
+    def _build_dashboard_data(self, user):
         # User stats (keep minimal DB hits; assume some properties may be cached on the User model)
         user_stats = {
             "total_referrals": getattr(user, "total_referrals", 0),
@@ -408,10 +413,10 @@ class UserDashboardView(LoginRequiredMixin, TemplateView):
         if recent_referrals_qs is None:
             recent_referrals = []
         else:
-            recent_referrals = recent_referrals_qs.select_related("referrer")[:5]
+            recent_referrals = list(recent_referrals_qs.select_related("referrer")[:5])
 
         # Recent submissions by the user (select_related for task)
-        recent_tasks = (
+        recent_tasks = list(
             Submission.objects.filter(member=user)
             .select_related("task")
             .order_by("-submitted_at")[:5]
@@ -442,7 +447,7 @@ class UserDashboardView(LoginRequiredMixin, TemplateView):
 
 
         # Recent transactions (deterministic order)
-        recent_transactions = PaymentTransaction.objects.filter(user=user).order_by("-created_at")[:10]
+        recent_transactions = list(PaymentTransaction.objects.filter(user=user).order_by("-created_at")[:10])
 
         # Wallet balances (fall back to 0.00 if missing)
         main_wallet_balance = getattr(getattr(user, "wallet", None), "balance", Decimal("0.00"))
@@ -462,11 +467,7 @@ class UserDashboardView(LoginRequiredMixin, TemplateView):
             "recent_transactions": recent_transactions,
         }
 
-        # Cache for a short period (e.g., 30 seconds) — tune as needed
-        cache.set(cache_key, dashboard_data, 30)
-
-        context.update(dashboard_data)
-        return context
+        return dashboard_data
 
 
 # -------------------------
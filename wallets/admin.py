@@ -1,9 +1,9 @@
 # wallets/admin.py
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Sum
-from .models import Wallet, EscrowTransaction, WithdrawalRequest
+from .models import Wallet, WalletLedgerEntry, PlatformFeeEntry, EscrowTransaction, WithdrawalRequest
 from payments.models import PaymentTransaction
 
 
@@ -38,6 +38,48 @@ class WalletAdmin(admin.ModelAdmin):
     total_earned.short_description = 'Total Earned'
 
 
+@admin.register(WalletLedgerEntry)
+class WalletLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ['wallet', 'sequence', 'entry_type', 'amount', 'balance_after', 'category', 'reference', 'created_at']
+    list_filter = ['entry_type', 'category', 'created_at']
+    search_fields = ['wallet__user__username', 'reference']
+    list_select_related = ['wallet__user']
+
+    # ✅ Ledger is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+
+
+@admin.register(PlatformFeeEntry)
+class PlatformFeeEntryAdmin(admin.ModelAdmin):
+    list_display = ['reference', 'amount', 'task', 'created_at', 'folded_at']
+    list_filter = ['created_at', 'folded_at']
+    search_fields = ['reference', 'task__title', 'fold_reference']
+    readonly_fields = ['created_at', 'folded_at', 'fold_reference']
+
+    def changelist_view(self, request, extra_context=None):
+        """Show collected / pending / folded fee totals above the list."""
+        from .services import PlatformFeeService
+
+        extra_context = extra_context or {}
+        totals = PlatformFeeService.get_fee_totals()
+        self.message_user(
+            request,
+            f"Platform fees - Total: ₦{totals['total']:,.2f}, "
+            f"Folded: ₦{totals['folded']:,.2f}, Pending fold: ₦{totals['pending']:,.2f}"
+        )
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(EscrowTransaction)
@@ -127,18 +169,23 @@ class WithdrawalRequestAdmin(admin.ModelAdmin):
     status_display.short_description = 'Status'
     
     def approve_selected(self, request, queryset):
-        """Bulk approve withdrawal requests"""
-        from .services import WalletService
+        """Bulk approve withdrawal requests; payouts go out as bulk transfers"""
+        from .services import WithdrawalPayoutService
         
-        approved_count = 0
-        for withdrawal in queryset.filter(status='pending'):
-            try:
-                WalletService.approve_withdrawal(withdrawal.id, request.user)
-                approved_count += 1
-            except ValueError:
-                pass
+        ids = list(queryset.filter(status='pending').values_list('id', flat=True))
+        try:
+            result = WithdrawalPayoutService.approve_withdrawals(ids, request.user)
+        except ValueError as e:
+            self.message_user(request, str(e), level=messages.ERROR)
+            return
         
-        self.message_user(request, f'{approved_count} withdrawal requests approved.')
+        self.message_user(request, f"{len(result['approved'])} withdrawal requests approved and queued for payout.")
+        if result['failed']:
+            self.message_user(
+                request,
+                f"{len(result['failed'])} withdrawal requests could not be approved.",
+                level=messages.WARNING,
+            )
     approve_selected.short_description = 'Approve selected requests'
     
     def reject_selected(self, request, queryset):
@@ -1,7 +1,8 @@
 # wallets/celery_tasks.py - Background tasks using Celery
 from celery import shared_task
 from django.core.mail import send_mail
-from .models import WithdrawalRequest, Transaction
+from .models import WithdrawalRequest
+from payments.models import PaymentTransaction as Transaction
 import logging
 
 logger = logging.getLogger(__name__)
@@ -89,3 +90,37 @@ def daily_wallet_audit():
         logger.info('Daily wallet audit completed')
     except Exception as e:
         logger.error(f'Failed to run daily wallet audit: {str(e)}')
+
+@shared_task
+def fold_platform_fees(max_batches=20):
+    """Fold unfolded platform fee entries into the company wallet"""
+    from .services import PlatformFeeService
+
+    folded_entries = 0
+    try:
+        for _ in range(max_batches):
+            count, amount = PlatformFeeService.fold_pending_fees()
+            if not count:
+                break
+            folded_entries += count
+        logger.info(f'Platform fee fold completed: {folded_entries} entries')
+    except Exception as e:
+        logger.error(f'Failed to fold platform fees: {str(e)}')
+    return folded_entries
+
+@shared_task
+def submit_withdrawal_payouts(max_batches=10):
+    """Send approved withdrawals to the gateway in bulk transfer batches"""
+    from .services import WithdrawalPayoutService
+
+    claimed = 0
+    try:
+        for _ in range(max_batches):
+            result = WithdrawalPayoutService.submit_payouts()
+            if not result['claimed']:
+                break
+            claimed += result['claimed']
+        logger.info(f'Withdrawal payouts submitted: {claimed} withdrawals')
+    except Exception as e:
+        logger.error(f'Failed to submit withdrawal payouts: {str(e)}')
+    return claimed
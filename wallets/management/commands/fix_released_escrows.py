@@ -8,7 +8,7 @@ Updates existing released escrows to locked with correct amounts
 from decimal import Decimal
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from tasks.models import Submission, TaskWallet, TaskWalletTransaction
+from tasks.models import TaskWallet, TaskWalletTransaction
 from wallets.models import EscrowTransaction
 
 
@@ -47,11 +47,8 @@ class Command(BaseCommand):
         for escrow in released_escrows:
             task = escrow.task
             
-            # Count approved submissions
-            approved = Submission.objects.filter(
-                task=task, 
-                status="approved"
-            ).count()
+            # Approved submissions (denormalized counter on Task)
+            approved = task.approved_count
             
             # Calculate unfilled slots
             unfilled = task.total_slots - approved
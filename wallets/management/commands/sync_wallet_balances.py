@@ -0,0 +1,91 @@
+# wallets/management/commands/sync_wallet_balances.py
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from wallets.models import Wallet, WalletLedgerEntry
+
+
+class Command(BaseCommand):
+    help = 'Reconcile materialized wallet balances against the append-only wallet ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--wallet',
+            type=int,
+            help='Only reconcile this wallet id',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of ledger entries fetched per round trip',
+        )
+
+    def handle(self, *args, **options):
+        wallets = Wallet.objects.all()
+        entries = WalletLedgerEntry.objects.order_by('wallet_id', 'sequence').only(
+            'wallet_id', 'sequence', 'entry_type', 'amount', 'balance_after'
+        )
+        if options['wallet']:
+            wallets = wallets.filter(pk=options['wallet'])
+            entries = entries.filter(wallet_id=options['wallet'])
+
+        materialized = {
+            w['id']: (w['balance'], w['ledger_sequence'])
+            for w in wallets.values('id', 'balance', 'ledger_sequence')
+        }
+
+        drift = []
+        checked = 0
+        current_id = None
+        running = Decimal('0.00')
+        last_sequence = 0
+
+        def close_wallet(wallet_id):
+            balance, sequence = materialized.pop(wallet_id, (None, None))
+            if balance is None:
+                return
+            if balance != running or sequence != last_sequence:
+                drift.append(
+                    f'Wallet {wallet_id}: balance ₦{balance} (ledger ₦{running}), '
+                    f'sequence {sequence} (ledger {last_sequence})'
+                )
+
+        # ✅ Stream entries in (wallet, sequence) order instead of loading them all
+        for entry in entries.iterator(chunk_size=options['chunk_size']):
+            if entry.wallet_id != current_id:
+                if current_id is not None:
+                    close_wallet(current_id)
+                    checked += 1
+                current_id = entry.wallet_id
+                # Balances that predate the ledger carry over as the opening balance
+                running = entry.balance_after - entry.signed_amount
+                last_sequence = entry.sequence - 1
+
+            running += entry.signed_amount
+            if entry.sequence != last_sequence + 1:
+                drift.append(f'Wallet {entry.wallet_id}: sequence gap before entry #{entry.sequence}')
+            if entry.balance_after != running:
+                drift.append(
+                    f'Wallet {entry.wallet_id}: entry #{entry.sequence} balance_after '
+                    f'₦{entry.balance_after} != running ₦{running}'
+                )
+                running = entry.balance_after
+            last_sequence = entry.sequence
+
+        if current_id is not None:
+            close_wallet(current_id)
+            checked += 1
+
+        # Wallets that were never posted to must not have moved their sequence
+        for wallet_id, (balance, sequence) in materialized.items():
+            if sequence:
+                drift.append(f'Wallet {wallet_id}: sequence {sequence} but no ledger entries')
+
+        for line in drift:
+            self.stdout.write(self.style.WARNING(line))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Reconciled {checked} wallets, {len(drift)} discrepancies found')
+        )
@@ -2,6 +2,7 @@ from decimal import Decimal
 import uuid
 from django.db.models import Sum
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.db import models
 from payments.models import PaymentTransaction
@@ -14,6 +15,8 @@ class Wallet(models.Model):
         related_name="wallet"
     )
     balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    # ✅ Materialized from the ledger: sequence of the last WalletLedgerEntry posted
+    ledger_sequence = models.PositiveBigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -38,6 +41,98 @@ class Wallet(models.Model):
         """Alias for clarity."""
         return self.available_balance()
 
+
+class WalletLedgerEntry(models.Model):
+    """
+    Immutable, append-only record of every balance movement on a Wallet.
+
+    `sequence` is gapless per wallet and `balance_after` is the wallet balance
+    once this entry was applied, so a wallet can be reconciled by streaming
+    its entries in sequence order.
+    """
+    ENTRY_TYPES = [
+        ('credit', 'Credit'),
+        ('debit', 'Debit'),
+    ]
+
+    wallet = models.ForeignKey(Wallet, on_delete=models.PROTECT, related_name="ledger_entries")
+    sequence = models.PositiveBigIntegerField()
+    entry_type = models.CharField(max_length=10, choices=ENTRY_TYPES)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2)
+    category = models.CharField(max_length=30)
+    description = models.TextField(blank=True)
+    reference = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+    payment_transaction = models.ForeignKey(
+        PaymentTransaction,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name="ledger_entries"
+    )
+    metadata = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['wallet', 'sequence']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['wallet', 'sequence'],
+                name='unique_ledger_sequence_per_wallet'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.wallet_id}#{self.sequence} {self.entry_type} ₦{self.amount:,.2f} ({self.category})"
+
+    @property
+    def signed_amount(self) -> Decimal:
+        return self.amount if self.entry_type == 'credit' else -self.amount
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Ledger entries are immutable")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ledger entries are immutable")
+
+
+class PlatformFeeEntry(models.Model):
+    """
+    Append-only record of a platform fee (company cut) taken on an escrow release.
+
+    Fees are inserted here instead of being credited to the company wallet
+    inline, so concurrent approvals never contend on the company Wallet row.
+    `fold_platform_fees` periodically sums unfolded entries into the company
+    wallet with one ledger credit and stamps them with `folded_at`.
+    """
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    reference = models.CharField(max_length=100, unique=True)
+    description = models.TextField(blank=True)
+    task = models.ForeignKey('tasks.Task', on_delete=models.SET_NULL, null=True, blank=True, related_name='platform_fees')
+    escrow = models.ForeignKey('EscrowTransaction', on_delete=models.SET_NULL, null=True, blank=True, related_name='platform_fees')
+    metadata = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    folded_at = models.DateTimeField(blank=True, null=True)
+    fold_reference = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(folded_at__isnull=True),
+                name='platform_fee_unfolded_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Platform fee ₦{self.amount:,.2f} ({self.reference})"
+
+
 class EscrowTransaction(models.Model):
     task = models.ForeignKey('tasks.Task', on_delete=models.CASCADE)
     submission = models.OneToOneField(  # ✅ Changed to OneToOne
@@ -118,6 +213,8 @@ class WithdrawalRequest(models.Model):
     gateway_response = models.JSONField(blank=True, null=True)
 
     transaction = models.ForeignKey(PaymentTransaction, on_delete=models.CASCADE, blank=True, null=True)
+    # Set when the payout batcher hands the transfer to the gateway
+    payout_submitted_at = models.DateTimeField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(blank=True, null=True)
@@ -128,6 +225,11 @@ class WithdrawalRequest(models.Model):
             models.Index(fields=['user']),
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
+            models.Index(
+                fields=['processed_at'],
+                name='withdrawal_payout_queue_idx',
+                condition=models.Q(status='approved', payout_submitted_at__isnull=True),
+            ),
         ]
 
     def __str__(self):
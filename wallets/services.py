@@ -1,14 +1,16 @@
 # wallets/services.py
 from django.db import transaction
+from django.db.models import F, Q, Sum, Count
 from django.utils import timezone
 from decimal import Decimal, InvalidOperation
 
-from .models import Wallet, EscrowTransaction, WithdrawalRequest
+from .models import Wallet, WalletLedgerEntry, PlatformFeeEntry, EscrowTransaction, WithdrawalRequest
 from referrals.models import ReferralEarning, Referral
 
 # from tasks.models import TaskWalletTransaction
-from payments.models import PaymentTransaction, PaymentGateway
-from payments.services import PaystackService
+from payments.models import PaymentTransaction, PaymentGateway, PaystackTransaction
+from payments.services import PaystackService, PaymentIntentService, PAYSTACK_BULK_TRANSFER_LIMIT
+from users.caching import invalidate_dashboard, invalidate_dashboards
 
 # from unittest.mock import Mock
 # from django.conf import settings
@@ -59,13 +61,7 @@ class WalletService:
 
 
     @staticmethod
-    @transaction.atomic
-    def credit_wallet(user, amount, category, description="", reference=None, task=None, extra_data=None, payment_transaction=None):
-        """
-        Credit wallet - ONLY updates balance, does NOT create new PaymentTransaction.
-        If payment_transaction is provided, updates its balance_before/balance_after fields.
-        """
-        
+    def _clean_amount(amount):
         if amount is None:
             raise ValueError("Amount must be provided and greater than zero")
 
@@ -76,37 +72,83 @@ class WalletService:
 
         if amount <= 0:
             raise ValueError("Amount must be greater than zero")
+        return amount
 
-        extra_data = extra_data or {}
-        
-        from wallets.models import Wallet
+    @staticmethod
+    def _get_wallet_id(user):
+        wallet_id = Wallet.objects.filter(user=user).values_list("id", flat=True).first()
+        if wallet_id is None:
+            wallet, _ = Wallet.objects.get_or_create(user=user, defaults={"balance": Decimal("0.00")})
+            wallet_id = wallet.id
+        return wallet_id
 
-        try:
-            wallet = Wallet.objects.select_for_update().get(user=user)
-        except ObjectDoesNotExist:
-            wallet, _ = Wallet.objects.select_for_update().get_or_create(
-                user=user, 
-                defaults={"balance": Decimal("0.00")}
-            )
+    @staticmethod
+    def _post_ledger_entry(wallet_id, entry_type, amount, category, description="",
+                           reference=None, extra_data=None, payment_transaction=None):
+        """
+        Apply one ledger entry to the wallet's materialized balance and record it.
+
+        The balance and sequence are bumped with a single conditional UPDATE, so no
+        SELECT ... FOR UPDATE round trip is needed. The UPDATE's row lock is still
+        held until the caller's transaction commits, so concurrent writers to the
+        same wallet queue behind everything that transaction does afterwards; keep
+        slow work out of it. Debits only match while the balance covers the amount.
+        Returns the refreshed wallet, or None if a debit would overdraw it.
+        """
+        delta = amount if entry_type == "credit" else -amount
+        wallets = Wallet.objects.filter(pk=wallet_id)
+        if entry_type == "debit":
+            wallets = wallets.filter(balance__gte=amount)
+
+        updated = wallets.update(
+            balance=F("balance") + delta,
+            ledger_sequence=F("ledger_sequence") + 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            return None
 
-        try:
-            wallet_balance = Decimal(wallet.balance)
-        except Exception:
-            wallet_balance = Decimal(str(getattr(wallet, "balance", "0.00")))
+        wallet = Wallet.objects.get(pk=wallet_id)
+        WalletLedgerEntry.objects.create(
+            wallet=wallet,
+            sequence=wallet.ledger_sequence,
+            entry_type=entry_type,
+            amount=amount,
+            balance_after=wallet.balance,
+            category=category,
+            description=description or "",
+            reference=reference,
+            payment_transaction=payment_transaction,
+            metadata=extra_data or {},
+        )
 
-        # Update payment_transaction if provided (for funding transactions)
+        # Update payment_transaction if provided (for funding/withdrawal transactions)
         if payment_transaction:
-            payment_transaction.balance_before = wallet_balance
-            payment_transaction.balance_after = wallet_balance + amount
-            payment_transaction.description = description   
+            payment_transaction.balance_before = wallet.balance - delta
+            payment_transaction.balance_after = wallet.balance
+            payment_transaction.description = description   # ✅ add this
             payment_transaction.save(update_fields=['balance_before', 'balance_after', 'description'])
 
+        # The balance moved through update(), which sends no post_save
+        invalidate_dashboard(wallet.user_id)
+        return wallet
+
+    @staticmethod
+    @transaction.atomic
+    def credit_wallet(user, amount, category, description="", reference=None, task=None, extra_data=None, payment_transaction=None):
+        """
+        Credit wallet - appends a WalletLedgerEntry and bumps the materialized balance,
+        does NOT create new PaymentTransaction.
+        If payment_transaction is provided, updates its balance_before/balance_after fields.
+        """
+        amount = WalletService._clean_amount(amount)
+
+        wallet = WalletService._post_ledger_entry(
+            WalletService._get_wallet_id(user), "credit", amount, category,
+            description=description, reference=reference,
+            extra_data=extra_data, payment_transaction=payment_transaction,
+        )
 
-        # Update wallet balance
-        wallet.balance = wallet_balance + amount
-        wallet.updated_at = timezone.now()
-        wallet.save(update_fields=["balance", "updated_at"])
-        
         logger.info(
             "Wallet credited: user=%s amount=%s new_balance=%s ref=%s", 
             user.id if hasattr(user, 'id') else user, 
@@ -121,60 +163,142 @@ class WalletService:
     @transaction.atomic
     def debit_wallet(user, amount, category, description="", reference=None, task=None, extra_data=None, payment_transaction=None):
         """
-        Debit wallet - ONLY updates balance, does NOT create new PaymentTransaction.
+        Debit wallet - appends a WalletLedgerEntry and lowers the materialized balance,
+        does NOT create new PaymentTransaction.
         If payment_transaction is provided, updates its balance_before/balance_after fields.
         """
-        if amount is None:
-            raise ValueError("Amount must be provided and greater than zero")
-
-        try:
-            amount = Decimal(amount)
-        except (InvalidOperation, TypeError):
-            raise ValueError("Amount must be a number")
-
-        if amount <= 0:
-            raise ValueError("Amount must be greater than zero")
-
-        extra_data = extra_data or {}
+        amount = WalletService._clean_amount(amount)
         wallet = WalletService.get_or_create_wallet(user)
 
-        # Compute available balance
-        try:
-            current_balance = Decimal(wallet.balance)
-        except Exception:
-            current_balance = Decimal(str(getattr(wallet, "balance", "0.00")))
-
-        available_balance = wallet.get_available_balance() if category == 'escrow' else current_balance
-        if available_balance < amount:
-            raise ValueError(f"Insufficient balance. Available: ₦{available_balance}, Required: ₦{amount}")
-
-        # Update payment_transaction if provided (for withdrawal transactions)
-        # if payment_transaction:
-        #     payment_transaction.balance_before = current_balance
-        #     payment_transaction.balance_after = current_balance - amount
-        #     payment_transaction.save(update_fields=['balance_before', 'balance_after'])
-
-        if payment_transaction:
-            payment_transaction.balance_before = current_balance
-            payment_transaction.balance_after = current_balance - amount
-            payment_transaction.description = description   # ✅ add this
-            payment_transaction.save(update_fields=['balance_before', 'balance_after', 'description'])
+        # Escrow must leave pending withdrawals covered; everything else is
+        # guarded by the conditional UPDATE in _post_ledger_entry.
+        if category == 'escrow':
+            available_balance = wallet.get_available_balance()
+            if available_balance < amount:
+                raise ValueError(f"Insufficient balance. Available: ₦{available_balance}, Required: ₦{amount}")
+
+        debited = WalletService._post_ledger_entry(
+            wallet.id, "debit", amount, category,
+            description=description, reference=reference,
+            extra_data=extra_data, payment_transaction=payment_transaction,
+        )
+        if debited is None:
+            wallet.refresh_from_db(fields=["balance"])
+            raise ValueError(f"Insufficient balance. Available: ₦{wallet.balance}, Required: ₦{amount}")
 
-        # Update wallet balance
-        wallet.balance = current_balance - amount
-        wallet.updated_at = timezone.now()
-        wallet.save(update_fields=["balance", "updated_at"])
-        
         logger.info(
             "Wallet debited: user=%s amount=%s new_balance=%s ref=%s", 
             user.id if hasattr(user, 'id') else user, 
             amount,
-            wallet.balance,
+            debited.balance,
             reference or 'N/A'
         )
         
-        return wallet
+        return debited
+
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_credit_wallets(credits, amount, category, description=""):
+        """
+        Credit the same amount to many wallets in a constant number of queries.
+
+        `credits` maps user_id -> (reference, extra_data). Each wallet gets one
+        ledger entry; balances and sequences move in a single UPDATE, so a
+        user must appear at most once per call.
+        Returns {user_id: Wallet} with the post-credit balances.
+        """
+        amount = WalletService._clean_amount(amount)
+        if not credits:
+            return {}
+
+        user_ids = list(credits)
+        Wallet.objects.bulk_create(
+            [Wallet(user_id=user_id, balance=Decimal("0.00")) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        Wallet.objects.filter(user_id__in=user_ids).update(
+            balance=F("balance") + amount,
+            ledger_sequence=F("ledger_sequence") + 1,
+            updated_at=timezone.now(),
+        )
+
+        wallets = {w.user_id: w for w in Wallet.objects.filter(user_id__in=user_ids)}
+        entries = []
+        for user_id, wallet in wallets.items():
+            reference, extra_data = credits[user_id]
+            entries.append(WalletLedgerEntry(
+                wallet=wallet,
+                sequence=wallet.ledger_sequence,
+                entry_type="credit",
+                amount=amount,
+                balance_after=wallet.balance,
+                category=category,
+                description=description,
+                reference=reference,
+                metadata=extra_data or {},
+            ))
+        WalletLedgerEntry.objects.bulk_create(entries)
+        invalidate_dashboards(wallets)
+
+        logger.info(
+            "Wallets bulk credited: wallets=%s amount=%s category=%s",
+            len(entries), amount, category
+        )
+        return wallets
 
+    @staticmethod
+    @transaction.atomic
+    def bulk_debit_wallets(locked_wallets, debits, amount, category, description=""):
+        """
+        Debit the same amount from many wallets in a constant number of queries.
+
+        `locked_wallets` maps user_id -> Wallet already locked by the caller
+        with select_for_update(); `debits` maps user_id -> (reference, extra_data).
+        Wallets that can't cover the amount are skipped.
+        Returns {user_id: Wallet} for the wallets that were debited.
+        """
+        amount = WalletService._clean_amount(amount)
+        debited = {
+            user_id: wallet for user_id, wallet in locked_wallets.items()
+            if user_id in debits and wallet.balance >= amount
+        }
+        if not debited:
+            return {}
+
+        now = timezone.now()
+        Wallet.objects.filter(pk__in=[w.pk for w in debited.values()]).update(
+            balance=F("balance") - amount,
+            ledger_sequence=F("ledger_sequence") + 1,
+            updated_at=now,
+        )
+
+        entries = []
+        for user_id, wallet in debited.items():
+            # Rows are locked, so the new values can be derived without a re-read
+            wallet.balance -= amount
+            wallet.ledger_sequence += 1
+            wallet.updated_at = now
+            reference, extra_data = debits[user_id]
+            entries.append(WalletLedgerEntry(
+                wallet=wallet,
+                sequence=wallet.ledger_sequence,
+                entry_type="debit",
+                amount=amount,
+                balance_after=wallet.balance,
+                category=category,
+                description=description,
+                reference=reference,
+                metadata=extra_data or {},
+            ))
+        WalletLedgerEntry.objects.bulk_create(entries)
+        invalidate_dashboards(debited)
+
+        logger.info(
+            "Wallets bulk debited: wallets=%s amount=%s category=%s",
+            len(entries), amount, category
+        )
+        return debited
 
     @transaction.atomic
     @staticmethod
@@ -268,24 +392,28 @@ class WalletService:
         return withdrawal
 
     @staticmethod
-    @transaction.atomic
     def approve_withdrawal(withdrawal_id, admin_user):
         """
-        Approve a withdrawal request:
-        1. Create Paystack transfer recipient
-        2. Initiate Paystack transfer (creates PaymentTransaction + PaystackTransaction)
-        3. Debit user's wallet and link to PaymentTransaction
-        4. Mark withdrawal as approved (webhook will later confirm success/failure)
+        Approve a withdrawal request and pay it out right away:
+        1. Look up (or register) the Paystack transfer recipient
+        2. Commit the intent: debit the wallet, create the PENDING PaymentTransaction,
+           mark the withdrawal approved
+        3. Submit the transfer to Paystack (no transaction or row lock held)
+        A rejected transfer refunds the wallet and raises; an ambiguous one is left
+        for the payment intent reconciler. The webhook confirms success/failure.
         """
-        withdrawal = WithdrawalRequest.objects.select_for_update().get(id=withdrawal_id)
-
+        withdrawal = WithdrawalRequest.objects.select_related("user").get(id=withdrawal_id)
         if withdrawal.status != "pending":
             raise ValueError("Withdrawal request is not pending")
 
+        gateway = PaymentGateway.objects.filter(name__iexact="paystack").first()
+        if not gateway:
+            raise ValueError("Payment gateway not configured")
+
         paystack = PaystackService()
 
-        # 1) Create Paystack recipient
-        recipient_result = paystack.create_transfer_recipient(
+        # 1) Paystack recipient (registered once per bank account)
+        recipient_result = paystack.get_transfer_recipient(
             withdrawal.user, withdrawal.bank_code, withdrawal.account_number
         )
         if not recipient_result.get("success"):
@@ -293,56 +421,50 @@ class WalletService:
 
         recipient_code = recipient_result["data"]["recipient_code"]
 
+        # 2) Commit the intent
+        with transaction.atomic():
+            withdrawal = WithdrawalRequest.objects.select_for_update().select_related("user").get(id=withdrawal_id)
+            if withdrawal.status != "pending":
+                raise ValueError("Withdrawal request is not pending")
+
+            payment_txn = PaymentIntentService.create_withdrawal_intent(
+                user=withdrawal.user,
+                gateway=gateway,
+                amount_usd=withdrawal.amount_usd,
+                amount_local=withdrawal.amount_usd,
+                currency="NGN",
+                gateway_reference=f"WD_{withdrawal.id.hex}",
+                description=f"Withdrawal request #{withdrawal.id}",
+            )
 
-        # 2) Initiate transfer
-        transfer_result = paystack.initiate_transfer(
-            user=withdrawal.user,
-            amount_usd=withdrawal.amount_usd,
-            recipient_code=recipient_code,
-            reason=f"Withdrawal {withdrawal.id}"
+            now = timezone.now()
+            withdrawal.status = "approved"  # admin-level approval; webhook still finalizes
+            withdrawal.processed_by = admin_user
+            withdrawal.processed_at = now
+            withdrawal.transaction = payment_txn
+            withdrawal.gateway_reference = payment_txn.gateway_reference
+            # Submitted here, so the bulk payout worker leaves it alone
+            withdrawal.payout_submitted_at = now
+            withdrawal.save(update_fields=[
+                "status", "processed_by", "processed_at",
+                "transaction", "gateway_reference", "payout_submitted_at"
+            ])
+
+        # 3) Initiate transfer
+        transfer_result = paystack.submit_transfer(
+            payment_txn,
+            recipient_code,
+            reason=f"Withdrawal {withdrawal.id}",
+            bank_code=withdrawal.bank_code or "",
+            account_number=withdrawal.account_number or "",
+            account_name=withdrawal.account_name or "",
         )
-        if not transfer_result.get("success"):
+        if not transfer_result.get("success") and not transfer_result.get("ambiguous"):
+            # The intent is already failed and refunded
             raise ValueError(transfer_result.get("error", "Paystack transfer failed"))
 
-        transfer_data = transfer_result["data"]
-        txn_id = transfer_data["transaction_id"]
-        gateway_reference = transfer_data["reference"]
-        transfer_code = transfer_data.get("transfer_code")
-
-        # 3) Fetch created PaymentTransaction
-        payment_txn = PaymentTransaction.objects.get(id=txn_id)
-
-        # 4) Debit wallet (link to payment transaction)
-        debit_txn = WalletService.debit_wallet(
-            user=withdrawal.user,
-            amount=withdrawal.amount_usd,
-            category="withdrawal",
-            description=f"Withdrawal request #{withdrawal.id}",
-            reference=payment_txn.internal_reference,
-            payment_transaction=payment_txn,
-        )
-
-        # 5) Update withdrawal bookkeeping
-        withdrawal.status = "approved"  # admin-level approval; webhook still finalizes
-        withdrawal.processed_by = admin_user
-        withdrawal.processed_at = timezone.now()
-        withdrawal.transaction = debit_txn
-        withdrawal.gateway_reference = gateway_reference
         withdrawal.gateway_response = transfer_result  # already structured
-        withdrawal.save(update_fields=[
-            "status", "processed_by", "processed_at",
-            "transaction", "gateway_reference", "gateway_response"
-        ])
-
-        # 6) Update PaystackTransaction details with bank/recipient info
-        pst = payment_txn.paystack_details
-        pst.bank_code = withdrawal.bank_code
-        pst.account_number = withdrawal.account_number
-        pst.account_name = withdrawal.account_name
-        pst.recipient_code = recipient_code
-        pst.transfer_code = transfer_code
-        pst.save(update_fields=["bank_code", "account_number", "account_name", "recipient_code", "transfer_code"])
-
+        WithdrawalRequest.objects.filter(pk=withdrawal.pk).update(gateway_response=transfer_result)
         return withdrawal
 
 
@@ -393,3 +515,257 @@ class WalletService:
             pass
 
         return init_result["data"]["authorization_url"]
+
+
+class PlatformFeeService:
+    """
+    Platform fees are appended to PlatformFeeEntry instead of being credited to
+    the company wallet on every escrow release, then folded in batches.
+    """
+
+    FOLD_BATCH_SIZE = 1000
+
+    @staticmethod
+    def record_fee(amount, reference, description="", task=None, escrow=None, extra_data=None):
+        """Append a platform fee. Pure insert - never touches the company Wallet row."""
+        amount = WalletService._clean_amount(amount)
+        return PlatformFeeEntry.objects.create(
+            amount=amount,
+            reference=reference,
+            description=description,
+            task=task,
+            escrow=escrow,
+            metadata=extra_data or {},
+        )
+
+    @staticmethod
+    def record_fees(entries):
+        """Bulk variant of record_fee; `entries` are unsaved PlatformFeeEntry objects."""
+        return PlatformFeeEntry.objects.bulk_create(entries)
+
+    @staticmethod
+    @transaction.atomic
+    def fold_pending_fees(batch_size=None):
+        """
+        Move one batch of unfolded fees into the company wallet with a single
+        ledger credit. Rows are claimed with SKIP LOCKED so concurrent folds
+        never double count. Returns (entries_folded, amount_folded).
+        """
+        from tasks.services import get_company_user
+
+        batch_size = batch_size or PlatformFeeService.FOLD_BATCH_SIZE
+        claimed = list(
+            PlatformFeeEntry.objects
+            .select_for_update(skip_locked=True)
+            .filter(folded_at__isnull=True)
+            .order_by("created_at")
+            .values_list("id", "amount")[:batch_size]
+        )
+        if not claimed:
+            return 0, Decimal("0.00")
+
+        ids = [fee_id for fee_id, _ in claimed]
+        total = sum((amount for _, amount in claimed), Decimal("0.00"))
+        fold_ref = f"FEE_FOLD_{ids[0]}_{ids[-1]}_{timezone.now().timestamp()}"
+
+        WalletService.credit_wallet(
+            user=get_company_user(),
+            amount=total,
+            category="company_cut",
+            description=f"Platform fees folded ({len(ids)} entries)",
+            reference=fold_ref,
+            extra_data={"fee_entries": len(ids), "first_fee_id": ids[0], "last_fee_id": ids[-1]},
+        )
+        PlatformFeeEntry.objects.filter(id__in=ids).update(folded_at=timezone.now(), fold_reference=fold_ref)
+
+        logger.info("Platform fees folded: entries=%s amount=%s ref=%s", len(ids), total, fold_ref)
+        return len(ids), total
+
+    @staticmethod
+    def get_fee_totals():
+        """
+        Fee totals for admin reporting, read in a single statement so a fold
+        running concurrently can never be counted twice or missed.
+        """
+        totals = PlatformFeeEntry.objects.aggregate(
+            total=Sum("amount"),
+            pending=Sum("amount", filter=Q(folded_at__isnull=True)),
+            folded=Sum("amount", filter=Q(folded_at__isnull=False)),
+            entries=Count("id"),
+        )
+        for key in ("total", "pending", "folded"):
+            totals[key] = totals[key] or Decimal("0.00")
+        return totals
+
+
+class WithdrawalPayoutService:
+    """
+    Approves withdrawals without touching the gateway, then pays approved
+    withdrawals out in Paystack bulk transfers. Final success/failure of each
+    transfer still arrives through the transfer webhooks (matched on
+    gateway_reference).
+    """
+
+    PAYOUT_BATCH_SIZE = 100  # Paystack bulk transfer limit
+
+    @staticmethod
+    def approve_withdrawals(withdrawal_ids, admin_user):
+        """
+        Approve pending withdrawals: debit each wallet and create its PENDING
+        withdrawal PaymentTransaction, then queue the batch for payout.
+        Returns {"approved": [ids], "failed": {id: error}}.
+        """
+        gateway = PaymentGateway.objects.filter(name__iexact="paystack").first()
+        if not gateway:
+            raise ValueError("Payment gateway not configured")
+
+        approved, failed = [], {}
+        now = timezone.now()
+        with transaction.atomic():
+            withdrawals = list(
+                WithdrawalRequest.objects
+                .select_for_update(skip_locked=True, of=("self",))
+                .select_related("user")
+                .filter(id__in=withdrawal_ids, status="pending")
+            )
+            for withdrawal in withdrawals:
+                try:
+                    # Savepoint per withdrawal so one short wallet doesn't sink the batch
+                    payment_txn = PaymentIntentService.create_withdrawal_intent(
+                        user=withdrawal.user,
+                        gateway=gateway,
+                        amount_usd=withdrawal.amount_usd,
+                        amount_local=withdrawal.amount_usd,
+                        currency="NGN",
+                        # Deterministic, so a resubmitted batch can't pay twice
+                        gateway_reference=f"WD_{withdrawal.id.hex}",
+                        description=f"Withdrawal request #{withdrawal.id}",
+                    )
+                except ValueError as e:
+                    failed[str(withdrawal.id)] = str(e)
+                    continue
+
+                withdrawal.status = "approved"
+                withdrawal.processed_by = admin_user
+                withdrawal.processed_at = now
+                withdrawal.transaction = payment_txn
+                withdrawal.gateway_reference = payment_txn.gateway_reference
+                approved.append(withdrawal)
+
+            WithdrawalRequest.objects.bulk_update(
+                approved,
+                ["status", "processed_by", "processed_at", "transaction", "gateway_reference"],
+            )
+            if approved:
+                transaction.on_commit(WithdrawalPayoutService._notify_payout_worker)
+
+        logger.info("Withdrawals approved for payout: approved=%s failed=%s", len(approved), len(failed))
+        return {"approved": [str(w.id) for w in approved], "failed": failed}
+
+    @staticmethod
+    def _notify_payout_worker():
+        from .celery_tasks import submit_withdrawal_payouts
+
+        try:
+            submit_withdrawal_payouts.delay()
+        except Exception as e:
+            # The periodic process_withdrawals run picks the batch up instead
+            logger.error("Failed to enqueue withdrawal payouts: %s", e)
+
+    @staticmethod
+    def submit_payouts(batch_size=None):
+        """
+        Claim one batch of approved, unsubmitted withdrawals and send them as a
+        single Paystack bulk transfer. Rows are claimed (and stamped
+        payout_submitted_at) in a short transaction; the HTTP calls run
+        outside it. Returns counts of submitted / failed / unconfirmed items.
+        """
+        batch_size = min(batch_size or WithdrawalPayoutService.PAYOUT_BATCH_SIZE,
+                         PAYSTACK_BULK_TRANSFER_LIMIT)
+        totals = {"claimed": 0, "submitted": 0, "failed": 0, "unconfirmed": 0}
+
+        with transaction.atomic():
+            claimed = list(
+                WithdrawalRequest.objects
+                .select_for_update(skip_locked=True, of=("self",))
+                .select_related("user", "transaction")
+                .filter(status="approved", payout_submitted_at__isnull=True, transaction__isnull=False)
+                .order_by("processed_at")[:batch_size]
+            )
+            if not claimed:
+                return totals
+            WithdrawalRequest.objects.filter(id__in=[w.id for w in claimed]).update(
+                payout_submitted_at=timezone.now()
+            )
+        totals["claimed"] = len(claimed)
+
+        paystack = PaystackService()
+        transfers, pending = [], {}
+        for withdrawal in claimed:
+            recipient = paystack.get_transfer_recipient(
+                withdrawal.user, withdrawal.bank_code, withdrawal.account_number
+            )
+            if not recipient.get("success"):
+                WithdrawalPayoutService._fail_payout(withdrawal, recipient.get("error") or "Recipient creation failed")
+                totals["failed"] += 1
+                continue
+
+            recipient_code = recipient["data"]["recipient_code"]
+            transfers.append({
+                "amount": int(withdrawal.transaction.amount_local * Decimal("100")),  # kobo
+                "recipient": recipient_code,
+                "reference": withdrawal.gateway_reference,
+                "reason": f"Withdrawal {withdrawal.id}",
+            })
+            pending[withdrawal.gateway_reference] = (withdrawal, recipient_code)
+
+        if not transfers:
+            return totals
+
+        # Restamp just before the call: recipient registration above can take a
+        # while, and intent reconciliation ages withdrawals from this attempt
+        WithdrawalRequest.objects.filter(
+            id__in=[withdrawal.id for withdrawal, _ in pending.values()]
+        ).update(payout_submitted_at=timezone.now())
+        result = paystack.initiate_bulk_transfer(transfers)
+        if result.get("success"):
+            details = []
+            for item in result["data"]:
+                withdrawal, recipient_code = pending.pop(item.get("reference"), (None, None))
+                if withdrawal is None:
+                    continue
+                details.append(PaystackTransaction(
+                    transaction=withdrawal.transaction,
+                    paystack_reference=withdrawal.gateway_reference,
+                    recipient_code=recipient_code,
+                    transfer_code=item.get("transfer_code") or "",
+                    bank_code=withdrawal.bank_code or "",
+                    account_number=withdrawal.account_number or "",
+                    account_name=withdrawal.account_name or "",
+                ))
+            PaystackTransaction.objects.bulk_create(details, ignore_conflicts=True)
+            PaymentTransaction.objects.filter(
+                pk__in=[d.transaction_id for d in details], status=PaymentTransaction.Status.PENDING
+            ).update(submitted_at=timezone.now())
+            totals["submitted"] = len(details)
+            # Anything Paystack didn't echo back is left for the transfer webhooks
+            totals["unconfirmed"] = len(pending)
+        elif result.get("ambiguous"):
+            logger.warning(
+                "Bulk transfer outcome unknown for %s withdrawals, awaiting webhooks: %s",
+                len(pending), result.get("error"),
+            )
+            totals["unconfirmed"] = len(pending)
+        else:
+            for withdrawal, _ in pending.values():
+                WithdrawalPayoutService._fail_payout(withdrawal, result.get("error") or "Bulk transfer rejected")
+            totals["failed"] += len(pending)
+
+        logger.info("Withdrawal payout batch: %s", totals)
+        return totals
+
+    @staticmethod
+    def _fail_payout(withdrawal, error):
+        """Mark a payout that never reached the gateway as failed and refund the wallet."""
+        if PaymentIntentService.fail_intent(withdrawal.transaction, {"error": error}):
+            logger.warning("Withdrawal payout failed: withdrawal=%s error=%s", withdrawal.id, error)
@@ -371,7 +371,7 @@ class WithdrawalRequestAdminTest(WalletTestCase):
         expected_readonly = ['id', 'created_at', 'gateway_response']
         self.assertEqual(list(self.withdrawal_admin.readonly_fields), expected_readonly)
     
-    @patch('wallets.services.WalletService.approve_withdrawal')
+    @patch('wallets.services.WithdrawalPayoutService.approve_withdrawals')
     def test_approve_selected_action(self, mock_approve):
         """Test approve_selected admin action"""
         # Create another pending withdrawal
@@ -386,7 +386,7 @@ class WithdrawalRequestAdminTest(WalletTestCase):
         )
         
         # Mock successful approval
-        mock_approve.return_value = None
+        mock_approve.return_value = {'approved': [], 'failed': {}}
         
         # Create mock request and queryset
         mock_request = Mock()
@@ -397,10 +397,11 @@ class WithdrawalRequestAdminTest(WalletTestCase):
         # Execute action
         self.withdrawal_admin.approve_selected(mock_request, queryset)
         
-        # Should call approve for each pending withdrawal
-        self.assertEqual(mock_approve.call_count, 2)
-        mock_approve.assert_any_call(self.withdrawal.id, self.admin_user)
-        mock_approve.assert_any_call(withdrawal2.id, self.admin_user)
+        # Should approve all pending withdrawals in one batch
+        mock_approve.assert_called_once()
+        ids, admin_user = mock_approve.call_args[0]
+        self.assertCountEqual(ids, [self.withdrawal.id, withdrawal2.id])
+        self.assertEqual(admin_user, self.admin_user)
     
     @patch('wallets.services.WalletService.reject_withdrawal')
     def test_reject_selected_action(self, mock_reject):
@@ -8,7 +8,7 @@ import uuid
 from django.utils import timezone
 from datetime import timedelta
 
-from ..models import Wallet, Transaction
+from ..models import Wallet, WalletLedgerEntry
 from ..services import WalletService
 from tasks.models import Task
 from subscriptions.models import UserSubscription, SubscriptionPlan
@@ -167,14 +167,12 @@ class MockPaystackMixin:
         self.paystack_patcher = patch('wallets.services.PaystackService')
         mock_paystack = self.paystack_patcher.start()
         
-        # Mock successful transfer recipient creation
-        mock_paystack.return_value.create_transfer_recipient.return_value = {
+        # Mock successful transfer recipient lookup/registration
+        mock_paystack.return_value.get_transfer_recipient.return_value = {
             'success': True,
             'data': {
-                'data': {
-                    'recipient_code': 'RCP_test123',
-                    'name': 'Test Account'
-                }
+                'recipient_code': 'RCP_test123',
+                'account_name': 'Test Account'
             }
         }
         
@@ -188,6 +186,9 @@ class MockPaystackMixin:
                 'raw': {'status': 'success'}
             }
         }
+        mock_paystack.return_value.submit_transfer.return_value = (
+            mock_paystack.return_value.initiate_transfer.return_value
+        )
         
         # Mock successful payment initialization
         mock_paystack.return_value.initialize_payment.return_value = {
@@ -206,7 +207,7 @@ class MockPaystackMixin:
         self.paystack_patcher = patch('wallets.services.PaystackService')
         mock_paystack = self.paystack_patcher.start()
         
-        mock_paystack.return_value.create_transfer_recipient.return_value = {
+        mock_paystack.return_value.get_transfer_recipient.return_value = {
             'success': False,
             'error': 'Failed to create recipient'
         }
@@ -215,6 +216,9 @@ class MockPaystackMixin:
             'success': False,
             'error': 'Transfer failed'
         }
+        mock_paystack.return_value.submit_transfer.return_value = (
+            mock_paystack.return_value.initiate_transfer.return_value
+        )
         
         mock_paystack.return_value.initialize_payment.return_value = {
             'success': False,
@@ -233,10 +237,10 @@ class TransactionTestMixin:
     """Mixin for transaction-related test helpers"""
     
     def assert_transaction_created(self, user, transaction_type, category, amount):
-        """Assert that a transaction was created with specific parameters"""
-        transaction = Transaction.objects.filter(
-            user=user,
-            transaction_type=transaction_type,
+        """Assert that a ledger entry was posted with specific parameters"""
+        transaction = WalletLedgerEntry.objects.filter(
+            wallet__user=user,
+            entry_type=transaction_type,
             category=category,
             amount=amount
         ).first()
@@ -385,7 +385,7 @@ class ErrorHandlingIntegrationTest(WalletTestCase, MockPaystackMixin):
         # Test 1: Paystack recipient creation failure
         with patch('payments.services.PaystackService') as mock_paystack_class:
             mock_paystack = mock_paystack_class.return_value
-            mock_paystack.create_transfer_recipient.return_value = {
+            mock_paystack.get_transfer_recipient.return_value = {
                 'success': False,
                 'error': 'Invalid account details'
             }
@@ -399,11 +399,11 @@ class ErrorHandlingIntegrationTest(WalletTestCase, MockPaystackMixin):
         # Test 2: Transfer initiation failure
         with patch('payments.services.PaystackService') as mock_paystack_class:
             mock_paystack = mock_paystack_class.return_value
-            mock_paystack.create_transfer_recipient.return_value = {
+            mock_paystack.get_transfer_recipient.return_value = {
                 'success': True,
-                'data': {'data': {'recipient_code': 'RCP_test'}}
+                'data': {'recipient_code': 'RCP_test'}
             }
-            mock_paystack.initiate_transfer.return_value = {
+            mock_paystack.submit_transfer.return_value = {
                 'success': False,
                 'error': 'Insufficient funds in gateway account'
             }
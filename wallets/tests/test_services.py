@@ -1,4 +1,5 @@
 # wallets/tests/test_services.py
+from django.conf import settings
 from django.contrib.auth import get_user_model
 # from django.db import transaction as db_transaction
 from payments.services import PaystackService
@@ -8,8 +9,8 @@ from decimal import Decimal
 from unittest.mock import patch, Mock
 import uuid
 
-from ..models import Wallet, Transaction, WithdrawalRequest, EscrowTransaction
-from ..services import WalletService
+from ..models import Wallet, WalletLedgerEntry, PlatformFeeEntry, WithdrawalRequest, EscrowTransaction
+from ..services import WalletService, PlatformFeeService, WithdrawalPayoutService
 from .test_base import WalletTestCase, MockPaystackMixin
 from referrals.models import ReferralEarning
 from payments.models import PaymentGateway, PaystackTransaction
@@ -125,7 +126,7 @@ class WalletServiceBasicTest(WalletTestCase):
         
         # No transaction should be created
         self.assertFalse(
-            Transaction.objects.filter(user=self.user, amount=debit_amount).exists()
+            WalletLedgerEntry.objects.filter(wallet__user=self.user, amount=debit_amount).exists()
         )
     
     def test_transaction_atomicity(self):
@@ -143,7 +144,7 @@ class WalletServiceBasicTest(WalletTestCase):
         
         # No transaction should be created due to rollback
         self.assertFalse(
-            Transaction.objects.filter(user=self.user, amount=credit_amount).exists()
+            WalletLedgerEntry.objects.filter(wallet__user=self.user, amount=credit_amount).exists()
         )
         
         # Wallet balance should remain unchanged
@@ -193,6 +194,88 @@ class WalletServiceBasicTest(WalletTestCase):
             self.assertEqual(transaction.amount.quantize(Decimal('0.01')), amount.quantize(Decimal('0.01')))
 
 
+class WalletLedgerTest(WalletTestCase):
+    """Test the append-only wallet ledger behind credit/debit"""
+
+    def test_credit_appends_ledger_entry(self):
+        wallet = WalletService.credit_wallet(self.user, Decimal('100.00'), 'funding', reference='LEDGER_1')
+
+        entry = WalletLedgerEntry.objects.get(wallet=wallet)
+        self.assertEqual(entry.sequence, 1)
+        self.assertEqual(entry.entry_type, 'credit')
+        self.assertEqual(entry.balance_after, Decimal('100.00'))
+        self.assertEqual(entry.reference, 'LEDGER_1')
+        self.assertEqual(wallet.ledger_sequence, 1)
+        self.assert_wallet_balance(self.user, Decimal('100.00'))
+
+    def test_sequence_is_gapless(self):
+        WalletService.credit_wallet(self.user, Decimal('100.00'), 'funding')
+        WalletService.debit_wallet(self.user, Decimal('40.00'), 'withdrawal')
+        WalletService.credit_wallet(self.user, Decimal('5.00'), 'funding')
+
+        entries = list(WalletLedgerEntry.objects.filter(wallet=self.wallet).order_by('sequence'))
+        self.assertEqual([e.sequence for e in entries], [1, 2, 3])
+        self.assertEqual([e.balance_after for e in entries], [Decimal('100.00'), Decimal('60.00'), Decimal('65.00')])
+
+    def test_failed_debit_writes_nothing(self):
+        with self.assertRaises(ValueError):
+            WalletService.debit_wallet(self.user, Decimal('50.00'), 'withdrawal')
+
+        self.assertFalse(WalletLedgerEntry.objects.filter(wallet=self.wallet).exists())
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.ledger_sequence, 0)
+
+    def test_entries_are_immutable(self):
+        WalletService.credit_wallet(self.user, Decimal('10.00'), 'funding')
+        entry = WalletLedgerEntry.objects.get(wallet=self.wallet)
+
+        entry.amount = Decimal('1000.00')
+        with self.assertRaises(ValueError):
+            entry.save()
+        with self.assertRaises(ValueError):
+            entry.delete()
+
+
+class PlatformFeeServiceTest(WalletTestCase):
+    """Test platform fee accrual and folding into the company wallet"""
+
+    def setUp(self):
+        super().setUp()
+        # get_company_user() looks this account up by the configured username
+        self.company = User.objects.create_user(
+            username=settings.COMPANY_SYSTEM_USERNAME,
+            email='company@example.com',
+            is_staff=True,
+        )
+
+    def test_record_fee_does_not_touch_company_wallet(self):
+        company_wallet = WalletService.get_or_create_wallet(self.company)
+        PlatformFeeService.record_fee(Decimal('2.00'), 'COMPANY_CUT_TEST_1')
+
+        company_wallet.refresh_from_db()
+        self.assertEqual(company_wallet.balance, Decimal('0.00'))
+        self.assertEqual(PlatformFeeService.get_fee_totals()['pending'], Decimal('2.00'))
+
+    def test_fold_credits_company_wallet_once(self):
+        PlatformFeeService.record_fee(Decimal('2.00'), 'COMPANY_CUT_TEST_1')
+        PlatformFeeService.record_fee(Decimal('3.50'), 'COMPANY_CUT_TEST_2')
+
+        count, amount = PlatformFeeService.fold_pending_fees()
+
+        self.assertEqual(count, 2)
+        self.assertEqual(amount, Decimal('5.50'))
+        company_wallet = Wallet.objects.get(user=self.company)
+        self.assertEqual(company_wallet.balance, Decimal('5.50'))
+        self.assertEqual(WalletLedgerEntry.objects.filter(wallet=company_wallet).count(), 1)
+
+        totals = PlatformFeeService.get_fee_totals()
+        self.assertEqual(totals['pending'], Decimal('0.00'))
+        self.assertEqual(totals['folded'], Decimal('5.50'))
+
+        # Nothing left to fold
+        self.assertEqual(PlatformFeeService.fold_pending_fees(), (0, Decimal('0.00')))
+
+
 class WalletServiceEscrowTest(WalletTestCase):
     """Test escrow-related WalletService functionality"""
     
@@ -497,7 +580,7 @@ class WalletServiceWithdrawalTest(WalletTestCase, MockPaystackMixin):
             
 
     @patch.object(PaystackService, 'create_transfer_recipient')
-    @patch.object(PaystackService, 'initiate_transfer')
+    @patch.object(PaystackService, 'submit_transfer')
     def test_approve_withdrawal_success(self, mock_initiate_transfer, mock_create_recipient):
         """Test successful withdrawal approval with Paystack"""
 
@@ -540,7 +623,7 @@ class WalletServiceWithdrawalTest(WalletTestCase, MockPaystackMixin):
 
 
 
-        # Mock Paystack initiate_transfer to return this transaction's id
+        # Mock Paystack submit_transfer to return this transaction's id
         mock_initiate_transfer.return_value = {
             "success": True,
             "data": {
@@ -599,8 +682,8 @@ class WalletServiceWithdrawalTest(WalletTestCase, MockPaystackMixin):
         
         # No debit transaction should be created
         self.assertFalse(
-            Transaction.objects.filter(
-                user=self.user, 
+            WalletLedgerEntry.objects.filter(
+                wallet__user=self.user, 
                 category='withdrawal',
                 amount=Decimal('100.00')
             ).exists()
@@ -816,4 +899,109 @@ class WalletServiceEdgeCaseTest(WalletTestCase):
         )
         
         # Should maintain precision in database
-        self.assertEqual(transaction.amount, precise_amount)
\ No newline at end of file
+        self.assertEqual(transaction.amount, precise_amount)
+
+
+class WithdrawalPayoutServiceTest(WalletTestCase):
+    """Test batched withdrawal approval and bulk payouts"""
+
+    def setUp(self):
+        super().setUp()
+        PaymentGateway.objects.get_or_create(name='paystack')
+        WalletService.credit_wallet(self.user, Decimal('5000.00'), 'funding')
+        self.withdrawals = [
+            WithdrawalRequest.objects.create(
+                user=self.user,
+                amount_usd=Decimal('2000.00'),
+                withdrawal_method='bank_transfer',
+                account_number='1234567890',
+                account_name='Test Account',
+                bank_code='001',
+                status='pending',
+            )
+            for _ in range(3)
+        ]
+
+    @patch('wallets.services.WithdrawalPayoutService._notify_payout_worker')
+    def test_approve_withdrawals_debits_without_gateway_calls(self, mock_notify):
+        """Approval debits wallets and skips withdrawals the balance can't cover"""
+        with patch('wallets.services.PaystackService') as mock_paystack:
+            result = WithdrawalPayoutService.approve_withdrawals(
+                [w.id for w in self.withdrawals], self.admin_user
+            )
+            mock_paystack.assert_not_called()
+
+        self.assertEqual(len(result['approved']), 2)
+        self.assertEqual(len(result['failed']), 1)
+        self.assert_wallet_balance(self.user, Decimal('1000.00'))
+
+        approved = WithdrawalRequest.objects.filter(status='approved')
+        for withdrawal in approved:
+            self.assertEqual(withdrawal.gateway_reference, f'WD_{withdrawal.id.hex}')
+            self.assertEqual(withdrawal.transaction.status, PaymentTransaction.Status.PENDING)
+
+    @patch('wallets.services.WithdrawalPayoutService._notify_payout_worker')
+    @patch('wallets.services.PaystackService')
+    def test_submit_payouts_sends_one_bulk_transfer(self, mock_paystack, mock_notify):
+        """Approved withdrawals go out in a single bulk request"""
+        WithdrawalPayoutService.approve_withdrawals([w.id for w in self.withdrawals[:2]], self.admin_user)
+
+        service = mock_paystack.return_value
+        service.get_transfer_recipient.return_value = {'success': True, 'data': {'recipient_code': 'RCP_1'}}
+        service.initiate_bulk_transfer.side_effect = lambda transfers: {
+            'success': True,
+            'data': [
+                {'reference': t['reference'], 'transfer_code': f"TRF_{i}", 'status': 'pending'}
+                for i, t in enumerate(transfers)
+            ],
+        }
+
+        totals = WithdrawalPayoutService.submit_payouts()
+
+        self.assertEqual(totals['submitted'], 2)
+        service.initiate_bulk_transfer.assert_called_once()
+        self.assertEqual(len(service.initiate_bulk_transfer.call_args[0][0]), 2)
+        self.assertFalse(
+            WithdrawalRequest.objects.filter(status='approved', payout_submitted_at__isnull=True).exists()
+        )
+        self.assertEqual(PaystackTransaction.objects.filter(recipient_code='RCP_1').count(), 2)
+
+        # Nothing left to submit
+        self.assertEqual(WithdrawalPayoutService.submit_payouts()['claimed'], 0)
+
+    @patch('wallets.services.WithdrawalPayoutService._notify_payout_worker')
+    @patch('wallets.services.PaystackService')
+    def test_rejected_bulk_transfer_refunds_wallets(self, mock_paystack, mock_notify):
+        """A bulk request the gateway rejects fails the withdrawals and refunds them"""
+        WithdrawalPayoutService.approve_withdrawals([self.withdrawals[0].id], self.admin_user)
+
+        service = mock_paystack.return_value
+        service.get_transfer_recipient.return_value = {'success': True, 'data': {'recipient_code': 'RCP_1'}}
+        service.initiate_bulk_transfer.return_value = {'success': False, 'data': {}, 'error': 'Insufficient balance'}
+
+        totals = WithdrawalPayoutService.submit_payouts()
+
+        self.assertEqual(totals['failed'], 1)
+        self.withdrawals[0].refresh_from_db()
+        self.assertEqual(self.withdrawals[0].status, 'failed')
+        self.assert_wallet_balance(self.user, Decimal('5000.00'))
+
+    @patch('wallets.services.WithdrawalPayoutService._notify_payout_worker')
+    @patch('wallets.services.PaystackService')
+    def test_ambiguous_bulk_transfer_keeps_debit(self, mock_paystack, mock_notify):
+        """A bulk request with unknown outcome (e.g. a 5xx) is left for webhooks, not refunded"""
+        WithdrawalPayoutService.approve_withdrawals([self.withdrawals[0].id], self.admin_user)
+
+        service = mock_paystack.return_value
+        service.get_transfer_recipient.return_value = {'success': True, 'data': {'recipient_code': 'RCP_1'}}
+        service.initiate_bulk_transfer.return_value = {
+            'success': False, 'data': {}, 'error': 'Service unavailable', 'ambiguous': True,
+        }
+
+        totals = WithdrawalPayoutService.submit_payouts()
+
+        self.assertEqual(totals['failed'], 0)
+        self.assertEqual(totals['unconfirmed'], 1)
+        self.withdrawals[0].refresh_from_db()
+        self.assertEqual(self.withdrawals[0].status, 'approved')
+        self.assert_wallet_balance(self.user, Decimal('3000.00'))